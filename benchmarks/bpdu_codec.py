@@ -0,0 +1,68 @@
+import sys
+import os
+import json
+import timeit
+import argparse
+
+# Add the parent directory to the Python path to import the project modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.bpdu_codec import CONTENT_TYPE, decode_frame, encode_frame
+
+def make_frame(record_count):
+    bpdus = [{'msti': msti, 'bpdu': {'sender_id': 'NODE0042', 'root_id': 'NODE0001', 'cost': 7}} for msti in range(record_count)]
+    return {'from': 'NODE0042', 'bpdus': bpdus}
+
+def per_bpdu_us(fn, record_count, number):
+    """Best-of-5 time per BPDU record in microseconds."""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number / record_count * 1e6
+
+def bench_codec(record_count, number):
+    frame = make_frame(record_count)
+    json_body = json.dumps(frame).encode()
+    binary_body = encode_frame(frame['from'], frame['bpdus'])
+    return {
+        'json_bytes': len(json_body),
+        'binary_bytes': len(binary_body),
+        'json_encode_us': per_bpdu_us(lambda: json.dumps(frame).encode(), record_count, number),
+        'binary_encode_us': per_bpdu_us(lambda: encode_frame(frame['from'], frame['bpdus']), record_count, number),
+        'json_decode_us': per_bpdu_us(lambda: json.loads(json_body), record_count, number),
+        'binary_decode_us': per_bpdu_us(lambda: decode_frame(binary_body), record_count, number),
+    }
+
+def bench_endpoints(record_count, number):
+    """Full receive path through the Flask test client: /bpdus (JSON) versus /bpdu-frame (binary)."""
+    from mstp import server
+    from mstp.network import NetworkNode
+
+    vlan_ids = list(range(record_count))
+    server.node = NetworkNode('NODE0001', vlan_ids, [('NODE0042', 'http://127.0.0.1:1')],
+                              link_in_vlan=lambda *args: True,
+                              vlan_instances={vlan_id: vlan_id for vlan_id in vlan_ids})
+    client = server.app.test_client()
+    frame = make_frame(record_count)
+    binary_body = encode_frame(frame['from'], frame['bpdus'])
+    return {
+        'json_endpoint_us': per_bpdu_us(lambda: client.post('/bpdus', json=frame), record_count, number),
+        'binary_endpoint_us': per_bpdu_us(lambda: client.post('/bpdu-frame', data=binary_body, content_type=CONTENT_TYPE),
+                                          record_count, number),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-BPDU encode/decode cost of the JSON and binary wire formats.")
+    parser.add_argument("--records", type=int, nargs="+", default=[1, 16, 64], help="Instance records per frame.")
+    parser.add_argument("--number", type=int, default=2000, help="Frames per timing run.")
+    parser.add_argument("--endpoints", action="store_true", help="Also time the Flask receive path (needs flask).")
+    args = parser.parse_args()
+
+    print(f"{'records':>7} {'bytes json/bin':>15} {'encode us json/bin':>19} {'decode us json/bin':>19}")
+    for record_count in args.records:
+        r = bench_codec(record_count, args.number)
+        print(f"{record_count:>7} {r['json_bytes']:>7}/{r['binary_bytes']:<7} "
+              f"{r['json_encode_us']:>9.3f}/{r['binary_encode_us']:<9.3f} {r['json_decode_us']:>9.3f}/{r['binary_decode_us']:<9.3f}")
+
+    if args.endpoints:
+        print()
+        print(f"{'records':>7} {'endpoint us/BPDU json/bin':>26}")
+        for record_count in args.records:
+            r = bench_endpoints(record_count, max(1, args.number // 10))
+            print(f"{record_count:>7} {r['json_endpoint_us']:>12.3f}/{r['binary_endpoint_us']:<12.3f}")
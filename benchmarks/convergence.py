@@ -0,0 +1,111 @@
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+# Add the parent directory to the Python path to import the project modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.mstp import MSTP
+from mstp.simulation import Simulator
+from mstp import topogen
+
+@contextmanager
+def counting_calls():
+    """
+    Counts, per bridge, MSTP.receive_bpdu calls and recomputations: full root port
+    elections (_select_root_port) and role recomputations over every port
+    (_update_roles after a root change). Yields the Counters.
+    """
+    counts = {'receive_bpdu': Counter(), 'root_elections': Counter(), 'role_recomputations': Counter()}
+    receive_bpdu, select_root_port, update_roles = MSTP.receive_bpdu, MSTP._select_root_port, MSTP._update_roles
+
+    def counted_receive_bpdu(self, from_port, received_bpdu):
+        counts['receive_bpdu'][self.bridge_id] += 1
+        return receive_bpdu(self, from_port, received_bpdu)
+
+    def counted_select_root_port(self):
+        counts['root_elections'][self.bridge_id] += 1
+        return select_root_port(self)
+
+    def counted_update_roles(self, port, root_changed):
+        if root_changed:
+            counts['role_recomputations'][self.bridge_id] += 1
+        return update_roles(self, port, root_changed)
+
+    MSTP.receive_bpdu, MSTP._select_root_port, MSTP._update_roles = counted_receive_bpdu, counted_select_root_port, counted_update_roles
+    try:
+        yield counts
+    finally:
+        MSTP.receive_bpdu, MSTP._select_root_port, MSTP._update_roles = receive_bpdu, select_root_port, update_roles
+
+def per_bridge(counter, node_ids):
+    values = [counter.get(node_id, 0) for node_id in node_ids]
+    return {'total': sum(values), 'mean': sum(values) / len(values), 'max': max(values)}
+
+def bench_convergence(topology, size, vlan_count, instance_count, density=1.0, link_delay=0.001, hello=2.0, seed=0):
+    """Builds one topology, runs it to convergence in the simulator and returns its figures."""
+    node_ids, links = topogen.build(topology, size)
+    vlan_links = topogen.assign_vlans(links, vlan_count, density, seed=seed)
+    instances = topogen.assign_instances(vlan_links, instance_count)
+    tracemalloc.start()
+    started = time.perf_counter()
+    with counting_calls() as counts:
+        # No LSAs: only spanning tree traffic is measured
+        sim = Simulator(node_ids, links, vlan_links, mst_instances=instances, hello_interval=hello,
+                        link_delay=link_delay, link_state=False, seed=seed)
+        converged_at = sim.run_until_converged()
+    wall_s = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'topology': topology, 'size': size, 'nodes': len(node_ids), 'links': len(links),
+        'vlans': vlan_count, 'instances': len(instances),
+        'converged_at_s': converged_at, # Virtual time of the last state change
+        'wall_s': wall_s,
+        'bpdu_frames': sim.frames_delivered,
+        'bpdus': sim.bpdus_delivered,
+        'events': sim.events_processed,
+        'peak_memory_mb': peak / 2**20,
+        'receive_bpdu': per_bridge(counts['receive_bpdu'], node_ids),
+        'root_elections': per_bridge(counts['root_elections'], node_ids),
+        'role_recomputations': per_bridge(counts['role_recomputations'], node_ids),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to converge and spanning tree traffic on generated topologies.")
+    parser.add_argument("--topologies", nargs="+", choices=sorted(topogen.TOPOLOGIES), default=sorted(topogen.TOPOLOGIES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8],
+                        help="Nodes for ring/mesh/tree, side for grid, k for fat-tree.")
+    parser.add_argument("--vlans", type=int, default=4, help="VLANs per topology.")
+    parser.add_argument("--instances", type=int, default=2, help="MST instances the VLANs are spread over (0: all on the CIST).")
+    parser.add_argument("--density", type=float, default=1.0, help="Fraction of the links each VLAN is on.")
+    parser.add_argument("--hello", type=float, default=2.0, help="Hello interval in virtual seconds.")
+    parser.add_argument("--link-delay", type=float, default=0.001, help="One-way link delay in virtual seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+    if args.instances < 0:
+        parser.error("--instances must be 0 or more")
+
+    results = []
+    print(f"{'topology':>9} {'size':>5} {'nodes':>6} {'links':>6} {'converge s':>11} {'wall s':>8} {'BPDUs':>9} "
+          f"{'recv/bridge':>12} {'recomp/bridge':>14} {'peak MB':>8}")
+    for topology in args.topologies:
+        for size in args.sizes:
+            r = bench_convergence(topology, size, args.vlans, args.instances, args.density, args.link_delay,
+                                  args.hello, args.seed)
+            results.append(r)
+            recomputations = (r['root_elections']['total'] + r['role_recomputations']['total']) / r['nodes']
+            print(f"{topology:>9} {size:>5} {r['nodes']:>6} {r['links']:>6} {r['converged_at_s']:>11.4f} {r['wall_s']:>8.3f} "
+                  f"{r['bpdus']:>9} {r['receive_bpdu']['mean']:>12.1f} {recomputations:>14.1f} {r['peak_memory_mb']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                       'params': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
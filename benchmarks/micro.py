@@ -0,0 +1,180 @@
+import sys
+import os
+import json
+import time
+import timeit
+import argparse
+import platform
+
+# Add the parent directory to the Python path to import the project modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from mstp import topogen
+from mstp.bpdu_codec import decode_frame, encode_frame
+from mstp.forwarding import ForwardingTable
+from mstp.mstp import MSTP
+from mstp.simulation import Simulator
+from benchmarks.bpdu_codec import make_frame
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'micro_baseline.json')
+
+# Each case builds its inputs once and returns (description of the input, fn to time, operations per call).
+# The description is stored with the baseline so that a run is only compared against the same input.
+
+def case_receive_bpdu():
+    """A bridge with 64 ports seeing alternating BPDUs on one port, so every call does the work."""
+    mstp = MSTP('NODE0032', [f'NODE{i:04}' for i in range(64)])
+    for i in range(64):
+        mstp.receive_bpdu(f'NODE{i:04}', {'root_id': 'NODE0001', 'cost': 2 + i % 3, 'sender_id': f'NODE{i:04}'})
+    better = {'root_id': 'NODE0000', 'cost': 1, 'sender_id': 'NODE0005'}
+    worse = {'root_id': 'NODE0001', 'cost': 4, 'sender_id': 'NODE0005'}
+    def fn():
+        mstp.receive_bpdu('NODE0005', better)
+        mstp.receive_bpdu('NODE0005', worse)
+    return '64 ports, root change', fn, 2
+
+def case_receive_bpdu_unchanged():
+    """The common case: a periodic hello identical to the last one."""
+    mstp = MSTP('NODE0032', [f'NODE{i:04}' for i in range(64)])
+    bpdu = {'root_id': 'NODE0001', 'cost': 3, 'sender_id': 'NODE0005'}
+    mstp.receive_bpdu('NODE0005', bpdu)
+    return '64 ports, repeated hello', lambda: mstp.receive_bpdu('NODE0005', dict(bpdu)), 1
+
+def case_is_bpdu_superior():
+    mstp = MSTP('NODE0032', [])
+    a = {'root_id': 'NODE0001', 'cost': 3, 'sender_id': 'NODE0007'}
+    b = {'root_id': 'NODE0001', 'cost': 3, 'sender_id': 'NODE0005'}
+    return 'tie broken on sender', lambda: mstp._is_bpdu_superior(a, b), 1
+
+def converged_sim(side, vlan_count, instance_count, link_state=False):
+    nodes, links = topogen.grid(side)
+    vlan_links = topogen.assign_vlans(links, vlan_count)
+    sim = Simulator(nodes, links, vlan_links, mst_instances=topogen.assign_instances(vlan_links, instance_count),
+                    link_state=link_state)
+    sim.run_until_converged()
+    return sim
+
+def case_build_bpdu_frames():
+    """Payload construction of send_bpdus() for a bridge with 4 neighbors and 16 instances."""
+    node = converged_sim(4, 16, 16).nodes['G1_1']
+    return 'grid 4x4, 16 instances, 4 neighbors', node.build_bpdu_frames, 1
+
+def case_find_mstp_path():
+    """A path lookup across the cached forwarding table of a 144-bridge grid (flooding LSAs on larger ones is slow)."""
+    node = converged_sim(12, 1, 1, link_state=True).nodes['G0_0']
+    node.find_mstp_path('G11_11', 10)
+    return 'grid 12x12', lambda: node.find_mstp_path('G11_11', 10), 1
+
+def case_forwarding_table_build():
+    """Rebuilding a VLAN's forwarding table from the port states of 1600 bridges, as after an LSDB change."""
+    sim = converged_sim(40, 1, 1)
+    view = {node_id: vlans['10'] for node_id, vlans in sim.global_port_states().items()}
+    return 'grid 40x40', lambda: ForwardingTable.from_port_states('G0_0', view), 1
+
+def case_is_link_in_vlan():
+    links = [link.split(':') for link in config.Link_connected]
+    vlan_ids = list(config.VLANS)
+    def fn():
+        for vlan_id in vlan_ids:
+            for node1, node2 in links:
+                config.is_link_in_vlan(vlan_id, node1, node2)
+    return f'config.py, {len(vlan_ids)} VLANs x {len(links)} links', fn, len(vlan_ids) * len(links)
+
+def case_bpdu_codec():
+    """Encoding and decoding one binary frame with 16 instance records (see benchmarks/bpdu_codec.py)."""
+    frame = make_frame(16)
+    return '16 records', lambda: decode_frame(encode_frame(frame['from'], frame['bpdus'])), 16
+
+def case_status():
+    """Full GET /status through the Flask test client for a bridge with 64 VLANs and 100 transfers."""
+    from mstp import server
+    node = converged_sim(4, 64, 8).nodes['G1_1']
+    for i in range(100):
+        node.transfer_status[f'transfer-{i}'] = {'status': 'completed', 'path': ['G1_1', 'G1_2', 'G2_2'],
+                                                 'src': 'G1_1', 'dst': 'G2_2', 'duration_s': 1.5}
+    server.node = node
+    client = server.app.test_client()
+    return 'grid 4x4, 64 VLANs, 100 transfers', lambda: client.get('/status'), 1
+
+CASES = {
+    'receive_bpdu': case_receive_bpdu,
+    'receive_bpdu_unchanged': case_receive_bpdu_unchanged,
+    'is_bpdu_superior': case_is_bpdu_superior,
+    'build_bpdu_frames': case_build_bpdu_frames,
+    'find_mstp_path': case_find_mstp_path,
+    'forwarding_table_build': case_forwarding_table_build,
+    'is_link_in_vlan': case_is_link_in_vlan,
+    'bpdu_codec': case_bpdu_codec,
+    'status': case_status,
+}
+
+def run_case(name, repeat=5, min_time=0.2):
+    """Best-of-`repeat` time per operation in microseconds, each run lasting about `min_time` seconds."""
+    size, fn, ops = CASES[name]()
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return {'size': size, 'us_per_op': best / number / ops * 1e6}
+
+def compare(results, baseline, threshold):
+    """[(name, baseline us, current us, ratio, regressed)] for the cases measured on the same input as the baseline."""
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or base['size'] != result['size']:
+            continue
+        ratio = result['us_per_op'] / base['us_per_op']
+        rows.append((name, base['us_per_op'], result['us_per_op'], ratio, ratio > 1 + threshold))
+    return rows
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)['cases']
+    except FileNotFoundError:
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the per-message hot paths, compared against a baseline.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline instead of comparing.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Fail on a case more than this fraction slower than its baseline.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case; the fastest counts.")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file.")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':>23} {'us/op':>10}  input")
+    for name in args.cases:
+        results[name] = run_case(name, args.repeat)
+        print(f"{name:>23} {results[name]['us_per_op']:>10.3f}  {results[name]['size']}")
+
+    run = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+           'machine': platform.machine(), 'cases': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(run, f, indent=2)
+
+    if args.save_baseline:
+        # Keep the baselines of cases not run this time
+        run['cases'] = {**(load_baseline(args.baseline) or {}), **results}
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(0)
+    rows = compare(results, baseline, args.threshold)
+    print()
+    print(f"{'case':>23} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, base_us, now_us, ratio, regressed in rows:
+        print(f"{name:>23} {base_us:>10.3f} {now_us:>10.3f} {ratio - 1:>+8.1%}{'  SLOWER' if regressed else ''}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} case(s) more than {args.threshold:.0%} slower than the baseline: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import config
+from dashboard.collector import StatusCollector
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(ROOT, '.cluster')
+
+def is_local_address(ip):
+    """True if this machine can listen on `ip`, i.e. a node configured with it has to run here."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((ip, 0))
+        return True
+    except OSError:
+        return False
+
+def is_running(pid, cmd=None):
+    """True if process `pid` is alive and, where /proc can tell, still runs `cmd` (the PID was not reused)."""
+    if sys.platform == 'win32':
+        tasks = subprocess.run(['tasklist', '/FI', f'PID eq {pid}', '/NH'], capture_output=True, text=True).stdout
+        return str(pid) in tasks.split()
+    try:
+        os.kill(pid, 0)
+    except OSError: # Gone, or another user's process that took over the PID
+        return False
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            args = f.read().decode(errors='replace').split('\0')[:-1]
+    except OSError:
+        return True # No /proc (macOS): the PID is all there is to go on
+    # The interpreter path may be resolved differently; compare the arguments after it
+    return cmd is None or args[1:] == cmd[1:]
+
+
+class Cluster:
+    """
+    Processes started by this launcher (nodes and the dashboard), tracked by PID in
+    .cluster/state.json so that a later run can check or stop them. Only those
+    processes are ever signalled, never anything else on the host.
+    """
+    def __init__(self, state_dir=STATE_DIR):
+        self.state_dir = state_dir
+        self.state_file = os.path.join(state_dir, 'state.json')
+        self.log_dir = os.path.join(state_dir, 'logs')
+        try:
+            with open(self.state_file) as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = {'topology': None, 'processes': {}}
+
+    def _save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        with open(self.state_file, 'w') as f:
+            json.dump(self.state, f, indent=1)
+
+    @property
+    def processes(self):
+        return self.state['processes'] # {name: {'pid', 'cmd', 'url' (nodes only)}}
+
+    def running(self):
+        """{name: pid} of the tracked processes that are still alive."""
+        return {name: proc['pid'] for name, proc in self.processes.items() if is_running(proc['pid'], proc['cmd'])}
+
+    def start(self, name, cmd, url=None, env=None):
+        """Starts `cmd` in its own session with output to .cluster/logs/<name>.log. Returns its PID."""
+        proc = self.processes.get(name)
+        if proc and is_running(proc['pid'], proc['cmd']):
+            raise RuntimeError(f"{name} is already running (PID {proc['pid']})")
+        os.makedirs(self.log_dir, exist_ok=True)
+        # Ctrl+C in the launcher's terminal must not reach the processes; stop() does that
+        if sys.platform == 'win32':
+            detach = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            detach = {'start_new_session': True}
+        with open(os.path.join(self.log_dir, f'{name}.log'), 'ab') as log:
+            popen = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                     cwd=ROOT, env={**os.environ, 'PYTHONUNBUFFERED': '1', **(env or {})}, **detach)
+        # Until the child has exec'd, /proc still shows our own command line and is_running() would say no
+        deadline = time.monotonic() + 1
+        while popen.poll() is None and not is_running(popen.pid, cmd) and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.processes[name] = {'pid': popen.pid, 'cmd': cmd, 'url': url}
+        self._save()
+        return popen.pid
+
+    def start_nodes(self, node_ids=None, topology=None, runtime='threaded', transport=None):
+        """
+        Starts main.py for each node (default: every node of the topology that listens on
+        an address of this machine). `topology` is a generated topology file that the
+        nodes run instead of config.py's. Returns the node IDs started.
+        """
+        env = None
+        if topology:
+            topology = os.path.abspath(topology)
+            config.load_topology(topology)
+            env = {'MSTP_TOPOLOGY': topology}
+        unknown = [node_id for node_id in node_ids or [] if node_id not in config.Ip_address]
+        if unknown:
+            raise RuntimeError(f"Unknown nodes: {', '.join(unknown)}")
+        if self.state['topology'] != topology and any(self.processes[name].get('url') for name in self.running()):
+            raise RuntimeError("Nodes of another topology are running; stop them first")
+        self.state['topology'] = topology
+        if node_ids is None:
+            node_ids = [node_id for node_id in config.Ip_address if is_local_address(config.Ip_address[node_id])]
+        for node_id in node_ids:
+            cmd = [sys.executable, os.path.join(ROOT, 'main.py'), node_id, '--runtime', runtime,
+                   '--transport', transport or config.BPDU_TRANSPORT]
+            self.start(node_id, cmd, url=f"http://{config.Ip_address[node_id]}:{config.Port_Number[node_id]}/status", env=env)
+        return node_ids
+
+    def stop(self, names=None, timeout=10):
+        """Stops the named (default: all) tracked processes, SIGTERM first and SIGKILL after `timeout`."""
+        names = [name for name in (names or list(self.processes)) if name in self.processes]
+        alive = {name: self.processes[name] for name in names if is_running(self.processes[name]['pid'], self.processes[name]['cmd'])}
+        for proc in alive.values():
+            try: os.kill(proc['pid'], signal.SIGTERM)
+            except OSError: pass
+        deadline = time.monotonic() + timeout
+        while alive and time.monotonic() < deadline:
+            time.sleep(0.1)
+            alive = {name: proc for name, proc in alive.items() if is_running(proc['pid'], proc['cmd'])}
+        for proc in alive.values():
+            try: os.kill(proc['pid'], getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError: pass
+        for name in names:
+            del self.processes[name]
+        if not any(proc.get('url') for proc in self.processes.values()):
+            self.state['topology'] = None
+        self._save()
+        return names
+
+    def node_urls(self):
+        """{node_id: status URL} of the tracked nodes."""
+        return {name: proc['url'] for name, proc in self.processes.items() if proc.get('url')}
+
+
+def health(urls, timeout=1.0):
+    """{node_id: True if its /status answers} for {node_id: status URL}, checked concurrently."""
+    def check(url):
+        try:
+            return requests.get(url, timeout=timeout).status_code == 200
+        except requests.RequestException:
+            return False
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(urls))) as pool:
+        return dict(zip(urls, pool.map(check, urls.values())))
+
+def wait_healthy(urls, timeout=30, interval=0.5):
+    """Waits until every node answers. Returns the node IDs still down after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    down = set(urls)
+    while down:
+        down = {node_id for node_id, ok in health({n: urls[n] for n in down}).items() if not ok}
+        if not down or time.monotonic() >= deadline:
+            break
+        time.sleep(interval)
+    return down
+
+def wait_converged(urls, settle=3.0, timeout=60, interval=0.5):
+    """
+    Waits until every node answers and no node's status (port roles of every instance
+    and VLAN) has changed for `settle` seconds. Returns True if that happened within
+    `timeout` seconds.
+    """
+    collector = StatusCollector(sorted(urls.items()), timeout=1.0)
+    try:
+        deadline = time.monotonic() + timeout
+        previous, stable_since = None, None
+        while time.monotonic() < deadline:
+            statuses = collector.fetch_all()
+            now = time.monotonic()
+            # Unchanged nodes (304) come back as the very same objects
+            if previous is not None and all(statuses[n] is not None and statuses[n] is previous[n] for n in statuses):
+                if now - stable_since >= settle:
+                    return True
+            else:
+                stable_since = now
+            previous = statuses
+            time.sleep(interval)
+        return False
+    finally:
+        collector.close()
+
+def print_status(cluster):
+    running = cluster.running()
+    urls = cluster.node_urls()
+    healthy = health({name: url for name, url in urls.items() if name in running})
+    if cluster.state['topology']:
+        print(f"Topology: {cluster.state['topology']}")
+    print(f"{'name':>10} {'pid':>8}  state")
+    for name, proc in cluster.processes.items():
+        state = 'stopped' if name not in running else ('up' if healthy.get(name, name not in urls) else 'not answering')
+        print(f"{name:>10} {proc['pid']:>8}  {state}")
+    print(f"{len(running)}/{len(cluster.processes)} running, {sum(healthy.values())}/{len(urls)} nodes answering")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start, check and stop a cluster of MSTP nodes on this machine.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    start = commands.add_parser("start", help="Start the nodes and wait until they answer.")
+    start.add_argument("--topology", help="Topology file from generate_topology.py (default: config.py's).")
+    start.add_argument("--nodes", nargs="+", help="Only these nodes (default: every node with a local address).")
+    start.add_argument("--runtime", choices=["threaded", "asyncio"], default="threaded")
+    start.add_argument("--transport", default=None, help="BPDU transport (default: BPDU_TRANSPORT in config.py).")
+    start.add_argument("--wait", action="store_true", help="Also wait until the spanning trees have converged.")
+    for command in (start, commands.add_parser("wait", help="Wait until the running cluster has converged.")):
+        command.add_argument("--timeout", type=float, default=60, help="Seconds to wait before giving up.")
+        command.add_argument("--settle", type=float, default=3, help="Seconds without a change that count as converged.")
+    commands.add_parser("status", help="Show which tracked processes are running and answering.")
+    stop = commands.add_parser("stop", help="Stop the tracked processes.")
+    stop.add_argument("--nodes", nargs="+", help="Only these (default: everything started by this launcher).")
+    args = parser.parse_args()
+
+    cluster = Cluster()
+    if args.command == "start":
+        started = time.monotonic()
+        try:
+            node_ids = cluster.start_nodes([n.upper() for n in args.nodes] if args.nodes else None,
+                                           args.topology, args.runtime, args.transport)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        urls = {node_id: cluster.node_urls()[node_id] for node_id in node_ids}
+        print(f"Started {len(node_ids)} nodes, logs in {cluster.log_dir}")
+        down = wait_healthy(urls, timeout=args.timeout)
+        if down:
+            print(f"Not answering after {args.timeout:.0f}s: {', '.join(sorted(down))}")
+            sys.exit(1)
+        print(f"All {len(node_ids)} nodes answering after {time.monotonic() - started:.1f}s")
+        if args.wait:
+            if not wait_converged(urls, args.settle, args.timeout):
+                print(f"Not converged after {args.timeout:.0f}s")
+                sys.exit(1)
+            print(f"Converged after {time.monotonic() - started:.1f}s")
+    elif args.command == "wait":
+        urls = {name: url for name, url in cluster.node_urls().items() if name in cluster.running()}
+        converged = wait_converged(urls, args.settle, args.timeout)
+        print(f"{len(urls)} nodes {'converged' if converged else f'not converged after {args.timeout:.0f}s'}")
+        sys.exit(0 if converged else 1)
+    elif args.command == "status":
+        print_status(cluster)
+    elif args.command == "stop":
+        # Node IDs are upper case (see main.py); other names as given
+        names = [n if n in cluster.processes else n.upper() for n in args.nodes] if args.nodes else None
+        stopped = cluster.stop(names)
+        print(f"Stopped {len(stopped)} processes")
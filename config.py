@@ -31,7 +31,7 @@ Link_connected = [
     "C:A",
 ]
 
-# VLAN IDs in the network
+# VLAN IDs in the network. The links of each VLAN are listed in Vlan<ID> below.
 VLANS = [10, 20]
 
 # VLAN assignments to links.
@@ -49,57 +49,206 @@ Vlan20 = [
     "C:A",
 ]
 
+# MST instances (MSTIs). Each instance runs a single spanning tree that is shared
+# by all VLANs mapped to it. Instance 0 is the CIST (Common and Internal Spanning
+# Tree): it always runs on every physical link and carries any VLAN not listed here.
+# VLANs mapped to the same instance should be assigned to the same links.
+MST_INSTANCES = {
+    1: [10],
+    2: [20],
+}
+
+# BPDU timers (in seconds).
+# Root, cost and role changes are sent to the affected neighbors right away.
+# Periodic hellos go out every BPDU_HELLO_INTERVAL while the topology is changing.
+# After BPDU_STABLE_HELLOS hellos with no change they slow to BPDU_KEEPALIVE_INTERVAL.
+BPDU_HELLO_INTERVAL = 2
+BPDU_KEEPALIVE_INTERVAL = 10
+BPDU_STABLE_HELLOS = 3
+BPDU_HOLD_TIME = 0.01 # Triggered BPDUs arriving within this window are sent together
+# A neighbor's BPDU information is dropped if nothing is heard from it for this long
+# (max age); keep it a few keep-alive intervals long.
+BPDU_MAX_AGE = 35
+
+# Each node runs its timeouts (BPDU ages, transfer status expiry, retries) on one
+# timer wheel of TIMER_WHEEL_SLOTS buckets, TIMER_WHEEL_TICK seconds each.
+TIMER_WHEEL_TICK = 0.01
+TIMER_WHEEL_SLOTS = 512
+
+# BPDU wire format: "binary" (compact 802.1s-style records, falls back to JSON for
+# neighbors that do not support it) or "json". Node IDs must be at most 8 bytes for binary.
+BPDU_WIRE_FORMAT = "binary"
+
+# BPDU transport: "http" (POSTs to the node's API server) or "udp" (one datagram per
+# frame on port Port_Number + UDP_PORT_OFFSET). All nodes must use the same transport.
+BPDU_TRANSPORT = "http"
+UDP_PORT_OFFSET = 1000
+
+# Link capacities in MB/s for transfers, in each direction ("Node1:Node2": capacity).
+# Links not listed get DEFAULT_LINK_CAPACITY_MBPS. Concurrent transfers share them.
+LINK_CAPACITY_MBPS = {}
+DEFAULT_LINK_CAPACITY_MBPS = 5
+
+# Transfers: "single" sends the whole file in one message and the destination waits
+# for it to download, whatever the path length. "cut-through" and "store-and-forward"
+# stream it hop by hop in TRANSFER_CHUNK_MB chunks; a cut-through hop passes each chunk
+# on as soon as it has arrived and buffers at most TRANSFER_WINDOW chunks, while a
+# store-and-forward hop waits for the whole file before sending it on.
+TRANSFER_MODE = "single"
+TRANSFER_CHUNK_MB = 0.5
+TRANSFER_WINDOW = 4
+
+# Outbound transfer work (forwarding hops, acks, completion and failure notices) runs on
+# TRANSFER_WORKERS threads per node with at most TRANSFER_QUEUE_SIZE tasks waiting.
+# When the queue is full the task's transfer fails. With TRANSFER_OVERLOAD = "reject"
+# a node also refuses to start new transfers while its queue is full.
+TRANSFER_WORKERS = 8
+TRANSFER_QUEUE_SIZE = 256
+TRANSFER_OVERLOAD = "fail"
+
+# Longest a /status long-poll (?wait=) is held open, and the keep-alive interval of the
+# /status/stream event stream, in seconds.
+STATUS_MAX_WAIT = 25
+
+# Dashboards read statuses from the collector service (dashboard/collector_server.py,
+# listening on STATUS_COLLECTOR_PORT) at this URL instead of polling every node
+# themselves, e.g. "http://127.0.0.1:8050". None: poll the nodes directly.
+STATUS_COLLECTOR_URL = None
+STATUS_COLLECTOR_PORT = 8050
+
 # --- END OF THE CONFIGURATION ---
+# To run a generated topology instead of the one above (e.g. a 200-node cluster), set
+# the MSTP_TOPOLOGY environment variable to a file written by generate_topology.py.
+
+import json
+import os
+
+class TopologyIndex:
+    """
+    The topology above compiled into lookup tables: neighbor tables per node and
+    adjacency sets per VLAN. Built once, so every helper below is a dictionary lookup.
+    Returned lists and dicts are shared; callers must not modify them.
+    """
+    def __init__(self, node_ids, links, vlan_links, mst_instances, node_url, link_capacities=None,
+                 default_capacity=DEFAULT_LINK_CAPACITY_MBPS):
+        self.node_urls = {node_id: node_url(node_id) for node_id in node_ids}
+        self.neighbors = {node_id: [] for node_id in node_ids}
+        for link in links:
+            if ":" in link:
+                node1, node2 = link.split(":")
+                self.neighbors[node1].append((node2, self.node_urls[node2]))
+                self.neighbors[node2].append((node1, self.node_urls[node1]))
+
+        self.vlan_links = {vlan_id: list(vlan) for vlan_id, vlan in vlan_links.items()}
+        self.vlan_adjacency = {} # {vlan_id: {node_id: {neighbor_ids}}}
+        for vlan_id, vlan in self.vlan_links.items():
+            adjacency = self.vlan_adjacency[vlan_id] = {}
+            for link in vlan:
+                node1, node2 = link.split(":")
+                adjacency.setdefault(node1, set()).add(node2)
+                adjacency.setdefault(node2, set()).add(node1)
+        self.vlan_neighbors = {} # {(node_id, vlan_id): [(neighbor_id, url)]}, filled on first use
+
+        self.vlan_instances = {vlan_id: msti for msti, vlan_ids in mst_instances.items() for vlan_id in vlan_ids}
+
+        self.default_capacity = default_capacity
+        self.link_capacities = {} # {(node1, node2): MB/s}, both directions
+        for link, capacity in (link_capacities or {}).items():
+            node1, node2 = link.split(":")
+            self.link_capacities[(node1, node2)] = self.link_capacities[(node2, node1)] = capacity
+
+    def get_link_capacity(self, node1, node2):
+        return self.link_capacities.get((node1, node2), self.default_capacity)
+
+    def is_link_in_vlan(self, vlan_id, node1, node2):
+        return node2 in self.vlan_adjacency.get(vlan_id, {}).get(node1, ())
+
+    def get_vlan_neighbors(self, node_id, vlan_id):
+        key = (node_id, vlan_id)
+        if key not in self.vlan_neighbors:
+            members = self.vlan_adjacency.get(vlan_id, {}).get(node_id, ())
+            self.vlan_neighbors[key] = [(n_id, url) for n_id, url in self.neighbors.get(node_id, ()) if n_id in members]
+        return self.vlan_neighbors[key]
+
+    def get_instance_for_vlan(self, vlan_id):
+        return self.vlan_instances.get(vlan_id, 0)
+
+
+def compile_topology():
+    """
+    Compiles the configuration above into a TopologyIndex. The links of each VLAN
+    in VLANS are read from the list named Vlan<ID> (e.g. Vlan10).
+    """
+    vlan_links = {vlan_id: globals().get(f"Vlan{vlan_id}", []) for vlan_id in VLANS}
+    return TopologyIndex(list(Ip_address), Link_connected, vlan_links, MST_INSTANCES,
+                         lambda node_id: f"http://{Ip_address[node_id]}:{Port_Number[node_id]}",
+                         LINK_CAPACITY_MBPS, DEFAULT_LINK_CAPACITY_MBPS)
+
+def reload_topology():
+    """Recompiles the index after the configuration has been changed at runtime."""
+    global TOPOLOGY
+    TOPOLOGY = compile_topology()
+    return TOPOLOGY
+
+def load_topology(path):
+    """
+    Replaces the topology above (Ip_address, Port_Number, Link_connected, VLANS, the
+    Vlan<ID> lists and MST_INSTANCES) with a file written by mstp/topogen.py.
+    """
+    global Number_of_nodes, Ip_address, Port_Number, Link_connected, VLANS, MST_INSTANCES
+    with open(path) as f:
+        topology = json.load(f)
+    Ip_address = topology['Ip_address']
+    Port_Number = topology['Port_Number']
+    Number_of_nodes = len(Ip_address)
+    Link_connected = topology['Link_connected']
+    VLANS = topology['VLANS']
+    for vlan_id, links in topology['vlan_links'].items():
+        globals()[f"Vlan{vlan_id}"] = links
+    MST_INSTANCES = {int(msti): vlan_ids for msti, vlan_ids in topology['MST_INSTANCES'].items()}
+    return reload_topology()
 
 # Helper functions to get configuration data
 def get_node_urls():
     """Returns a dictionary mapping node IDs to their URLs"""
-    return {node_id: f"http://{Ip_address[node_id]}:{Port_Number[node_id]}" for node_id in Ip_address}
+    return TOPOLOGY.node_urls
+
+def get_udp_port(node_id):
+    """Returns the UDP port a node receives BPDUs on"""
+    return Port_Number[node_id] + UDP_PORT_OFFSET
 
 def get_neighbors_for_node(node_id):
     """Returns list of (neighbor_id, neighbor_url) for a given node"""
-    neighbors = []
-    node_urls = get_node_urls()
-    
-    for link in Link_connected:
-        if ":" in link:
-            node1, node2 = link.split(":")
-            if node1 == node_id:
-                neighbors.append((node2, node_urls[node2]))
-            elif node2 == node_id:
-                neighbors.append((node1, node_urls[node1]))
-    
-    return neighbors
+    return TOPOLOGY.neighbors.get(node_id, [])
 
 def get_vlan_links(vlan_id):
     """Returns list of links for a specific VLAN"""
-    if vlan_id == 10:
-        return Vlan10
-    elif vlan_id == 20:
-        return Vlan20
-    return []
+    return TOPOLOGY.vlan_links.get(vlan_id, [])
 
 def get_all_vlan_links():
     """Returns dictionary mapping VLAN IDs to their links"""
-    return {
-        10: Vlan10,
-        20: Vlan20
-    }
+    return TOPOLOGY.vlan_links
 
 def is_link_in_vlan(vlan_id, node1, node2):
     """Check if a link between two nodes is part of a specific VLAN"""
-    link1 = f"{node1}:{node2}"
-    link2 = f"{node2}:{node1}"
-    vlan_links = get_vlan_links(vlan_id)
-    return link1 in vlan_links or link2 in vlan_links
+    return TOPOLOGY.is_link_in_vlan(vlan_id, node1, node2)
 
 def get_vlan_neighbors_for_node(node_id, vlan_id):
     """Returns list of (neighbor_id, neighbor_url) for a given node that are in the specified VLAN"""
-    all_neighbors = get_neighbors_for_node(node_id)
-    vlan_neighbors = []
-    
-    for neighbor_id, neighbor_url in all_neighbors:
-        if is_link_in_vlan(vlan_id, node_id, neighbor_id):
-            vlan_neighbors.append((neighbor_id, neighbor_url))
-    
-    return vlan_neighbors
\ No newline at end of file
+    return TOPOLOGY.get_vlan_neighbors(node_id, vlan_id)
+
+def get_link_capacity(node1, node2):
+    """Returns the transfer capacity (MB/s) of the link from node1 to node2"""
+    return TOPOLOGY.get_link_capacity(node1, node2)
+
+def get_instance_for_vlan(vlan_id):
+    """Returns the MST instance a VLAN is mapped to (0, the CIST, if it is not mapped)"""
+    return TOPOLOGY.get_instance_for_vlan(vlan_id)
+
+def get_vlan_instance_map():
+    """Returns dictionary mapping every configured VLAN ID to its MST instance"""
+    return {vlan_id: get_instance_for_vlan(vlan_id) for vlan_id in VLANS}
+
+TOPOLOGY = compile_topology()
+if os.environ.get("MSTP_TOPOLOGY"):
+    load_topology(os.environ["MSTP_TOPOLOGY"])
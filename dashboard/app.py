@@ -1,14 +1,17 @@
 import streamlit as st
 import requests
 import networkx as nx
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import sys
 import os
+import io
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to the Python path to import config.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import Ip_address, Port_Number
+from config import Ip_address, Port_Number, Link_connected, STATUS_COLLECTOR_URL
+from dashboard.collector import RemoteCollector
 
 # ---- CONFIGURATION ----
 # Dynamically create NODES from config.py
@@ -17,30 +20,47 @@ NODES = [
     (node_id, f"http://{Ip_address[node_id]}:{Port_Number[node_id]}/status")
     for node_id in node_ids
 ]
+STATUS_TTL_S = 1 # Statuses are shared by every session and fetched at most this often
+FETCH_TIMEOUT_S = 2
 
 st.title("MSTP VLAN Simulation Dashboard")
 
-# Fetch status from all nodes
+# Streamlit reruns this script on every interaction; these live across reruns and sessions
+@st.cache_resource
+def fetch_pool():
+    return ThreadPoolExecutor(max_workers=max(1, min(32, len(NODES))), thread_name_prefix='status-fetch')
+
+@st.cache_resource
+def remote_collector():
+    return RemoteCollector(STATUS_COLLECTOR_URL, timeout=FETCH_TIMEOUT_S)
+
+def fetch_node(url):
+    try:
+        resp = requests.get(url, timeout=FETCH_TIMEOUT_S)
+        if resp.status_code == 200:
+            return resp.json()
+        return None
+    except Exception as e:
+        return None
+
+# Fetch status from all nodes at once, so a refresh waits for one timeout at most
 def fetch_status():
-    statuses = {}
-    for node_id, url in NODES:
-        try:
-            resp = requests.get(url, timeout=2)
-            if resp.status_code == 200:
-                statuses[node_id] = resp.json()
-            else:
-                statuses[node_id] = None
-        except Exception as e:
-            statuses[node_id] = None
-    return statuses
-
-statuses = fetch_status()
+    results = fetch_pool().map(fetch_node, [url for _, url in NODES])
+    return dict(zip([node_id for node_id, _ in NODES], results))
+
+@st.cache_data(ttl=STATUS_TTL_S, show_spinner=False)
+def cached_statuses():
+    if STATUS_COLLECTOR_URL:
+        return remote_collector().fetch_all()
+    return fetch_status()
+
+statuses = cached_statuses()
 
 # Show connection status
 def connection_status():
     st.header("Connection Status")
     for node_id, url in NODES:
-        if statuses[node_id] is not None:
+        if statuses.get(node_id) is not None:
             st.success(f"{node_id} reachable")
         else:
             st.error(f"{node_id} unreachable")
@@ -53,56 +73,60 @@ for node_status in statuses.values():
     if node_status:
         all_vlans.update(node_status['vlans'].keys())
 
-# Visualize MST tree for each VLAN
-def draw_vlan_graph(vlan_id):
+# One layout per topology, so nodes keep their place between reruns and across VLANs
+@st.cache_data(show_spinner=False)
+def topology_layout(nodes, links):
     G = nx.Graph()
-    # Add nodes
-    for node_id, _ in NODES:
-        G.add_node(node_id)
-    # Add edges with port state as edge attribute
-    for node_id, node_status in statuses.items():
-        if not node_status:
-            continue
-        vlan_ports = node_status['vlans'].get(vlan_id, {})
-        for neighbor, state in vlan_ports.items():
-            # Add edge with port state (from node_id to neighbor)
-            G.add_edge(node_id, neighbor, state=state)
-    # Draw
-    pos = nx.spring_layout(G)
-    edge_colors = []
-    edge_styles = []
-    for u, v, d in G.edges(data=True):
+    G.add_nodes_from(nodes)
+    G.add_edges_from(links)
+    return {node: tuple(xy) for node, xy in nx.spring_layout(G, seed=42).items()}
+
+def vlan_edge_states(vlan_id):
+    """((node, neighbor), (state at node, state at neighbor)) for every link of the VLAN, in a stable order."""
+    ports = {node_id: (node_status or {}).get('vlans', {}).get(vlan_id, {}) for node_id, node_status in statuses.items()}
+    links = set()
+    for node_id, vlan_ports in ports.items():
+        for neighbor in vlan_ports:
+            links.add(tuple(sorted((node_id, neighbor))))
+    return tuple((link, (ports.get(link[0], {}).get(link[1]), ports.get(link[1], {}).get(link[0])))
+                 for link in sorted(links))
+
+# Visualize MST tree for each VLAN. Cached on the VLAN's edge states, so only
+# VLANs whose state changed are drawn again.
+@st.cache_data(show_spinner=False, max_entries=256)
+def draw_vlan_graph(vlan_id, edge_states, pos):
+    edge_colors = {}
+    edge_styles = {}
+    for link, ends in edge_states:
         # Use the most severe state if edges are bidirectional
-        states = []
-        if 'state' in d:
-            states.append(d['state'])
-        if 'state' in G.get_edge_data(v, u, default={}):
-            states.append(G.get_edge_data(v, u)['state'])
+        states = [state for state in ends if state is not None]
         if 'root' in states:
-            edge_colors.append('green')
-            edge_styles.append('solid')
+            edge_colors[link], edge_styles[link] = 'green', 'solid'
         elif 'designated' in states:
-            edge_colors.append('blue')
-            edge_styles.append('solid')
+            edge_colors[link], edge_styles[link] = 'blue', 'solid'
         elif 'blocked' in states:
-            edge_colors.append('red')
-            edge_styles.append('dashed')
+            edge_colors[link], edge_styles[link] = 'red', 'dashed'
         else:
-            edge_colors.append('gray')
-            edge_styles.append('dotted')
-    plt.figure(figsize=(5, 4))
-    nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=800)
-    for style in set(edge_styles):
-        idxs = [i for i, s in enumerate(edge_styles) if s == style]
-        edges = [list(G.edges)[i] for i in idxs]
-        color = edge_colors[idxs[0]] if idxs else 'gray'
-        nx.draw_networkx_edges(G, pos, edgelist=edges, edge_color=color, style=style, width=2)
-    nx.draw_networkx_labels(G, pos, font_size=14)
-    plt.title(f"VLAN {vlan_id} MST Tree")
-    plt.axis('off')
-    st.pyplot(plt)
-    plt.close()
+            edge_colors[link], edge_styles[link] = 'gray', 'dotted'
+    G = nx.Graph()
+    G.add_nodes_from(pos)
+    G.add_edges_from(link for link in edge_colors if link[0] in pos and link[1] in pos)
+    # A Figure of its own rather than pyplot: sessions render on different threads
+    fig = Figure(figsize=(5, 4))
+    ax = fig.subplots()
+    nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=800, ax=ax)
+    for style in set(edge_styles.values()):
+        edges = [link for link, s in edge_styles.items() if s == style and G.has_edge(*link)]
+        nx.draw_networkx_edges(G, pos, edgelist=edges, edge_color=[edge_colors[link] for link in edges],
+                               style=style, width=2, ax=ax)
+    nx.draw_networkx_labels(G, pos, font_size=14, ax=ax)
+    ax.set_title(f"VLAN {vlan_id} MST Tree")
+    ax.axis('off')
+    image = io.BytesIO()
+    fig.savefig(image, format='png')
+    return image.getvalue()
 
 st.header("MST Trees by VLAN")
+layout = topology_layout(tuple(node_ids), tuple(tuple(link.split(':')) for link in Link_connected))
 for vlan_id in sorted(all_vlans):
-    draw_vlan_graph(vlan_id) 
\ No newline at end of file
+    st.image(draw_vlan_graph(vlan_id, vlan_edge_states(vlan_id), layout))
@@ -0,0 +1,104 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def merge_status(previous, body):
+    """Applies a /status response to the node's last known status. Full responses replace it."""
+    if not body.get('delta') or previous is None:
+        return body
+    merged = dict(previous, version=body['version'])
+    for section in ('vlans', 'instances'):
+        merged[section] = {**previous.get(section, {}), **body.get(section, {})}
+    transfers = dict(previous.get('transfers', {}))
+    for transfer_id, info in body.get('transfers', {}).items():
+        if info is None:
+            transfers.pop(transfer_id, None)
+        else:
+            transfers[transfer_id] = info
+    merged['transfers'] = transfers
+    return merged
+
+
+class StatusCollector:
+    """
+    Fetches /status from every node concurrently over pooled keep-alive connections,
+    so a round takes at most one timeout however many nodes are down. Each node is
+    asked only for what changed since the version it last reported (a 304 if nothing
+    did), and the deltas are merged into its last status. Not thread-safe: call
+    fetch_all() from one thread at a time.
+    """
+    def __init__(self, nodes, timeout=0.5, max_workers=32):
+        self.nodes = nodes # [(node_id, status_url)]
+        self.timeout = timeout
+        workers = max(1, min(max_workers, len(nodes)))
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=max(1, len(nodes)), pool_maxsize=workers))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='status-fetch')
+        self.statuses = {node_id: None for node_id, _ in nodes} # None while unreachable
+
+    def fetch_node(self, node_id, url):
+        previous = self.statuses.get(node_id)
+        params = {'since': previous['version']} if previous and 'version' in previous else None
+        try:
+            resp = self.session.get(url, params=params, timeout=self.timeout)
+            if resp.status_code == 304:
+                return previous
+            if resp.status_code != 200:
+                return None
+            return merge_status(previous, resp.json())
+        except (requests.RequestException, ValueError):
+            return None
+
+    def fetch_all(self):
+        """Returns {node_id: status or None} for every node."""
+        futures = {node_id: self._executor.submit(self.fetch_node, node_id, url) for node_id, url in self.nodes}
+        self.statuses = {node_id: future.result() for node_id, future in futures.items()}
+        return dict(self.statuses)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+class RemoteCollector:
+    """
+    fetch_all() from a collector service (dashboard/collector_server.py), which polls
+    the nodes once for every dashboard. Only the nodes that changed since the last
+    version are sent; if the service is down every node is reported unreachable.
+    Safe to share between threads.
+    """
+    def __init__(self, url, timeout=0.5):
+        self.url = url.rstrip('/') + '/status'
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.version = None
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def fetch_all(self):
+        with self._lock:
+            return self._fetch_all()
+
+    def _fetch_all(self):
+        params = {'since': self.version} if self.version is not None else None
+        try:
+            resp = self.session.get(self.url, params=params, timeout=self.timeout)
+            if resp.status_code == 304:
+                return dict(self.statuses)
+            resp.raise_for_status()
+            body = resp.json()
+        except (requests.RequestException, ValueError):
+            self.version = None
+            return {node_id: None for node_id in self.statuses}
+        if body.get('delta'):
+            self.statuses.update(body['nodes'])
+        else:
+            self.statuses = dict(body['nodes'])
+        self.version = body['version']
+        return dict(self.statuses)
+
+    def close(self):
+        self.session.close()
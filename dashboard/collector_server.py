@@ -0,0 +1,101 @@
+import sys
+import os
+import argparse
+import threading
+
+from flask import Flask, Response, request, jsonify
+
+# Ensure parent directory is in path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+from dashboard.collector import StatusCollector
+from mstp.status import SSE_KEEPALIVE, StatusLog, etag, parse_version, sse_event
+
+NODES = [(node_id, f"http://{config.Ip_address[node_id]}:{config.Port_Number[node_id]}/status")
+         for node_id in sorted(config.Ip_address.keys())]
+
+
+class TopologyCollector:
+    """
+    Polls every node once per interval (with ?since= deltas, see StatusCollector) and
+    keeps the merged statuses under a version of its own, so any number of dashboards
+    can read them without adding load on the nodes. A node's status is reported as
+    changed whenever it comes back as a new object, including going down (None).
+    """
+    def __init__(self, nodes, interval=1.0, timeout=0.5):
+        self.collector = StatusCollector(nodes, timeout=timeout)
+        self.interval = interval
+        self.log = StatusLog()
+        self.statuses = {node_id: None for node_id, _ in nodes}
+        self._stop_event = threading.Event()
+
+    def poll_once(self):
+        for node_id, status in self.collector.fetch_all().items():
+            if status is not self.statuses.get(node_id):
+                self.statuses[node_id] = status
+                self.log.touch(('node', node_id))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.poll_once()
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True, name='topology-collector').start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.collector.close()
+
+    def get_status(self, since=None):
+        """Every node's status, or with `since` only the nodes whose status changed after it."""
+        version, changed = self.log.changes_since(since)
+        if changed is None:
+            return {'version': version, 'delta': False, 'nodes': dict(self.statuses)}
+        return {'version': version, 'delta': True, 'nodes': {node_id: self.statuses[node_id] for _, node_id in changed}}
+
+
+def create_app(collector):
+    """The same versioned /status and /status/stream API as a node, over all nodes."""
+    app = Flask(__name__)
+
+    @app.route('/status', methods=['GET'])
+    def status():
+        since = parse_version(request.args.get('since'))
+        known = since if since is not None else parse_version(request.headers.get('If-None-Match'))
+        wait = min(request.args.get('wait', 0, type=float), config.STATUS_MAX_WAIT)
+        if known == collector.log.version and wait > 0:
+            collector.log.wait(known, wait)
+        if known == collector.log.version:
+            return '', 304, {'ETag': etag(known)}
+        body = collector.get_status(since)
+        return jsonify(body), 200, {'ETag': etag(body['version'])}
+
+    @app.route('/status/stream', methods=['GET'])
+    def status_stream():
+        since = parse_version(request.headers.get('Last-Event-ID') or request.args.get('since'))
+        def events(since):
+            while True:
+                if since == collector.log.version:
+                    if not collector.log.wait(since, config.STATUS_MAX_WAIT):
+                        yield SSE_KEEPALIVE
+                        continue
+                body = collector.get_status(since)
+                since = body['version']
+                yield sse_event(body)
+        return Response(events(since), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect every node's status once and serve it to the dashboards.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=config.STATUS_COLLECTOR_PORT)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls of the nodes.")
+    args = parser.parse_args()
+
+    collector = TopologyCollector(NODES, interval=args.interval)
+    collector.start()
+    print(f"Collecting from {len(NODES)} nodes, serving on http://{args.host}:{args.port}/status")
+    create_app(collector).run(host=args.host, port=args.port, threaded=True)
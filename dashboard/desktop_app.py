@@ -8,7 +8,7 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QMessageBox,
     QHBoxLayout, QPushButton, QComboBox, QGroupBox, QSpinBox, QTextEdit
 )
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import QTimer, Qt, QObject, QThread, pyqtSignal, pyqtSlot
 import json
 from PyQt5.QtGui import QColor, QPalette
 import threading
@@ -17,14 +17,34 @@ import time
 
 # Ensure parent directory is in path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from config import Ip_address, Port_Number, VLANS, Link_connected, SHOW_UUID_IN_LOG # Add SHOW_UUID_IN_LOG here
+from config import Ip_address, Port_Number, VLANS, MST_INSTANCES, Link_connected, SHOW_UUID_IN_LOG # Add SHOW_UUID_IN_LOG here
+from config import STATUS_COLLECTOR_URL
+from dashboard.collector import RemoteCollector, StatusCollector
+from dashboard.topology_plot import TopologyPlot, column_label
 
 # ---- CONFIGURATION ----
 NODES = [(node_id, f"http://{Ip_address[node_id]}:{Port_Number[node_id]}/status") for node_id in sorted(Ip_address.keys())]
 NODE_URLS = {node_id: url.replace("/status", "") for node_id, url in NODES}
+# VLANs and MST instances the graph can show on their own
+GRAPH_COLUMNS = [('vlans', str(vlan)) for vlan in sorted(VLANS)] + [('instances', str(msti)) for msti in sorted({0, *MST_INSTANCES})]
 REFRESH_INTERVAL_MS = 1000  # Refresh every 1 second for smoother animation
+STATUS_TIMEOUT_S = 0.5 # Per node; all nodes are fetched at once, so also the longest a refresh waits
+
+class StatusWorker(QObject):
+    """Collects node statuses on its own thread and hands them to the UI through a signal."""
+    statuses_ready = pyqtSignal(dict)
+
+    def __init__(self, collector):
+        super().__init__()
+        self.collector = collector
+
+    @pyqtSlot()
+    def collect(self):
+        self.statuses_ready.emit(self.collector.fetch_all())
 
 class MSTPDesktopApp(QWidget):
+    collect_requested = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("MSTP VLAN Simulation Desktop App")
@@ -34,6 +54,17 @@ class MSTPDesktopApp(QWidget):
         self.status_label = QLabel("Fetching node statuses...")
         self.layout.addWidget(self.status_label)
 
+        self.view_combo = QComboBox()
+        self.view_combo.addItem("All VLANs", None)
+        for column in GRAPH_COLUMNS:
+            self.view_combo.addItem(column_label(column), column)
+        self.view_combo.currentIndexChanged.connect(self.change_view)
+        view_layout = QHBoxLayout()
+        view_layout.addWidget(QLabel("Show:"))
+        view_layout.addWidget(self.view_combo)
+        view_layout.addStretch()
+        self.layout.addLayout(view_layout)
+
         self.vlan_graph_widget = VlanGraphWidget()
         self.layout.addWidget(self.vlan_graph_widget)
 
@@ -78,55 +109,44 @@ class MSTPDesktopApp(QWidget):
         # Animation state
         self.anim_path = []
         self.anim_hop = 0
-        
+
+        # Statuses are fetched on a worker thread; the timer only asks for a new round
+        # when the previous one has been delivered, so slow nodes never queue up rounds.
+        if STATUS_COLLECTOR_URL:
+            self.collector = RemoteCollector(STATUS_COLLECTOR_URL, timeout=STATUS_TIMEOUT_S)
+        else:
+            self.collector = StatusCollector(NODES, timeout=STATUS_TIMEOUT_S)
+        self.status_thread = QThread()
+        self.status_worker = StatusWorker(self.collector)
+        self.status_worker.moveToThread(self.status_thread)
+        self.collect_requested.connect(self.status_worker.collect)
+        self.status_worker.statuses_ready.connect(self.refresh)
+        self.status_thread.start()
+        self.collecting = False
+
         self.timer = QTimer()
-        self.timer.timeout.connect(self.refresh)
+        self.timer.timeout.connect(self.request_statuses)
         self.timer.start(REFRESH_INTERVAL_MS)
         
         self.transfer_btn.clicked.connect(self.initiate_transfer)
 
-        self.refresh() # Initial refresh
-
-    def fetch_status(self):
-        statuses = {}
-        for node_id, url in NODES:
-            try:
-                resp = requests.get(url, timeout=0.5)
-                statuses[node_id] = resp.json() if resp.status_code == 200 else None
-            except requests.RequestException:
-                statuses[node_id] = None
-        return statuses
+        self.request_statuses() # Initial refresh
 
-    def refresh(self):
-        self.statuses = self.fetch_status()
-        
-        status_msgs = [f"<span style='color:green'>{node_id} reachable</span>" if self.statuses.get(node_id) else f"<span style='color:red'>{node_id} unreachable</span>" for node_id, _ in NODES]
-        self.status_label.setText(" | ".join(status_msgs))
-        
-        # --- NEW ANIMATION LOGIC ---
-        # Find the most recent active transfer to animate
-        active_transfer = None
-        for node_id, node_status in self.statuses.items():
-            if not node_status or 'transfers' not in node_status: continue
-            for key, info in node_status['transfers'].items():
-                if info.get('status') in ['transferring', 'forwarded']:
-                    active_transfer = info
-                    break
-            if active_transfer: break
+    def request_statuses(self):
+        if not self.collecting:
+            self.collecting = True
+            self.collect_requested.emit()
 
-        if active_transfer and active_transfer.get('path'):
-            self.anim_path = active_transfer['path']
-            self.anim_hop = active_transfer.get('hops', 0)
-        else:
-            # If no active transfers, reset animation
-            self.anim_path = []
-            self.anim_hop = 0
+    def change_view(self):
+        self.vlan_graph_widget.set_view(self.view_combo.currentData())
+        self.vlan_graph_widget.draw_graph(self.statuses, self.graph_layouts, GRAPH_COLUMNS, self.anim_path, self.anim_hop)
 
-        # Draw the graph with the current animation state
-        vlan_ids = sorted([int(v) for v in VLANS])
-        self.vlan_graph_widget.draw_graph(self.statuses, self.graph_layouts, vlan_ids, self.anim_path, self.anim_hop)
-        
-        self.update_log_window()
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.status_thread.quit()
+        self.status_thread.wait()
+        self.collector.close()
+        super().closeEvent(event)
 
     def update_log_window(self):
         """
@@ -204,8 +224,7 @@ class MSTPDesktopApp(QWidget):
             "src": src,
             "dst": dst,
             "vlan_id": int(self.vlan_combo.currentText()),
-            "file_size_mb": self.file_size_spin.value(),
-            "global_port_states": self.get_global_port_states()
+            "file_size_mb": self.file_size_spin.value()
         }
         
         try:
@@ -216,17 +235,10 @@ class MSTPDesktopApp(QWidget):
         except Exception as e:
             QMessageBox.warning(self, "Transfer Failed", f"Failed to initiate transfer: {e}")
             
-    def get_global_port_states(self):
-        # The pathfinder needs the state of ALL VLANs on ALL nodes to work correctly.
-        global_states = {}
-        for node_id, node_status in self.statuses.items():
-            if node_status and 'vlans' in node_status:
-                # Store the entire 'vlans' dictionary for this node
-                global_states[node_id] = node_status['vlans']
-        return global_states
-
-    def refresh(self):
-        self.statuses = self.fetch_status()
+    def refresh(self, statuses):
+        """Runs on the GUI thread with the statuses the worker has just collected."""
+        self.collecting = False
+        self.statuses = statuses
         
         status_msgs = [f"<span style='color:green'>{node_id} reachable</span>" if self.statuses.get(node_id) else f"<span style='color:red'>{node_id} unreachable</span>" for node_id, _ in NODES]
         self.status_label.setText(" | ".join(status_msgs))
@@ -255,8 +267,7 @@ class MSTPDesktopApp(QWidget):
             self.anim_hop = 0
         # ---- END OF FINAL UI FIX ----
             
-        vlan_ids = sorted([int(v) for v in VLANS])
-        self.vlan_graph_widget.draw_graph(self.statuses, self.graph_layouts, vlan_ids, self.anim_path, self.anim_hop)
+        self.vlan_graph_widget.draw_graph(self.statuses, self.graph_layouts, GRAPH_COLUMNS, self.anim_path, self.anim_hop)
         
         self.update_log_window()
 
@@ -269,88 +280,26 @@ class VlanGraphWidget(QWidget):
         layout.addWidget(self.canvas)
         # Adjust layout to make space for the legend at the bottom
         self.fig.subplots_adjust(bottom=0.2)
-        
-    def draw_graph(self, statuses, graph_layouts, vlan_ids, anim_path, anim_hop):
-        self.ax.clear()
-        G = nx.Graph()
-        
-        node_ids = list(statuses.keys())
-        if not node_ids: return
-        
-        G.add_nodes_from(node_ids)
-        G.add_edges_from([tuple(link.split(':')) for link in Link_connected])
-        
-        if 'pos' not in graph_layouts:
-             graph_layouts['pos'] = nx.spring_layout(G, seed=42)
-        pos = graph_layouts['pos']
+        self.plot = None # Built on the first status, then only updated
+        self.view = None
 
-        edge_colors = {}
-        blocked_vlans_on_link = {}
+    def set_view(self, column):
+        """Shows one VLAN or instance column, or every VLAN with None."""
+        self.view = column
+        if self.plot: self.plot.set_view(column)
 
-        for u, v in G.edges():
-            key = tuple(sorted((u,v)))
-            active_vlans = set()
-            
-            status_u_10 = statuses.get(u, {}).get('vlans', {}).get('10', {}).get(v)
-            status_v_10 = statuses.get(v, {}).get('vlans', {}).get('10', {}).get(u)
-            if status_u_10 == 'blocked' or status_v_10 == 'blocked':
-                blocked_vlans_on_link.setdefault(key, []).append(10)
-            elif status_u_10 is not None and status_v_10 is not None:
-                active_vlans.add(10)
-
-            status_u_20 = statuses.get(u, {}).get('vlans', {}).get('20', {}).get(v)
-            status_v_20 = statuses.get(v, {}).get('vlans', {}).get('20', {}).get(u)
-            if status_u_20 == 'blocked' or status_v_20 == 'blocked':
-                blocked_vlans_on_link.setdefault(key, []).append(20)
-            elif status_u_20 is not None and status_v_20 is not None:
-                active_vlans.add(20)
-
-            if len(active_vlans) == 2:
-                edge_colors[key] = 'purple'
-            elif 10 in active_vlans:
-                edge_colors[key] = 'green'
-            elif 20 in active_vlans:
-                edge_colors[key] = 'blue'
-            else:
-                edge_colors[key] = 'lightgray'
-
-        for (u, v), color in edge_colors.items():
-            nx.draw_networkx_edges(G, pos, edgelist=[(u,v)], edge_color=color, width=4, ax=self.ax)
-        
-        nx.draw_networkx_nodes(G, pos, node_color='skyblue', node_size=700)
-        nx.draw_networkx_labels(G, pos, font_color='white', font_size=12, font_weight='bold')
-
-        for (u, v), blocked_list in blocked_vlans_on_link.items():
-            mx = (pos[u][0] + pos[v][0]) / 2
-            my = (pos[u][1] + pos[v][1]) / 2
-            label = f"Blocked: {', '.join(map(str, sorted(blocked_list)))}"
-            self.ax.text(mx, my, label, color='white', ha='center', va='center', 
-                         fontsize=8, zorder=10,
-                         bbox=dict(facecolor='#d62728', alpha=0.9, pad=2, edgecolor='none'))
-        
-        if anim_path and anim_hop < len(anim_path):
-            current_node = anim_path[anim_hop]
-            self.ax.plot(pos[current_node][0], pos[current_node][1], 'o', color='yellow', markersize=18, markeredgecolor='black', zorder=11)
-            if len(anim_path) > 1:
-                path_edges = list(zip(anim_path, anim_path[1:]))
-                # --- START OF THE FIX ---
-                # The 'zorder' argument has been removed from the following line as it is not supported.
-                nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='#ff8c00', width=5, style='dotted')
-                # --- END OF THE FIX ---
-
-        legend_elements = [ plt.Line2D([0], [0], color='green', lw=3, label='VLAN 10 Active'),
-                            plt.Line2D([0], [0], color='blue', lw=3, label='VLAN 20 Active'),
-                            plt.Line2D([0], [0], color='purple', lw=3, label='Both VLANs Active'),
-                            plt.Line2D([0], [0], color='#ff8c00', lw=3, ls='dotted', label='Transfer Path')]
-        # --- START OF THE FIX ---
-        # Move the legend to the bottom of the figure
-        self.ax.legend(handles=legend_elements, loc='lower center', 
-                       bbox_to_anchor=(0.5, -0.3), # Position it below the axis
-                       ncol=2) # Arrange items in 2 columns
-        # --- END OF THE FIX ---
-        self.ax.set_title("MSTP VLAN Tree - Active and Blocked Links")
-        self.ax.axis('off')
-        self.canvas.draw()
+    def draw_graph(self, statuses, graph_layouts, columns, anim_path, anim_hop):
+        node_ids = list(statuses.keys())
+        if not node_ids: return
+        if self.plot is None:
+            G = nx.Graph()
+            G.add_nodes_from(node_ids)
+            G.add_edges_from([tuple(link.split(':')) for link in Link_connected])
+            if 'pos' not in graph_layouts:
+                graph_layouts['pos'] = nx.spring_layout(G, seed=42)
+            self.plot = TopologyPlot(self.fig, self.ax, node_ids, list(G.edges()), graph_layouts['pos'], columns)
+            self.plot.set_view(self.view)
+        self.plot.update(statuses, anim_path, anim_hop)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
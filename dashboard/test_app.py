@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import time
 
 # Add the parent directory to the Python path to import the main app and config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -52,6 +53,19 @@ class TestDashboard(unittest.TestCase):
         for node_id, _ in NODES:
             self.assertIsNone(statuses[node_id])
 
+    @patch('requests.get')
+    def test_fetch_status_is_concurrent(self, mock_get):
+        """Slow nodes are fetched at the same time, so a refresh waits for one of them."""
+        def slow_get(url, timeout):
+            time.sleep(0.3)
+            return MagicMock(status_code=200, json=MagicMock(return_value={"url": url}))
+        mock_get.side_effect = slow_get
+        started = time.monotonic()
+        statuses = fetch_status()
+        self.assertLess(time.monotonic() - started, 0.3 * len(NODES))
+        for node_id, url in NODES:
+            self.assertEqual(statuses[node_id], {"url": url})
+
     def test_nodes_are_configured_correctly(self):
         """Test that the NODES list is created correctly from the config."""
         # Recreate the NODES list from the config to compare
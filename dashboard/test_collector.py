@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import time
+
+# Add the parent directory to the Python path to import the collector
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from dashboard.collector import StatusCollector, merge_status
+
+NODES = [(node_id, f"http://{node_id}/status") for node_id in "ABCDEFGH"]
+
+def response(status_code, body=None):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.json.return_value = body
+    return resp
+
+class TestStatusCollector(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = StatusCollector(NODES, timeout=0.5)
+
+    def tearDown(self):
+        self.collector.close()
+
+    def test_nodes_are_fetched_concurrently(self):
+        """Eight nodes that each take 0.3 s (or time out) cost one round, not eight."""
+        def get(url, params=None, timeout=None):
+            time.sleep(0.3)
+            if url.startswith("http://A"):
+                raise requests.Timeout()
+            return response(200, {'version': 1, 'vlans': {}, 'instances': {}, 'transfers': {}})
+        self.collector.session.get = get
+        started = time.monotonic()
+        statuses = self.collector.fetch_all()
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertIsNone(statuses['A'])
+        self.assertEqual(statuses['B']['version'], 1)
+
+    def test_deltas_are_merged(self):
+        full = {'version': 5, 'delta': False, 'vlans': {'10': {'B': 'root'}}, 'instances': {'0': {'B': 'root'}},
+                'transfers': {'t1': {'status': 'transferring'}, 't2': {'status': 'done'}}}
+        delta = {'version': 7, 'delta': True, 'vlans': {'10': {'B': 'designated'}}, 'instances': {},
+                 'transfers': {'t1': {'status': 'done'}, 't2': None}}
+        self.collector.session.get = MagicMock(side_effect=[response(200, full), response(200, delta), response(304)])
+        self.collector.nodes = NODES[:1]
+        self.collector.fetch_all()
+        status = self.collector.fetch_all()['A']
+        self.assertEqual(self.collector.session.get.call_args.kwargs['params'], {'since': 5})
+        self.assertEqual(status['version'], 7)
+        self.assertEqual(status['vlans'], {'10': {'B': 'designated'}})
+        self.assertEqual(status['instances'], {'0': {'B': 'root'}})
+        self.assertEqual(status['transfers'], {'t1': {'status': 'done'}})
+        # Nothing changed since version 7
+        self.assertIs(self.collector.fetch_all()['A'], status)
+
+    def test_older_nodes_without_versions(self):
+        self.assertEqual(merge_status(None, {'vlans': {}}), {'vlans': {}})
+        self.collector.statuses['A'] = {'vlans': {}}
+        self.collector.session.get = MagicMock(return_value=response(200, {'vlans': {'10': {}}}))
+        self.assertEqual(self.collector.fetch_node('A', NODES[0][1]), {'vlans': {'10': {}}})
+        self.assertIsNone(self.collector.session.get.call_args.kwargs['params'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the parent directory to the Python path to import the collector service
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard.collector import RemoteCollector
+from dashboard.collector_server import TopologyCollector, create_app
+
+NODES = [("A", "http://A/status"), ("B", "http://B/status")]
+
+class TestCollectorServer(unittest.TestCase):
+
+    def setUp(self):
+        self.collector = TopologyCollector(NODES)
+        self.fetched = {"A": {"version": 1, "vlans": {}}, "B": None}
+        self.collector.collector.fetch_all = lambda: dict(self.fetched)
+        self.client = create_app(self.collector).test_client()
+
+    def tearDown(self):
+        self.collector.stop()
+
+    def test_snapshot_and_deltas(self):
+        self.collector.poll_once()
+        resp = self.client.get('/status')
+        full = resp.get_json()
+        self.assertEqual(full['nodes'], {"A": {"version": 1, "vlans": {}}, "B": None})
+        self.assertEqual(self.client.get('/status', headers={'If-None-Match': resp.headers['ETag']}).status_code, 304)
+
+        # Polling again with the same objects changes nothing
+        self.collector.poll_once()
+        self.assertEqual(self.client.get('/status', query_string={'since': full['version']}).status_code, 304)
+
+        self.fetched["B"] = {"version": 4, "vlans": {"10": {"A": "root"}}}
+        self.collector.poll_once()
+        delta = self.client.get('/status', query_string={'since': full['version']}).get_json()
+        self.assertTrue(delta['delta'])
+        self.assertEqual(delta['nodes'], {"B": self.fetched["B"]})
+
+    def test_stream_starts_with_the_snapshot(self):
+        self.collector.poll_once()
+        resp = self.client.get('/status/stream')
+        first = next(resp.response)
+        self.assertIn(b'"delta": false', first)
+        resp.close()
+
+    def test_remote_collector(self):
+        """A dashboard reading from the service sees the same statuses the service polled."""
+        def get(url, params=None, timeout=None):
+            resp = self.client.get('/status', query_string=params)
+            result = MagicMock(status_code=resp.status_code)
+            result.json.return_value = resp.get_json()
+            return result
+        remote = RemoteCollector("http://collector:8050/")
+        remote.session.get = MagicMock(side_effect=get)
+        self.collector.poll_once()
+        self.assertEqual(remote.fetch_all(), {"A": {"version": 1, "vlans": {}}, "B": None})
+        self.fetched["A"] = None
+        self.collector.poll_once()
+        self.assertEqual(remote.fetch_all(), {"A": None, "B": None})
+        self.assertEqual(remote.fetch_all(), {"A": None, "B": None})
+        self.assertEqual(remote.session.get.call_args.kwargs['params'], {'since': self.collector.log.version})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the plot
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import to_rgba
+from dashboard.topology_plot import TopologyPlot, EdgeStates, ACTIVE, BLOCKED, ABSENT
+
+POS = {'A': (0.0, 0.0), 'B': (1.0, 0.0), 'C': (0.5, 1.0)}
+LINKS = [('A', 'B'), ('B', 'C'), ('C', 'A')]
+COLUMNS = [('vlans', '10'), ('vlans', '20'), ('instances', '0')]
+
+def status(ports):
+    return {'vlans': {'10': ports, '20': ports}}
+
+STATUSES = {
+    'A': status({'B': 'designated', 'C': 'designated'}),
+    'B': status({'A': 'root', 'C': 'designated'}),
+    'C': status({'A': 'root', 'B': 'blocked'}),
+}
+
+class TestTopologyPlot(unittest.TestCase):
+
+    def setUp(self):
+        self.fig, self.ax = plt.subplots()
+        self.plot = TopologyPlot(self.fig, self.ax, POS, LINKS, POS, COLUMNS)
+
+    def tearDown(self):
+        plt.close(self.fig)
+
+    def test_edge_states(self):
+        states = EdgeStates(LINKS, COLUMNS).compute(STATUSES)
+        self.assertEqual(states.tolist(), [[ACTIVE, ACTIVE, ABSENT], [BLOCKED, BLOCKED, ABSENT], [ACTIVE, ACTIVE, ABSENT]])
+        states = EdgeStates([('A', 'B')], COLUMNS).compute({'A': None, 'B': STATUSES['B']})
+        self.assertEqual(states.tolist(), [[ABSENT, ABSENT, ABSENT]])
+
+    def test_views(self):
+        self.plot.update(STATUSES, [], 0)
+        colors = self.plot.edges.get_colors()
+        self.assertEqual([tuple(c) for c in colors], [to_rgba('purple'), to_rgba('lightgray'), to_rgba('purple')])
+        self.assertEqual(self.plot.badges[1].get_text(), 'Blocked: 10, 20')
+        self.plot.set_view(('vlans', '20'))
+        self.assertEqual(self.plot.update(STATUSES, [], 0), 'full')
+        self.assertEqual(tuple(self.plot.edges.get_colors()[0]), to_rgba('blue'))
+        self.assertEqual(self.plot.badges[1].get_text(), 'Blocked: 20')
+        self.assertEqual(self.ax.get_title(), 'VLAN 20 - Active and Blocked Links')
+
+    def test_many_vlans(self):
+        """500 links x 200 VLANs: one status round is turned into colours quickly."""
+        n = 500
+        links = [(f'N{i}', f'N{i + 1}') for i in range(n)]
+        columns = [('vlans', str(v)) for v in range(200)]
+        ports = {f'N{i}': {} for i in range(n + 1)}
+        for u, v in links:
+            ports[u][v] = 'designated'; ports[v][u] = 'root'
+        ports['N0']['N1'] = 'blocked'
+        statuses = {node: {'vlans': {key: p for _, key in columns}} for node, p in ports.items()}
+        edge_states = EdgeStates(links, columns)
+        states = edge_states.compute(statuses)
+        self.assertEqual(states.shape, (n, 200))
+        self.assertTrue((states[0] == BLOCKED).all())
+        self.assertTrue((states[1:] == ACTIVE).all())
+        pos = {node: (i, 0) for i, node in enumerate(ports)}
+        plot = TopologyPlot(self.fig, self.ax, list(ports), links, pos, columns)
+        colors = plot.link_colors(states)
+        self.assertEqual(tuple(colors[1]), to_rgba('purple'))
+        self.assertEqual(plot._blocked_labels(states)[0], 'Blocked: 0, 1, 2, 3 +196')
+
+    def test_only_changes_are_redrawn(self):
+        self.assertEqual(self.plot.update(STATUSES, [], 0), 'full')
+        self.assertTrue(self.plot.badges[1].get_visible())
+        self.assertEqual(self.plot.badges[1].get_text(), 'Blocked: 10, 20')
+        self.assertEqual(self.plot.update(STATUSES, [], 0), 'none')
+        # A transfer moving along the path only blits the animated artists
+        self.assertEqual(self.plot.update(STATUSES, ['B', 'A', 'C'], 0), 'blit')
+        self.assertEqual(self.plot.update(STATUSES, ['B', 'A', 'C'], 1), 'blit')
+        self.assertEqual(list(self.plot.marker.get_xdata()), [0.0])
+        self.assertEqual(len(self.plot.path.get_segments()), 2)
+        # A port state change redraws the links
+        self.assertEqual(self.plot.update(dict(STATUSES, C=None), ['B', 'A', 'C'], 1), 'full')
+        self.assertFalse(self.plot.badges[1].get_visible())
+
+    def test_artists_are_reused(self):
+        self.plot.update(STATUSES, [], 0)
+        artists = len(self.ax.get_children())
+        for hop in range(3):
+            self.plot.update(dict(STATUSES, C=None) if hop % 2 else STATUSES, ['B', 'A', 'C'], hop)
+        self.assertEqual(len(self.ax.get_children()), artists)
+
+if __name__ == '__main__':
+    unittest.main()
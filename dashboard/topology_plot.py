@@ -0,0 +1,216 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+
+EDGE_WIDTH = 4
+PATH_COLOR = '#ff8c00'
+IDLE_COLOR = 'lightgray'
+SEVERAL_COLOR = 'purple' # Links active in more than one of the VLANs shown
+# One colour per VLAN or instance, in column order; the first two keep the original green and blue
+PALETTE = ['green', 'blue'] + [plt.cm.tab20(i) for i in range(20)]
+LEGEND_VLANS = 8 # At most this many VLANs get a legend entry in the all-VLAN view
+BADGE_VLANS = 4 # At most this many blocked VLANs are listed on a link's badge
+
+ABSENT, ACTIVE, BLOCKED = 0, 1, 2
+
+
+def column_label(column):
+    section, key = column
+    return f"VLAN {key}" if section == 'vlans' else f"MSTI {key}"
+
+
+class EdgeStates:
+    """
+    Turns the nodes' /status into a links x columns array of ABSENT, ACTIVE or BLOCKED,
+    where a column is a VLAN ('vlans', '10') or an MST instance ('instances', '1').
+    One pass over the reported ports fills both ends of every link; the per-link
+    state is then worked out for all columns at once. A link is blocked in a column
+    if either end has blocked it, and active if both ends report it otherwise.
+    A node's ports are only walked again when its status object changes.
+    """
+    def __init__(self, links, columns):
+        self.links = list(links)
+        self.columns = list(columns)
+        self._column = {column: j for j, column in enumerate(self.columns)}
+        self._sections = sorted({section for section, _ in self.columns})
+        self._ends = {} # {node_id: {neighbor_id: (link index, end)}}
+        for i, (u, v) in enumerate(self.links):
+            self._ends.setdefault(u, {})[v] = (i, 0)
+            self._ends.setdefault(v, {})[u] = (i, 1)
+        self._cache = {} # {node_id: (status it was computed from, its ports)}
+
+    def _node_ports(self, node_id, status):
+        """(link indices, columns, ends, codes) of the ports one node reports."""
+        node_ends = self._ends.get(node_id, {})
+        rows, cols, ends, codes = [], [], [], []
+        for section in self._sections:
+            for key, ports in (status.get(section) or {}).items():
+                j = self._column.get((section, str(key)))
+                if j is None:
+                    continue
+                for neighbor, state in ports.items():
+                    slot = node_ends.get(neighbor)
+                    if slot is not None:
+                        rows.append(slot[0]); ends.append(slot[1]); cols.append(j)
+                        codes.append(BLOCKED if state == 'blocked' else ACTIVE)
+        return (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(ends, dtype=np.intp),
+                np.array(codes, dtype=np.uint8))
+
+    def compute(self, statuses):
+        port = np.zeros((len(self.links), len(self.columns), 2), dtype=np.uint8)
+        for node_id, status in statuses.items():
+            if not status or node_id not in self._ends:
+                continue
+            # The collector hands back the same object for a node that has not changed
+            cached = self._cache.get(node_id)
+            if cached is None or cached[0] is not status:
+                cached = self._cache[node_id] = (status, self._node_ports(node_id, status))
+            rows, cols, ends, codes = cached[1]
+            port[rows, cols, ends] = codes
+        states = np.where((port == ACTIVE).all(axis=2), ACTIVE, ABSENT).astype(np.uint8)
+        states[(port == BLOCKED).any(axis=2)] = BLOCKED
+        return states
+
+
+class TopologyPlot:
+    """
+    The network drawn once into a matplotlib axes and then only updated. Links are a
+    single LineCollection whose colours change, nodes and labels are fixed artists
+    and blocked-VLAN badges are shown or hidden. The transfer path and the marker
+    of the current hop are animated artists blitted over a cached background, so a
+    hop moving costs two artists, and an unchanged state costs nothing.
+
+    `columns` are the VLANs and instances that can be shown (see EdgeStates). With no
+    view selected every VLAN column is shown: a link takes the colour of the one VLAN
+    active on it, or SEVERAL_COLOR. set_view() shows a single VLAN or instance instead.
+    """
+    def __init__(self, fig, ax, node_ids, links, pos, columns):
+        self.fig, self.ax = fig, ax
+        self.node_ids = list(node_ids)
+        self.links = [(u, v) for u, v in links if u in pos and v in pos]
+        self.pos = pos
+        self.edge_states = EdgeStates(self.links, columns)
+        self.columns = self.edge_states.columns
+        self._palette = np.array([to_rgba(PALETTE[j % len(PALETTE)]) for j in range(len(self.columns))]).reshape(-1, 4)
+        self._vlan_columns = np.array([section == 'vlans' for section, _ in self.columns], dtype=bool)
+        self.view = None # Column shown on its own, None for all VLANs
+        self._background = None
+        self._state = None # What is on screen: (view, states, path, hop)
+
+        self.edges = LineCollection([(pos[u], pos[v]) for u, v in self.links], colors=IDLE_COLOR,
+                                    linewidths=EDGE_WIDTH, zorder=1)
+        ax.add_collection(self.edges)
+        xs, ys = zip(*(pos[n] for n in self.node_ids)) if self.node_ids else ((), ())
+        ax.scatter(xs, ys, s=700, c='skyblue', zorder=2)
+        for node_id in self.node_ids:
+            ax.text(*pos[node_id], node_id, color='white', fontsize=12, fontweight='bold',
+                    ha='center', va='center', zorder=3)
+        self.badges = [ax.text((pos[u][0] + pos[v][0]) / 2, (pos[u][1] + pos[v][1]) / 2, '', color='white',
+                               ha='center', va='center', fontsize=8, zorder=10, visible=False,
+                               bbox=dict(facecolor='#d62728', alpha=0.9, pad=2, edgecolor='none'))
+                       for u, v in self.links]
+        self._shown_badges = np.zeros(len(self.links), dtype=bool)
+        # Animated artists are left out of full draws and blitted on top
+        self.path = LineCollection([], colors=PATH_COLOR, linewidths=EDGE_WIDTH + 1, linestyles='dotted',
+                                   zorder=11, animated=True)
+        ax.add_collection(self.path)
+        self.marker, = ax.plot([], [], 'o', color='yellow', markersize=18, markeredgecolor='black',
+                               zorder=12, animated=True)
+        ax.autoscale_view()
+        ax.margins(0.15)
+        ax.axis('off')
+        fig.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def set_view(self, column):
+        """Shows one column (e.g. ('vlans', '10')) on its own, or every VLAN with None."""
+        self.view = column if column in self.columns else None
+
+    def _on_draw(self, event):
+        """Any full draw (ours or a resize) refreshes the cached background."""
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.ax.draw_artist(self.path)
+        self.ax.draw_artist(self.marker)
+
+    def link_colors(self, states):
+        """RGBA colour of every link for the current view."""
+        colors = np.tile(to_rgba(IDLE_COLOR), (len(self.links), 1))
+        if self.view is not None:
+            j = self.columns.index(self.view)
+            colors[states[:, j] == ACTIVE] = self._palette[j]
+            return colors
+        active = (states == ACTIVE) & self._vlan_columns
+        count = active.sum(axis=1)
+        single = count == 1
+        colors[single] = self._palette[active[single].argmax(axis=1)]
+        colors[count > 1] = to_rgba(SEVERAL_COLOR)
+        return colors
+
+    def _blocked_labels(self, states):
+        """{link index: badge text} for the links with a blocked VLAN or instance in view."""
+        shown = (np.arange(len(self.columns)) == self.columns.index(self.view)) if self.view else self._vlan_columns
+        blocked = (states == BLOCKED) & shown
+        labels = {}
+        for i in np.flatnonzero(blocked.any(axis=1)):
+            keys = [self.columns[j][1] for j in np.flatnonzero(blocked[i])]
+            more = f" +{len(keys) - BADGE_VLANS}" if len(keys) > BADGE_VLANS else ''
+            labels[i] = f"Blocked: {', '.join(keys[:BADGE_VLANS])}{more}"
+        return labels
+
+    def _legend(self):
+        if self.view is not None:
+            entries = [(self._palette[self.columns.index(self.view)], f"{column_label(self.view)} Active")]
+        else:
+            vlans = list(np.flatnonzero(self._vlan_columns))
+            entries = [(self._palette[j], f"{column_label(self.columns[j])} Active") for j in vlans[:LEGEND_VLANS]]
+            if len(vlans) > 1:
+                entries.append((SEVERAL_COLOR, 'Several VLANs Active'))
+        handles = [plt.Line2D([0], [0], color=color, lw=3, label=label) for color, label in entries]
+        handles.append(plt.Line2D([0], [0], color=PATH_COLOR, lw=3, ls='dotted', label='Transfer Path'))
+        # Below the axes, in 2 columns
+        self.ax.legend(handles=handles, loc='lower center', bbox_to_anchor=(0.5, -0.3), ncol=2)
+        title = column_label(self.view) if self.view else "MSTP VLAN Tree"
+        self.ax.set_title(f"{title} - Active and Blocked Links")
+
+    def update(self, statuses, anim_path, anim_hop):
+        """Brings the plot up to date. Returns 'none', 'blit' or 'full' for the redraw it took."""
+        states = self.edge_states.compute(statuses)
+        previous = self._state
+        static_changed = (previous is None or previous[0] != self.view or not np.array_equal(previous[1], states))
+        animated = (tuple(anim_path or ()), anim_hop)
+        if not static_changed and previous[2:] == animated:
+            return 'none'
+        self._state = (self.view, states) + animated
+
+        path = [n for n in (anim_path or []) if n in self.pos]
+        self.path.set_segments([(self.pos[a], self.pos[b]) for a, b in zip(path, path[1:])])
+        if anim_path and anim_hop < len(anim_path) and anim_path[anim_hop] in self.pos:
+            x, y = self.pos[anim_path[anim_hop]]
+            self.marker.set_data([x], [y])
+        else:
+            self.marker.set_data([], [])
+
+        if static_changed or self._background is None:
+            if previous is None or previous[0] != self.view:
+                self._legend()
+            self.edges.set_colors(self.link_colors(states))
+            labels = self._blocked_labels(states)
+            # Only touch the badges that appear, change or disappear
+            for i in np.flatnonzero(self._shown_badges):
+                if i not in labels:
+                    self.badges[i].set_visible(False)
+                    self._shown_badges[i] = False
+            for i, text in labels.items():
+                self.badges[i].set_text(text)
+                self.badges[i].set_visible(True)
+                self._shown_badges[i] = True
+            self.fig.canvas.draw() # Calls _on_draw
+            return 'full'
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        self._draw_animated()
+        canvas.blit(self.ax.bbox)
+        return 'blit'
@@ -0,0 +1,34 @@
+import argparse
+from mstp import topogen
+
+def generate(name, size, vlan_count, instance_count, density, output, host="127.0.0.1", base_port=5000, seed=0):
+    """Writes a generated topology for config.load_topology and returns it."""
+    if name == 'random':
+        nodes, links = topogen.random_graph(size, seed=seed)
+    else:
+        nodes, links = topogen.build(name, size)
+    vlans = topogen.assign_vlans(links, vlan_count, density, seed=seed)
+    instances = topogen.assign_instances(vlans, instance_count)
+    return topogen.write_topology(output, nodes, links, vlans, instances, host, base_port)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a topology file to run with MSTP_TOPOLOGY or cluster.py.")
+    parser.add_argument("topology", choices=sorted(topogen.TOPOLOGIES))
+    parser.add_argument("size", type=int, help="Nodes for ring/mesh/tree/random, side for grid, k for fat-tree, leaves for clos.")
+    parser.add_argument("--vlans", type=int, default=2, help="Number of VLANs, numbered from 10.")
+    parser.add_argument("--instances", type=int, default=2, help="MST instances the VLANs are spread over (0: all on the CIST).")
+    parser.add_argument("--density", type=float, default=1.0, help="Fraction of the links each VLAN is on.")
+    parser.add_argument("--host", default="127.0.0.1", help="IP address of every node.")
+    parser.add_argument("--base-port", type=int, default=5000, help="Port of the first node; the others follow.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", default="topology.json")
+    args = parser.parse_args()
+    if args.instances < 0:
+        parser.error("--instances must be 0 or more")
+
+    topology = generate(args.topology, args.size, args.vlans, args.instances, args.density, args.output,
+                        args.host, args.base_port, args.seed)
+    ports = list(topology['Port_Number'].values())
+    print(f"Wrote {len(ports)} nodes, {len(topology['Link_connected'])} links and {len(topology['VLANS'])} VLANs "
+          f"to {args.output} (ports {ports[0]}-{ports[-1]})")
+    print(f"Start it with: python cluster.py start --topology {args.output} --wait")
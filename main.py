@@ -4,9 +4,28 @@ import sys
 import argparse
 from mstp.network import NetworkNode
 from mstp.server import start_server
+from mstp.transport import TRANSPORTS, create_transport
 import config
 
-def run_node(node_id):
+def run_async_node(node_id, port, vlan_ids, neighbors, transport=None):
+    """Runs the node and its HTTP API on a single asyncio event loop."""
+    try:
+        from mstp.async_network import AsyncNetworkNode
+        from mstp.async_server import start_async_server
+    except ImportError:
+        print("Error: the asyncio runtime requires aiohttp (pip install aiohttp)")
+        sys.exit(1)
+
+    node = AsyncNetworkNode(node_id, vlan_ids, neighbors, transport=transport)
+    print(f"Node {node_id} is running on asyncio. Press Ctrl+C to stop.")
+    print("-" * 50)
+    try:
+        start_async_server(node, port)
+    except KeyboardInterrupt:
+        print(f"\nShutting down Node {node_id}...")
+        sys.exit(0)
+
+def run_node(node_id, runtime="threaded", transport_name=config.BPDU_TRANSPORT):
     """Initializes and runs a single node."""
     if node_id not in config.Ip_address:
         print(f"Error: Node ID '{node_id}' not found in config.py")
@@ -19,9 +38,17 @@ def run_node(node_id):
     
     print("=" * 50)
     print(f"Starting Node {node_id} on {ip_address}:{port}")
+    print(f"BPDU transport: {transport_name}")
     print("=" * 50)
+
+    # HTTP BPDUs use the runtime's own client; other transports are built here.
+    transport = None if transport_name == "http" else create_transport(transport_name, node_id, neighbors)
+
+    if runtime == "asyncio":
+        run_async_node(node_id, port, vlan_ids, neighbors, transport)
+        return
     
-    node = NetworkNode(node_id, vlan_ids, neighbors)
+    node = NetworkNode(node_id, vlan_ids, neighbors, transport=transport)
     
     server_thread = threading.Thread(target=start_server, args=(node, port), daemon=True)
     server_thread.start()
@@ -42,6 +69,12 @@ def run_node(node_id):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run a single MSTP network node.")
     parser.add_argument("node_id", type=str, help="The ID of the node to run (e.g., A, B, C).")
+    parser.add_argument("--runtime", choices=["threaded", "asyncio"], default="threaded",
+                        help="threaded: Flask with a thread per request and timer (default). "
+                             "asyncio: aiohttp server with all transfers on one event loop.")
+    parser.add_argument("--transport", choices=TRANSPORTS, default=config.BPDU_TRANSPORT,
+                        help="How BPDUs travel between nodes: http (default) or udp datagrams. "
+                             "All nodes must use the same transport.")
     args = parser.parse_args()
     
-    run_node(args.node_id.upper())
\ No newline at end of file
+    run_node(args.node_id.upper(), args.runtime, args.transport)
\ No newline at end of file
@@ -0,0 +1,209 @@
+import sys
+import os
+import asyncio
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.network import NetworkNode
+from mstp.peers import CircuitBreaker, PeerStats, BINARY_FRAME_ENDPOINT, JSON_FRAME_ENDPOINT, UNSUPPORTED_STATUS
+from mstp.bpdu_codec import CONTENT_TYPE, encode_frame
+from mstp.transport import HttpTransport
+import config
+
+
+class AsyncPeerPool:
+    """
+    asyncio counterpart of PeerPool: one shared keep-alive ClientSession, a
+    circuit breaker, send stats and BPDU wire format per neighbor, and at most
+    one message in flight to each neighbor (newer messages wait, replacing
+    older waiting ones).
+    """
+    def __init__(self, session, neighbors, timeout=1.5, wire_format='binary'):
+        self.session = session
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.urls = dict(neighbors)
+        self.breakers = {neighbor_id: CircuitBreaker() for neighbor_id in self.urls}
+        self.stats = {neighbor_id: PeerStats() for neighbor_id in self.urls}
+        self.wire_formats = {neighbor_id: wire_format for neighbor_id in self.urls}
+        self.in_flight = set()
+        self.pending = {}
+        self._tasks = set() # The loop only keeps weak references to tasks
+
+    def send(self, neighbor_id, endpoint, data):
+        """Schedules a JSON message to one neighbor. Returns False if it was skipped."""
+        return self._submit(neighbor_id, self._post, (neighbor_id, endpoint, data))
+
+    def send_frame(self, neighbor_id, frame):
+        """Schedules a BPDU frame to one neighbor. Returns False if it was skipped."""
+        return self._submit(neighbor_id, self._post_frame, (neighbor_id, frame))
+
+    def _submit(self, neighbor_id, method, args):
+        if neighbor_id not in self.urls:
+            return False
+        if neighbor_id in self.in_flight:
+            if neighbor_id in self.pending:
+                self.stats[neighbor_id].coalesced += 1
+            self.pending[neighbor_id] = (method, args)
+            return True
+        if not self.breakers[neighbor_id].allow():
+            self.stats[neighbor_id].skipped += 1
+            return False
+        self.in_flight.add(neighbor_id)
+        task = asyncio.get_running_loop().create_task(self._send_all(neighbor_id, method, args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _send_all(self, neighbor_id, method, args):
+        """Sends a message, then whatever replaced it while it was in flight."""
+        try:
+            while True:
+                await method(*args)
+                if neighbor_id not in self.pending or not self.breakers[neighbor_id].allow():
+                    break
+                method, args = self.pending.pop(neighbor_id)
+        finally:
+            self.pending.pop(neighbor_id, None)
+            self.in_flight.discard(neighbor_id)
+
+    async def _request(self, neighbor_id, endpoint, **kwargs):
+        """Returns (HTTP status or None on a connection error, latency in ms)."""
+        started = time.perf_counter()
+        try:
+            async with self.session.post(f'{self.urls[neighbor_id]}{endpoint}', timeout=self.timeout, **kwargs) as resp:
+                await resp.read()
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            status = None
+        return status, (time.perf_counter() - started) * 1000
+
+    def _record(self, neighbor_id, status, latency_ms):
+        if status is not None and status < 400:
+            self.stats[neighbor_id].record(latency_ms)
+            self.breakers[neighbor_id].record_success()
+        else:
+            self.stats[neighbor_id].failures += 1
+            self.breakers[neighbor_id].record_failure()
+
+    async def _post(self, neighbor_id, endpoint, data):
+        self._record(neighbor_id, *await self._request(neighbor_id, endpoint, json=data))
+
+    async def _post_frame(self, neighbor_id, frame):
+        """Same negotiation as PeerLink.post_frame: binary first, JSON for neighbors that refuse it."""
+        if self.wire_formats[neighbor_id] == 'binary':
+            try:
+                body = encode_frame(frame['from'], frame['bpdus'])
+            except ValueError:
+                self.wire_formats[neighbor_id] = 'json'
+            else:
+                status, latency_ms = await self._request(neighbor_id, BINARY_FRAME_ENDPOINT, data=body,
+                                                         headers={'Content-Type': CONTENT_TYPE})
+                if status not in UNSUPPORTED_STATUS:
+                    self._record(neighbor_id, status, latency_ms)
+                    return
+                self.wire_formats[neighbor_id] = 'json'
+        await self._post(neighbor_id, JSON_FRAME_ENDPOINT, frame)
+
+    def get_stats(self):
+        return {neighbor_id: dict(self.stats[neighbor_id].to_dict(), breaker=self.breakers[neighbor_id].state,
+                                  wire_format=self.wire_formats[neighbor_id])
+                for neighbor_id in self.urls}
+
+    def close(self):
+        pass # The session belongs to the node
+
+
+class AsyncNetworkNode(NetworkNode):
+    """
+    A NetworkNode that runs entirely on one asyncio event loop.
+
+    The protocol and transfer logic is inherited unchanged; only the I/O hooks
+    differ. Transfer hops and notifications are tasks on a shared ClientSession,
+    and timers (final-hop delay, status cleanup) are `loop.call_later` callbacks,
+    so a burst of transfers costs coroutines and timer handles instead of threads.
+    At most TRANSFER_QUEUE_SIZE posts are in flight at once; further ones are refused
+    like a full worker queue. All methods must be called from the event loop thread.
+    """
+    def __init__(self, node_id, vlan_ids, neighbors, **kwargs):
+        super().__init__(node_id, vlan_ids, neighbors, **kwargs)
+        self.loop = None
+        self._session = None
+        self._bpdu_task = None
+        self._async_wakeup = None
+        self._tasks = set() # Posts in flight; the loop only keeps weak references to tasks
+        self.workers = None # Posts are loop tasks, bounded by max_in_flight
+        self.max_in_flight = config.TRANSFER_QUEUE_SIZE
+        self.posts_submitted = 0
+        self.posts_rejected = 0
+
+    async def start(self):
+        """Binds the node to the running loop. Must be awaited before serving requests."""
+        self.loop = asyncio.get_running_loop()
+        self._async_wakeup = asyncio.Event()
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0, keepalive_timeout=30))
+        if self.transport is None:
+            self.transport = HttpTransport(AsyncPeerPool(self._session, self.neighbors, timeout=1.5,
+                                                         wire_format=config.BPDU_WIRE_FORMAT))
+
+    def start_bpdu_loop(self):
+        self.start_transport()
+        self._bpdu_task = self.loop.create_task(self._async_bpdu_sender_loop())
+
+    async def _async_bpdu_sender_loop(self):
+        await asyncio.sleep(4)
+        next_hello = 0
+        while not self._stop_event.is_set():
+            next_hello = self._bpdu_tick(next_hello)
+            try:
+                await asyncio.wait_for(self._async_wakeup.wait(), timeout=max(0, next_hello - time.monotonic()))
+            except asyncio.TimeoutError:
+                continue
+            self._async_wakeup.clear()
+            await asyncio.sleep(config.BPDU_HOLD_TIME)
+
+    async def close(self):
+        self._stop_event.set()
+        if self._bpdu_task: self._bpdu_task.cancel()
+        if self.transport: self.transport.close()
+        if self._session: await self._session.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    # --- I/O hooks ---
+    def _dispatch(self, fn, *args):
+        # Datagram transports receive on their own thread; hand the frame to the loop.
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def _wake_bpdu_sender(self):
+        if self._async_wakeup: self._async_wakeup.set()
+
+    def _post(self, url, data, timeout, on_error=None):
+        if self._is_overloaded():
+            self.posts_rejected += 1
+            if on_error: self.loop.call_soon(on_error)
+            return
+        self.posts_submitted += 1
+        task = self.loop.create_task(self._async_post(url, data, timeout, on_error))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_post(self, url, data, timeout, on_error):
+        try:
+            async with self._session.post(url, json=data, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                await resp.read()
+        except Exception:
+            if on_error: on_error()
+
+    def _call_later(self, delay, fn, *args):
+        return self.loop.call_later(delay, fn, *args)
+
+    def _is_overloaded(self):
+        return len(self._tasks) >= self.max_in_flight
+
+    def get_worker_stats(self):
+        # Outbound posts are tasks on the loop, not worker threads
+        return {'in_flight': len(self._tasks), 'max_in_flight': self.max_in_flight,
+                'submitted': self.posts_submitted, 'rejected': self.posts_rejected}
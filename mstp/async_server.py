@@ -0,0 +1,189 @@
+import sys, os
+import asyncio
+
+from aiohttp import web
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mstp.bpdu_codec import CONTENT_TYPE, decode_frame
+from mstp.status import SSE_KEEPALIVE, etag, parse_version, sse_event
+import config
+
+# Same HTTP API as mstp/server.py, served from a single asyncio event loop.
+routes = web.RouteTableDef()
+NODE_KEY = web.AppKey('node', object)
+
+def _not_initialized():
+    return web.json_response({'error': 'Node not initialized'}, status=400)
+
+@routes.post('/bpdu')
+async def receive_bpdu(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    if 'msti' in data:
+        node.receive_instance_bpdu(data['msti'], data['from'], data['bpdu'])
+    else:
+        node.receive_bpdu(data['vlan_id'], data['from'], data['bpdu'])
+    return web.json_response({'status': 'received'})
+
+@routes.post('/bpdus')
+async def receive_bpdu_batch(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    node.receive_bpdu_batch(data['from'], data['bpdus'])
+    return web.json_response({'status': 'received', 'count': len(data['bpdus'])})
+
+@routes.post('/bpdu-frame')
+async def receive_bpdu_frame(request):
+    if request.content_type != CONTENT_TYPE:
+        return web.json_response({'error': f'Expected {CONTENT_TYPE}'}, status=415)
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    try:
+        sender_id, records = decode_frame(await request.read())
+    except ValueError as e:
+        return web.json_response({'error': str(e)}, status=400)
+    node.receive_bpdu_batch(sender_id, records)
+    return web.Response(status=204)
+
+@routes.post('/lsa')
+async def receive_lsas(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    installed = node.receive_lsas(data['from'], data['lsas'])
+    return web.json_response({'status': 'received', 'installed': installed})
+
+@routes.post('/initiate-transfer')
+async def initiate_transfer(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    try:
+        transfer_id = node.send_transfer(
+            dst_id=data['dst'],
+            payload="data",
+            file_size_mb=data['file_size_mb'],
+            vlan_id=data['vlan_id'],
+            mode=data.get('mode')
+        )
+    except ValueError as e: # Unknown transfer mode
+        return web.json_response({'error': str(e)}, status=400)
+    if node.transfer_status.get(transfer_id, {}).get('status') == 'rejected':
+        return web.json_response({'error': 'Node overloaded', 'transfer_id': transfer_id}, status=503)
+    return web.json_response({'status': 'transfer initiated', 'transfer_id': transfer_id})
+
+@routes.post('/transfer')
+async def receive_transfer_hop(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    node.receive_transfer(
+        transfer_id=data['transfer_id'],
+        src=data['src'],
+        dst=data['dst'],
+        payload=data['payload'],
+        file_size_mb=data['file_size_mb'],
+        vlan_id=data['vlan_id'],
+        hops=data['hops'],
+        path=data['path']
+    )
+    return web.json_response({'status': 'hop received'})
+
+@routes.post('/transfer-chunk')
+async def receive_transfer_chunk(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    node.receive_chunk(**await request.json())
+    return web.json_response({'status': 'chunk received'})
+
+@routes.post('/chunk-ack')
+async def receive_chunk_ack(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    node.receive_chunk_ack(data['transfer_id'], data.get('count', 1))
+    return web.json_response({'status': 'credit received'})
+
+@routes.post('/complete-transfer')
+async def complete_transfer(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    node.complete_transfer(data['transfer_id'])
+    return web.json_response({'status': 'completion noted'})
+
+@routes.post('/fail-transfer')
+async def fail_transfer(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    data = await request.json()
+    node.fail_transfer(data['transfer_id'])
+    return web.json_response({'status': 'failure noted'})
+
+@routes.get('/status')
+async def status(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    since = parse_version(request.query.get('since'))
+    known = since if since is not None else parse_version(request.headers.get('If-None-Match'))
+    try: wait = min(float(request.query.get('wait', 0)), config.STATUS_MAX_WAIT)
+    except ValueError: wait = 0
+    if known == node.status_log.version and wait > 0:
+        await node.status_log.wait_async(known, wait)
+    if known == node.status_log.version:
+        return web.Response(status=304, headers={'ETag': etag(known)})
+    # json.dumps turns the integer VLAN and instance keys into strings, as Flask's jsonify does
+    body = node.get_status(since)
+    return web.json_response(body, headers={'ETag': etag(body['version'])})
+
+@routes.get('/status/stream')
+async def status_stream(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    since = parse_version(request.headers.get('Last-Event-ID') or request.query.get('since'))
+    response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+    await response.prepare(request)
+    while True:
+        if since == node.status_log.version:
+            if not await node.status_log.wait_async(since, config.STATUS_MAX_WAIT):
+                await response.write(SSE_KEEPALIVE.encode())
+                continue
+        body = node.get_status(since)
+        since = body['version']
+        await response.write(sse_event(body).encode())
+
+@routes.get('/metrics')
+async def metrics(request):
+    node = request.app[NODE_KEY]
+    if not node: return _not_initialized()
+    return web.json_response({
+        'node_id': node.node_id,
+        'transport': node.get_transport_name(),
+        'peers': node.get_peer_stats(),
+        'workers': node.get_worker_stats()
+    })
+
+def create_app(network_node):
+    app = web.Application()
+    app[NODE_KEY] = network_node
+    app.add_routes(routes)
+    return app
+
+async def serve(network_node, port):
+    """Runs the node and its HTTP API on the current event loop until cancelled."""
+    host_ip = config.Ip_address.get(network_node.node_id, '127.0.0.1')
+    await network_node.start()
+    runner = web.AppRunner(create_app(network_node), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host_ip, port).start()
+    network_node.start_bpdu_loop()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await network_node.close()
+        await runner.cleanup()
+
+def start_async_server(network_node, port):
+    asyncio.run(serve(network_node, port))
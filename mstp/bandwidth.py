@@ -0,0 +1,84 @@
+import math
+
+
+def max_min_rates(flows, capacity):
+    """
+    Max-min fair rates by progressive filling. `flows` maps a flow ID to the links it
+    crosses, `capacity` maps each link to its capacity (MB/s). The link offering the
+    smallest equal share to its remaining flows is the bottleneck for all of them;
+    they are fixed at that share, which is taken off every other link they cross,
+    and the process repeats. A flow that crosses no link is not limited (inf).
+    """
+    rates = {flow_id: math.inf for flow_id, links in flows.items() if not links}
+    users = {}
+    for flow_id, links in flows.items():
+        for link in links:
+            users.setdefault(link, set()).add(flow_id)
+    remaining = {link: capacity[link] for link in users}
+    while True:
+        candidates = [(remaining[link] / len(flow_ids), link) for link, flow_ids in users.items() if flow_ids]
+        if not candidates:
+            return rates
+        share, bottleneck = min(candidates)
+        for flow_id in list(users[bottleneck]):
+            rates[flow_id] = share
+            for link in flows[flow_id]:
+                remaining[link] = max(0.0, remaining[link] - share)
+                users[link].discard(flow_id)
+
+
+class FluidFlows:
+    """
+    Transfers modelled as fluid flows that share link capacity max-min fairly.
+    Rates are recomputed whenever a flow starts or finishes, and the next completion
+    is scheduled through `schedule(delay, fn, *args)` on the caller's clock.
+    """
+    EPSILON_MB = 1e-9
+
+    def __init__(self, capacity_of, clock, schedule):
+        self.capacity_of = capacity_of # (node1, node2) -> MB/s
+        self.clock = clock
+        self.schedule = schedule
+        self.flows = {} # {flow_id: {'links', 'remaining_mb', 'rate', 'on_done'}}
+        self._updated_at = clock()
+        self._generation = 0 # Completion events from before the last reallocation are stale
+
+    def start(self, flow_id, path, size_mb, on_done):
+        """Starts a flow along `path` (a list of node IDs); `on_done()` is called when it has finished."""
+        self._advance()
+        links = list(zip(path, path[1:]))
+        self.flows[flow_id] = {'links': links, 'remaining_mb': size_mb, 'rate': 0.0, 'on_done': on_done}
+        self._reallocate()
+
+    def get_rates(self):
+        return {flow_id: flow['rate'] for flow_id, flow in self.flows.items()}
+
+    def _advance(self):
+        now = self.clock()
+        elapsed = now - self._updated_at
+        for flow in self.flows.values():
+            flow['remaining_mb'] -= flow['rate'] * elapsed
+        self._updated_at = now
+
+    def _reallocate(self):
+        links = {link for flow in self.flows.values() for link in flow['links']}
+        rates = max_min_rates({flow_id: flow['links'] for flow_id, flow in self.flows.items()},
+                              {link: self.capacity_of(*link) for link in links})
+        for flow_id, flow in self.flows.items():
+            flow['rate'] = rates[flow_id]
+        self._generation += 1
+        if self.flows:
+            next_done = min(max(0.0, flow['remaining_mb']) / flow['rate'] if flow['rate'] > 0 else math.inf
+                            for flow in self.flows.values())
+            if next_done != math.inf:
+                self.schedule(next_done, self._complete, self._generation)
+
+    def _complete(self, generation):
+        if generation != self._generation:
+            return
+        self._advance()
+        done = [flow_id for flow_id, flow in self.flows.items() if flow['remaining_mb'] <= self.EPSILON_MB]
+        finished = [self.flows.pop(flow_id) for flow_id in done]
+        self._reallocate()
+        for flow in finished:
+            flow['on_done']()
@@ -0,0 +1,61 @@
+import struct
+
+# Binary BPDU frames, modelled on the 802.1s MST BPDU: one header identifying the
+# transmitting bridge, followed by one fixed-size record per spanning-tree instance
+# (MSTI configuration messages in 802.1s). All fields are in network byte order.
+#
+#   Header (13 bytes)                     Record (14 bytes, repeated)
+#   +-------+---------+-------+--------+  +------+---------+-----------+
+#   | magic | version | count | sender |  | msti | root id | root cost |
+#   |  2s   |    B    |   H   |   8s   |  |  H   |   8s    |     I     |
+#   +-------+---------+-------+--------+  +------+---------+-----------+
+#
+# Bridge IDs are the node IDs from config.py, UTF-8 encoded and NUL padded to
+# 8 bytes (the size of an 802.1D bridge identifier).
+
+MAGIC = b'MB'
+VERSION = 1
+CONTENT_TYPE = 'application/x-mstp-bpdu'
+BRIDGE_ID_SIZE = 8
+
+HEADER = struct.Struct('!2sBH8s')
+RECORD = struct.Struct('!H8sI')
+
+
+def _encode_id(bridge_id):
+    raw = bridge_id.encode('utf-8')
+    if len(raw) > BRIDGE_ID_SIZE:
+        raise ValueError(f"Bridge ID {bridge_id!r} does not fit in {BRIDGE_ID_SIZE} bytes")
+    return raw
+
+
+def _decode_id(raw):
+    return raw.rstrip(b'\0').decode('utf-8')
+
+
+def encode_frame(sender_id, records):
+    """
+    Encodes a BPDU frame ({'from': sender_id, 'bpdus': records} in JSON form).
+    Every record's BPDU must have been generated by `sender_id`.
+    """
+    sender = _encode_id(sender_id)
+    parts = [HEADER.pack(MAGIC, VERSION, len(records), sender)]
+    for record in records:
+        bpdu = record['bpdu']
+        parts.append(RECORD.pack(record['msti'], _encode_id(bpdu['root_id']), bpdu['cost']))
+    return b''.join(parts)
+
+
+def decode_frame(data):
+    """Decodes a binary frame into (sender_id, records) as used by NetworkNode.receive_bpdu_batch."""
+    if len(data) < HEADER.size:
+        raise ValueError("BPDU frame is too short")
+    magic, version, count, sender = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version 1 MSTP BPDU frame")
+    if len(data) != HEADER.size + count * RECORD.size:
+        raise ValueError("BPDU frame length does not match its record count")
+    sender_id = _decode_id(sender)
+    records = [{'msti': msti, 'bpdu': {'sender_id': sender_id, 'root_id': _decode_id(root_id), 'cost': cost}}
+               for msti, root_id, cost in RECORD.iter_unpack(memoryview(data)[HEADER.size:])]
+    return sender_id, records
@@ -0,0 +1,48 @@
+from collections import deque
+
+
+class ForwardingTable:
+    """
+    Forwarding state of one VLAN's active tree as seen from one node: the next hop
+    and the path to every reachable destination. Built by a single BFS that records
+    parent pointers; lookups are dictionary reads and paths are walked back from them.
+    """
+    def __init__(self, root_id, adjacency):
+        self.root_id = root_id
+        self.parent = {root_id: None}
+        self.next_hop = {}
+        queue = deque([root_id])
+        while queue:
+            node = queue.popleft()
+            for neighbor in adjacency.get(node, ()):
+                if neighbor not in self.parent:
+                    self.parent[neighbor] = node
+                    self.next_hop[neighbor] = neighbor if node == root_id else self.next_hop[node]
+                    queue.append(neighbor)
+
+    @classmethod
+    def from_port_states(cls, root_id, vlan_port_states):
+        """
+        Builds the table from {node_id: {neighbor_id: state}} for one VLAN. A link is
+        on the active tree when neither end has blocked it.
+        """
+        adjacency = {}
+        for node, ports in vlan_port_states.items():
+            for neighbor, state in ports.items():
+                if state != 'blocked' and vlan_port_states.get(neighbor, {}).get(node, 'blocked') != 'blocked':
+                    adjacency.setdefault(node, []).append(neighbor)
+        return cls(root_id, adjacency)
+
+    def get_next_hop(self, dst_id):
+        return self.next_hop.get(dst_id)
+
+    def get_path(self, dst_id):
+        """[root_id, ..., dst_id], or None if dst_id is not reachable."""
+        if dst_id not in self.parent:
+            return None
+        path = []
+        while dst_id is not None:
+            path.append(dst_id)
+            dst_id = self.parent[dst_id]
+        path.reverse()
+        return path
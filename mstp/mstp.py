@@ -48,50 +48,110 @@ class MSTP:
         
         return False
 
+    def _own_priority(self):
+        """The priority vector this bridge would advertise if it were the root."""
+        return {'root_id': self.bridge_id, 'cost': 0, 'sender_id': self.bridge_id}
+
+    def _prospective_bpdu(self, bpdu):
+        """The root priority this bridge would have if it used the port `bpdu` arrived on."""
+        return {
+            'root_id': bpdu['root_id'],
+            'cost': bpdu['cost'] + 1, # Cost increases by 1 for each hop
+            'sender_id': bpdu['sender_id']
+        }
+
+    def _root_priority(self):
+        """The root priority vector currently in use (own vector if this bridge is root)."""
+        if self.root_port is None:
+            return self._own_priority()
+        return self._prospective_bpdu(self.received_bpdus[self.root_port])
+
+    def _select_root_port(self):
+        """Full root election over every cached BPDU."""
+        best, best_port = self._own_priority(), None
+        for port, bpdu in self.received_bpdus.items():
+            prospective = self._prospective_bpdu(bpdu)
+            if self._is_bpdu_superior(prospective, best):
+                best, best_port = prospective, port
+        return best, best_port
+
+    def _port_role(self, port, my_bpdu):
+        if self.root_id == self.bridge_id:
+            # If I am the root, all my ports are Designated
+            return self.PORT_DESIGNATED
+        if port == self.root_port:
+            # This port is my Root Port (best path to the root)
+            return self.PORT_ROOT
+        # This is a non-root port. Is it Designated or Blocked?
+        # Compare the BPDU I would send with the one I received on this port.
+        if self._is_bpdu_superior(my_bpdu, self.received_bpdus.get(port)):
+            # My BPDU is better, so I am the Designated bridge for this link.
+            return self.PORT_DESIGNATED
+        # My BPDU is worse, so I must block this port to prevent a loop.
+        return self.PORT_BLOCKED
+
     def receive_bpdu(self, from_port, received_bpdu):
-        """This is the main STP logic engine. Processes a received BPDU and updates state."""
+        """
+        This is the main STP logic engine. Processes a received BPDU and updates state
+        incrementally. Returns True if the root, root path cost, root port or any port
+        role changed, False otherwise (e.g. for a periodic hello identical to the last one).
+        """
+        previous_bpdu = self.received_bpdus.get(from_port)
+        if previous_bpdu == received_bpdu:
+            return False # Nothing new on this port, so nothing can change
         self.received_bpdus[from_port] = received_bpdu
-        
-        # 1. Find the best BPDU this bridge knows about (either its own or one it received)
-        potential_root_bpdu = self._create_bpdu() # Start by assuming I am the root
-        potential_root_port = None
 
-        for port, bpdu in self.received_bpdus.items():
-            # Create a prospective BPDU from the neighbor's perspective
-            prospective_bpdu = {
-                'root_id': bpdu['root_id'],
-                'cost': bpdu['cost'] + 1, # Cost increases by 1 for each hop
-                'sender_id': bpdu['sender_id']
-            }
-            if self._is_bpdu_superior(prospective_bpdu, potential_root_bpdu):
-                potential_root_bpdu = prospective_bpdu
-                potential_root_port = port
-
-        # 2. Update self if a better path to the root was found
-        self.root_id = potential_root_bpdu['root_id']
-        self.cost_to_root = potential_root_bpdu['cost']
-        self.root_port = potential_root_port
-
-        # 3. Determine the final state for each port
-        for port in self.ports:
-            if self.root_id == self.bridge_id:
-                # If I am the root, all my ports are Designated
-                self.port_states[port] = self.PORT_DESIGNATED
-            elif port == self.root_port:
-                # This port is my Root Port (best path to the root)
-                self.port_states[port] = self.PORT_ROOT
+        old_root = (self.root_id, self.cost_to_root, self.root_port)
+        prospective = self._prospective_bpdu(received_bpdu)
+
+        # 1. Update the root port choice. Only the port that changed can take over as root port,
+        # and a full election is only needed when the current root port got worse.
+        if from_port == self.root_port:
+            old_best = self._prospective_bpdu(previous_bpdu)
+            if self._is_bpdu_superior(old_best, prospective):
+                best, best_port = self._select_root_port()
             else:
-                # This is a non-root port. Is it Designated or Blocked?
-                # Compare the BPDU I would send with the one I received on this port.
-                my_bpdu = self._create_bpdu()
-                neighbor_bpdu = self.received_bpdus.get(port)
-                
-                if self._is_bpdu_superior(my_bpdu, neighbor_bpdu):
-                    # My BPDU is better, so I am the Designated bridge for this link.
-                    self.port_states[port] = self.PORT_DESIGNATED
-                else:
-                    # My BPDU is worse, so I must block this port to prevent a loop.
-                    self.port_states[port] = self.PORT_BLOCKED
+                best, best_port = prospective, from_port
+        elif self._is_bpdu_superior(prospective, self._root_priority()):
+            best, best_port = prospective, from_port
+        else:
+            best, best_port = None, self.root_port
+
+        if best is not None:
+            self.root_id = best['root_id']
+            self.cost_to_root = best['cost']
+            self.root_port = best_port
+        root_changed = (self.root_id, self.cost_to_root, self.root_port) != old_root
+
+        # 2. Re-evaluate port roles: every port if my BPDU or root port changed,
+        # otherwise only the port the BPDU arrived on.
+        return self._update_roles(from_port, root_changed) or root_changed
+
+    def _update_roles(self, port, root_changed):
+        """Recomputes the roles of every port if the root changed, else of `port`. Returns True if any changed."""
+        my_bpdu = self._create_bpdu()
+        ports = self.ports if root_changed else ([port] if port in self.port_states else [])
+        roles_changed = False
+        for port in ports:
+            role = self._port_role(port, my_bpdu)
+            if self.port_states.get(port) != role:
+                self.port_states[port] = role
+                roles_changed = True
+        return roles_changed
+
+    def expire_port(self, port):
+        """
+        Forgets the BPDU cached for `port` because its neighbor stopped sending (max age).
+        Returns True if the root, root path cost, root port or any port role changed.
+        """
+        if self.received_bpdus.pop(port, None) is None:
+            return False
+        old_root = (self.root_id, self.cost_to_root, self.root_port)
+        if port == self.root_port:
+            best, self.root_port = self._select_root_port()
+            self.root_id, self.cost_to_root = best['root_id'], best['cost']
+        root_changed = (self.root_id, self.cost_to_root, self.root_port) != old_root
+        return self._update_roles(port, root_changed) or root_changed
 
     def generate_bpdu(self):
         """Generates the BPDU to be sent from this bridge."""
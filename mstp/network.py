@@ -1,105 +1,593 @@
 import sys
 import os
+import math
 import uuid
 import requests
 import threading
 import time
+from collections import deque
 
 # Add parent directory to path to allow direct import of modules from other project directories
 # This is crucial for the execution environment.
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.mstp import MSTP
 from mstp.vlan import VLAN
+from mstp.forwarding import ForwardingTable
+from mstp.peers import PeerPool
+from mstp.transport import HttpTransport
+from mstp.timers import TimerWheel
+from mstp.workers import WorkerPool
+from mstp.status import StatusLog
 import config
 
-TRANSFER_SPEED_MBPS = 5
+TRANSFER_SPEED_MBPS = config.DEFAULT_LINK_CAPACITY_MBPS # Links without their own capacity in config.py
+CIST = 0 # MST instance 0 runs on every physical link
+TRANSFER_MODES = ('single', 'cut-through', 'store-and-forward')
+
+
+class TransferStream:
+    """
+    One node's share of a chunked transfer: the chunks it holds but has not yet sent
+    on, and the credits it has for the next hop. A credit is a free slot in the next
+    hop's buffer; the next hop returns one each time it has passed a chunk on.
+    """
+    def __init__(self, header, index, credits):
+        self.header = header # Fields common to every chunk message of the transfer
+        self.index = index # This node's position in header['path']
+        self.buffer = deque() # Sequence numbers of chunks waiting to be sent on
+        self.received = 0
+        self.forwarded = 0
+        self.credits = credits
+        self.busy = False # A chunk is being transmitted on the outgoing link
+
+    def chunk_mb(self, seq):
+        return min(self.header['chunk_mb'], self.header['file_size_mb'] - seq * self.header['chunk_mb'])
 
 class NetworkNode:
-    def __init__(self, node_id, vlan_ids, neighbors):
+    def __init__(self, node_id, vlan_ids, neighbors, link_in_vlan=None, vlan_instances=None, transport=None, link_capacity=None):
         self.node_id = node_id
         self.neighbors = neighbors
         self.vlans = {}
+        self.instances = {} # One MSTP per MST instance: {msti: MSTP}
+        self.vlan_instances = {} # {vlan_id: msti}
         self.transfer_status = {}
         self.transfer_lock = threading.Lock()
+        self.status_log = StatusLog() # Versions for /status deltas, see get_status()
+        # Outbound transfer work (hops, acks, notifications, LSAs) runs on a fixed pool, see _post()
+        self.workers = WorkerPool(config.TRANSFER_WORKERS, config.TRANSFER_QUEUE_SIZE, name=f'{node_id}-transfer')
+        self._streams = {} # Chunked transfers passing through this node: {transfer_id: TransferStream}
+        self._links_busy = set() # Next hops with a chunk on the wire
+        self._link_waiting = {} # {next hop: deque of streams waiting for the link}
+        self._forwarding_tables = {} # {vlan_id: (VLAN version it was built from, ForwardingTable)}
+        # Link-state view of the network, see receive_lsas()
+        self.lsdb = {} # {origin node_id: newest LSA}
+        self._vlan_versions = {} # {vlan_id_str: count of LSAs that changed the VLAN's port states}
+        self._lsa_lock = threading.Lock()
+        self._lsa_epoch = time.time_ns() # Orders our LSAs after any we sent before a restart
+        self._lsa_seq = 0
+        self._lsa_dirty = True # Our port states changed since our last LSA
+        self._lsa_outbox = {} # {neighbor_id: {origin: LSA}}
         self._stop_event = threading.Event()
+        self.transport = transport # BPDU transport (mstp/transport.py); HTTP unless given, see _transport()
+        # Triggered BPDUs: neighbors to send to as soon as possible, and when anything last changed
+        self._bpdu_lock = threading.Lock()
+        self._triggered_ports = set()
+        self._bpdu_wakeup = threading.Event()
+        self._last_change = time.monotonic()
+        # Timeouts run on one timer wheel per node, see _call_later(); its thread starts on first use
+        self._timers = TimerWheel(config.TIMER_WHEEL_TICK, config.TIMER_WHEEL_SLOTS)
+        self._cleanup_timers = {} # {transfer_id: Timer} expiring its transfer_status entry
+        self._cleanup_lock = threading.Lock()
+        self.bpdu_max_age = config.BPDU_MAX_AGE
+        self._bpdu_age_timers = {} # {neighbor_id: Timer} forgetting its BPDUs when it goes quiet
+        self._aged_out = set() # Neighbors gone quiet; our LSA withdraws the links to them
+        # VLAN membership lookup; the in-process simulator passes its own topology here.
+        self._link_in_vlan = link_in_vlan or config.is_link_in_vlan
+        self._link_capacity = link_capacity or config.get_link_capacity # (node1, node2) -> MB/s
+
+        # VLAN-to-instance mapping; VLANs not in the table fall back to the CIST.
+        if vlan_instances is None:
+            vlan_instances = {vlan_id: config.get_instance_for_vlan(vlan_id) for vlan_id in vlan_ids}
+
+        vlan_ports = {}
+        for vlan_id in vlan_ids:
+            vlan_ports[vlan_id] = [n_id for n_id, _ in neighbors if self._link_in_vlan(vlan_id, node_id, n_id)]
+            self.vlan_instances[vlan_id] = vlan_instances.get(vlan_id, CIST)
+
+        # An instance runs on the union of its VLANs' links; the CIST runs on all links.
+        for msti in sorted(set(self.vlan_instances.values()) | {CIST}):
+            if msti == CIST:
+                ports = [n_id for n_id, _ in neighbors]
+            else:
+                members = set().union(*(vlan_ports[v] for v, i in self.vlan_instances.items() if i == msti))
+                ports = [n_id for n_id, _ in neighbors if n_id in members]
+            self.instances[msti] = MSTP(bridge_id=self.node_id, ports=ports)
 
         for vlan_id in vlan_ids:
-            vlan_neighbors = [n_id for n_id, _ in neighbors if config.is_link_in_vlan(vlan_id, node_id, n_id)]
-            self.vlans[vlan_id] = VLAN(vlan_id, self.node_id, vlan_neighbors)
+            self.vlans[vlan_id] = VLAN(vlan_id, self.node_id, vlan_ports[vlan_id], mstp=self.instances[self.vlan_instances[vlan_id]])
+
+    def _hello_interval(self):
+        """Fast hellos while the topology is changing, keep-alives once it has been stable."""
+        if time.monotonic() - self._last_change < config.BPDU_STABLE_HELLOS * config.BPDU_HELLO_INTERVAL:
+            return config.BPDU_HELLO_INTERVAL
+        return config.BPDU_KEEPALIVE_INTERVAL
+
+    def _bpdu_tick(self, next_hello):
+        """
+        One pass of the BPDU sender: a full hello if one is due, otherwise only the
+        triggered BPDUs. Returns the time the next periodic hello is due.
+        """
+        now = time.monotonic()
+        triggered = self._take_triggered_ports()
+        if now >= next_hello:
+            self.send_bpdus()
+            self._flush_lsas()
+            return now + self._hello_interval()
+        self._flush_lsas()
+        if triggered:
+            self.send_bpdus(triggered)
+            # Something changed: go back to fast hellos
+            return min(next_hello, now + config.BPDU_HELLO_INTERVAL)
+        return next_hello
 
     def _bpdu_sender_loop(self):
         time.sleep(4)
-        while not self._stop_event.is_set(): self.send_bpdus(); time.sleep(2)
+        next_hello = 0
+        while not self._stop_event.is_set():
+            next_hello = self._bpdu_tick(next_hello)
+            if self._bpdu_wakeup.wait(timeout=max(0, next_hello - time.monotonic())):
+                self._bpdu_wakeup.clear()
+                self._stop_event.wait(config.BPDU_HOLD_TIME)
+    def start_transport(self):
+        """Starts receiving BPDUs through the transport (HTTP BPDUs arrive through the server instead)."""
+        self._transport().start(self)
     def start_bpdu_loop(self):
+        self.start_transport()
         threading.Thread(target=self._bpdu_sender_loop, daemon=True).start()
-    def stop(self): self._stop_event.set()
+    def stop(self):
+        self._stop_event.set()
+        self._bpdu_wakeup.set()
+        if self.transport: self.transport.close()
+        self._timers.stop()
+        self.workers.stop()
+
+    def _refresh_bpdu_age(self, port):
+        """Restarts the max-age timer of a neighbor we just heard from."""
+        if self.bpdu_max_age is None:
+            return
+        with self._bpdu_lock:
+            timer = self._bpdu_age_timers.get(port)
+            if timer: timer.cancel()
+            self._bpdu_age_timers[port] = self._call_later(self.bpdu_max_age, self._expire_neighbor, port)
+            if port in self._aged_out:
+                self._aged_out.discard(port)
+                self._lsa_dirty = True
+
+    def _expire_neighbor(self, port):
+        """
+        Max age reached: drops the neighbor's BPDUs from every instance and recomputes the
+        roles. Our LSA stops advertising the link, so nobody routes transfers over it.
+        """
+        with self._bpdu_lock:
+            self._bpdu_age_timers.pop(port, None)
+            self._aged_out.add(port)
+            self._lsa_dirty = True
+            changed = False
+            for msti, mstp in self.instances.items():
+                if mstp.expire_port(port):
+                    changed = True
+                    self._triggered_ports.update(mstp.ports)
+                    self.status_log.touch(('instance', msti))
+            if changed:
+                self._last_change = time.monotonic()
+        self._wake_bpdu_sender() # Also flushes our LSA without the link
+        return changed
+
+    def _apply_bpdu(self, msti, port, bpdu):
+        """Runs one BPDU through an instance and records which neighbors need a triggered BPDU."""
+        mstp = self.instances.get(msti)
+        if mstp is None:
+            return False
+        self._refresh_bpdu_age(port)
+        with self._bpdu_lock:
+            previous = mstp.received_bpdus.get(port)
+            advertised = (mstp.root_id, mstp.cost_to_root)
+            changed = mstp.receive_bpdu(port, bpdu)
+            if changed:
+                self._last_change = time.monotonic()
+                self._lsa_dirty = True
+                self.status_log.touch(('instance', msti))
+                if (mstp.root_id, mstp.cost_to_root) != advertised:
+                    # New root or cost: every neighbor on the instance must hear about it
+                    self._triggered_ports.update(mstp.ports)
+                else:
+                    self._triggered_ports.add(port)
+            elif (previous is not None and mstp._is_bpdu_superior(previous, bpdu)
+                    and mstp.port_states.get(port) == MSTP.PORT_DESIGNATED):
+                # The neighbor's information got worse (e.g. it restarted and claims to be root
+                # again) and we are designated on this link: answer right away instead of
+                # letting it wait for our next keep-alive.
+                self._triggered_ports.add(port)
+        return changed
+
+    def _take_triggered_ports(self):
+        with self._bpdu_lock:
+            ports, self._triggered_ports = self._triggered_ports, set()
+        return ports
 
     def receive_bpdu(self, vlan_id, port, bpdu):
-        if vlan_id in self.vlans:
-            self.vlans[vlan_id].receive_bpdu(port, bpdu)
-
-    def send_bpdus(self):
-        for vlan_id, vlan in self.vlans.items():
-            bpdu = vlan.mstp.generate_bpdu()
-            for neighbor_id, neighbor_url in self.neighbors:
-                if config.is_link_in_vlan(vlan_id, self.node_id, neighbor_id):
-                    data = {'vlan_id': vlan_id, 'from': self.node_id, 'bpdu': bpdu}
-                    try:
-                        requests.post(f'{neighbor_url}/bpdu', json=data, timeout=1.5)
-                    except requests.RequestException:
-                        pass # Ignore nodes that are down
-
-    def find_mstp_path(self, dst_id, vlan_id, global_port_states=None):
-        if not global_port_states: return None
+        """Per-VLAN BPDU from an older node: applied to the VLAN's instance."""
+        if vlan_id not in self.vlans:
+            return False
+        return self.receive_instance_bpdu(self.vlan_instances[vlan_id], port, bpdu)
+
+    def receive_instance_bpdu(self, msti, port, bpdu):
+        """Returns True if the instance's root or port roles changed."""
+        changed = self._apply_bpdu(msti, port, bpdu)
+        if self._triggered_ports:
+            self._wake_bpdu_sender()
+        return changed
+
+    def receive_bpdu_batch(self, port, records):
+        """
+        Applies a combined BPDU frame: one {'msti', 'bpdu'} record per instance on the link.
+        Returns the list of instances whose root or port roles changed.
+        """
+        changed = [record['msti'] for record in records if self._apply_bpdu(record['msti'], port, record['bpdu'])]
+        if self._triggered_ports:
+            self._wake_bpdu_sender()
+        return changed
+
+    def build_bpdu_frames(self, neighbor_ids=None):
+        """Returns {neighbor_id: frame}, one frame carrying every instance's BPDU on that link."""
+        bpdus = [(msti, mstp, mstp.generate_bpdu()) for msti, mstp in self.instances.items()]
+        frames = {}
+        for neighbor_id, _ in self.neighbors:
+            if neighbor_ids is not None and neighbor_id not in neighbor_ids:
+                continue
+            records = [{'msti': msti, 'bpdu': bpdu} for msti, mstp, bpdu in bpdus if neighbor_id in mstp.port_states]
+            if records:
+                frames[neighbor_id] = {'from': self.node_id, 'bpdus': records}
+        return frames
+
+    def send_bpdus(self, neighbor_ids=None):
+        # One message per neighbor per hello, however many instances and VLANs share the link.
+        frames = self.build_bpdu_frames(neighbor_ids)
+        for neighbor_id, neighbor_url in self.neighbors:
+            if neighbor_id in frames:
+                self._deliver_bpdu(neighbor_id, neighbor_url, frames[neighbor_id])
+
+    # --- I/O hooks ---
+    # All network and timer side effects go through these methods so that the
+    # in-process simulator (mstp/simulation.py) can replace them with events on
+    # its virtual clock while reusing the protocol and transfer logic below.
+    def _transport(self):
+        if self.transport is None:
+            self.transport = HttpTransport(PeerPool(self.neighbors, timeout=1.5, wire_format=config.BPDU_WIRE_FORMAT))
+        return self.transport
+
+    def _dispatch(self, fn, *args):
+        """Runs a call made by a transport's receiver thread in the node's own context."""
+        return fn(*args)
+
+    def _wake_bpdu_sender(self):
+        """Asks the BPDU sender to flush triggered BPDUs now instead of at the next hello."""
+        self._bpdu_wakeup.set()
+
+    def _deliver_bpdu(self, neighbor_id, neighbor_url, data):
+        # Over HTTP the frame is sent concurrently over a keep-alive connection; neighbors
+        # that are down are backed off by their circuit breaker instead of stalling the others.
+        self._transport().send_frame(neighbor_id, data)
+
+    def _post(self, url, data, timeout, on_error=None):
+        """
+        Fire-and-forget POST on the worker pool; `on_error` is called if the request fails
+        or the pool's queue is full. Callers may hold transfer_lock, so a refused task's
+        `on_error` runs from the timer wheel rather than here.
+        """
+        def task():
+            try: requests.post(url, json=data, timeout=timeout)
+            except Exception:
+                if on_error: on_error()
+        if not self.workers.submit(task) and on_error:
+            self._call_later(0, on_error) # Counted in workers.rejected
+
+    def _call_later(self, delay, fn, *args):
+        """Runs fn(*args) after `delay` seconds on the node's timer wheel. Returns a handle with cancel()."""
+        return self._timers.schedule(delay, fn, *args)
+
+    def _node_url(self, node_id):
+        return f"http://{config.Ip_address[node_id]}:{config.Port_Number[node_id]}"
+
+    def _now(self):
+        return time.monotonic()
+
+    def _download(self, transfer_id, path, file_size_mb, on_done):
+        """Waits for a single-message transfer to download at the path's slowest link."""
+        bottleneck = min(self._link_capacity(a, b) for a, b in zip(path, path[1:]))
+        self._call_later(file_size_mb / bottleneck, on_done)
+
+    def _neighbor_url(self, node_id):
+        return next((url for nid, url in self.neighbors if nid == node_id), None)
+
+    # --- Link-state topology view ---
+    # Every node floods a link-state advertisement (LSA) with its VLAN port states
+    # when they change: {'origin', 'epoch', 'seq', 'vlans': {vlan_id_str: port_states}}.
+    # Each node thus holds every node's port states and computes transfer paths
+    # from its own view. LSAs ride the same sender loop as triggered BPDUs.
+    @staticmethod
+    def _lsa_is_newer(lsa, current):
+        return current is None or (lsa['epoch'], lsa['seq']) > (current['epoch'], current['seq'])
+
+    def _queue_lsa(self, lsa, exclude=None):
+        for neighbor_id, _ in self.neighbors:
+            if neighbor_id != exclude:
+                self._lsa_outbox.setdefault(neighbor_id, {})[lsa['origin']] = lsa
+
+    def _install_lsa(self, lsa, exclude=None):
+        old_vlans = self.lsdb[lsa['origin']]['vlans'] if lsa['origin'] in self.lsdb else {}
+        self.lsdb[lsa['origin']] = lsa
+        # Only the VLANs whose port states this LSA changed need new forwarding tables
+        for vlan_id_str in old_vlans.keys() | lsa['vlans'].keys():
+            if old_vlans.get(vlan_id_str) != lsa['vlans'].get(vlan_id_str):
+                self._vlan_versions[vlan_id_str] = self._vlan_versions.get(vlan_id_str, 0) + 1
+        self._queue_lsa(lsa, exclude)
+
+    def _originate_lsa(self):
+        """Advertises our port states if they differ from our last LSA. Caller holds _lsa_lock."""
+        self._lsa_dirty = False
+        aged_out = set(self._aged_out)
+        vlans = {str(vlan_id): {port: state for port, state in vlan.get_port_states().items() if port not in aged_out}
+                 for vlan_id, vlan in self.vlans.items()}
+        current = self.lsdb.get(self.node_id)
+        if current is not None and current['vlans'] == vlans:
+            return
+        self._lsa_seq += 1
+        self._install_lsa({'origin': self.node_id, 'epoch': self._lsa_epoch, 'seq': self._lsa_seq, 'vlans': vlans})
+
+    def receive_lsas(self, port, lsas):
+        """Installs the LSAs newer than our copies and floods them on. Returns how many were new."""
+        installed = 0
+        with self._lsa_lock:
+            for lsa in lsas:
+                current = self.lsdb.get(lsa['origin'])
+                if lsa['origin'] == self.node_id or not self._lsa_is_newer(lsa, current):
+                    continue
+                if lsa['origin'] == port and (current is None or current['epoch'] != lsa['epoch']):
+                    # The neighbor just came up or restarted: send it everything we know
+                    outbox = self._lsa_outbox.setdefault(port, {})
+                    for known in self.lsdb.values():
+                        outbox[known['origin']] = known
+                self._install_lsa(lsa, exclude=port)
+                installed += 1
+        if installed:
+            self._wake_bpdu_sender()
+        return installed
+
+    def _flush_lsas(self):
+        """Sends queued LSAs, one message per neighbor. Failed sends are retried on the next flush."""
+        with self._lsa_lock:
+            if self._lsa_dirty:
+                self._originate_lsa()
+            outbox, self._lsa_outbox = self._lsa_outbox, {}
+        for neighbor_id, neighbor_url in self.neighbors:
+            if neighbor_id in outbox:
+                lsas = outbox[neighbor_id]
+                self._post(f'{neighbor_url}/lsa', {'from': self.node_id, 'lsas': list(lsas.values())}, timeout=5,
+                           on_error=lambda n=neighbor_id, l=lsas: self._requeue_lsas(n, l))
+
+    def _requeue_lsas(self, neighbor_id, lsas):
+        with self._lsa_lock:
+            outbox = self._lsa_outbox.setdefault(neighbor_id, {})
+            for origin, lsa in lsas.items():
+                if self.lsdb.get(origin) is lsa:
+                    outbox.setdefault(origin, lsa)
+
+    def find_mstp_path(self, dst_id, vlan_id):
+        if dst_id == self.node_id: return None
+        return self.get_forwarding_table(vlan_id).get_path(dst_id)
+
+    def get_forwarding_table(self, vlan_id):
+        """The VLAN's forwarding table from our link-state view, rebuilt only after an LSA changed the VLAN."""
         vlan_id_str = str(vlan_id)
-        adj, nodes = {}, list(global_port_states.keys())
-        for node in nodes:
-            port_states = global_port_states.get(node, {}).get(vlan_id_str, {})
-            for neighbor, state in port_states.items():
-                if neighbor in nodes:
-                    neighbor_state = global_port_states.get(neighbor, {}).get(vlan_id_str, {}).get(node, 'blocked')
-                    if state != 'blocked' and neighbor_state != 'blocked':
-                        if node not in adj: adj[node] = []
-                        if neighbor not in adj: adj[neighbor] = []
-                        adj[node].append(neighbor)
-                        adj[neighbor].append(node)
-        if dst_id not in adj: return None
-        from collections import deque
-        q, visited = deque([[self.node_id]]), {self.node_id}
-        while q:
-            path = q.popleft()
-            node = path[-1]
-            if node == dst_id: return path
-            for neighbor in adj.get(node, []):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    q.append(path + [neighbor])
-        return None
+        with self._lsa_lock:
+            if self._lsa_dirty:
+                self._originate_lsa()
+            version = self._vlan_versions.get(vlan_id_str, 0)
+            cached = self._forwarding_tables.get(vlan_id)
+            if cached is None or cached[0] != version:
+                view = {origin: lsa['vlans'].get(vlan_id_str, {}) for origin, lsa in self.lsdb.items()}
+                cached = self._forwarding_tables[vlan_id] = (version, ForwardingTable.from_port_states(self.node_id, view))
+        return cached[1]
 
     def _cleanup_transfer_status(self, transfer_id):
-        time.sleep(15)
         with self.transfer_lock:
-            self.transfer_status.pop(transfer_id, None)
+            if self.transfer_status.pop(transfer_id, None) is not None:
+                self.status_log.touch(('transfer', transfer_id))
+        with self._cleanup_lock:
+            self._cleanup_timers.pop(transfer_id, None)
 
-    def send_transfer(self, dst_id, payload, file_size_mb, vlan_id, global_port_states):
+    def _schedule_cleanup(self, transfer_id):
+        """(Re)starts the 15 s expiry of a transfer's status entry. May be called with transfer_lock held."""
+        with self._cleanup_lock:
+            timer = self._cleanup_timers.get(transfer_id)
+            if timer: timer.cancel()
+            self._cleanup_timers[transfer_id] = self._call_later(15, self._cleanup_transfer_status, transfer_id)
+
+    def send_transfer(self, dst_id, payload, file_size_mb, vlan_id, mode=None):
+        """
+        Starts a transfer along the VLAN's active tree. `mode` (default config.TRANSFER_MODE):
+        'single' sends the whole file in one message and the destination waits for it to
+        download; 'cut-through' and 'store-and-forward' stream it in chunks, see _pump().
+        """
+        mode = mode or config.TRANSFER_MODE
+        if mode not in TRANSFER_MODES:
+            raise ValueError(f"Unknown transfer mode {mode!r}, expected one of {', '.join(TRANSFER_MODES)}")
         transfer_id = str(uuid.uuid4())
-        path = self.find_mstp_path(dst_id, vlan_id, global_port_states)
+        if config.TRANSFER_OVERLOAD == 'reject' and self._is_overloaded():
+            with self.transfer_lock:
+                self.transfer_status[transfer_id] = {'status': 'rejected', 'path': None, 'src': self.node_id, 'dst': dst_id}
+                self.status_log.touch(('transfer', transfer_id))
+            self._schedule_cleanup(transfer_id)
+            return transfer_id
+        path = self.find_mstp_path(dst_id, vlan_id)
         if not path or len(path) < 2:
             with self.transfer_lock:
                 self.transfer_status[transfer_id] = {'status': 'no path', 'path': None, 'src': self.node_id, 'dst': dst_id}
-            threading.Thread(target=self._cleanup_transfer_status, args=(transfer_id,), daemon=True).start()
+                self.status_log.touch(('transfer', transfer_id))
+            self._schedule_cleanup(transfer_id)
+            return transfer_id
+
+        with self.transfer_lock:
+            self.transfer_status[transfer_id] = {'status': 'transferring', 'progress': 0, 'hops': 0, 'path': path, 'vlan_id': vlan_id,
+                                                 'src': self.node_id, 'dst': dst_id, 'mode': mode, 'file_size_mb': file_size_mb,
+                                                 'started_at': self._now()}
+            self.status_log.touch(('transfer', transfer_id))
+
+        next_node_url = self._neighbor_url(path[1])
+        if not next_node_url:
+            self.fail_transfer(transfer_id)
+            return transfer_id
+        if mode != 'single':
+            chunk_mb = min(config.TRANSFER_CHUNK_MB, file_size_mb)
+            header = {'transfer_id': transfer_id, 'src': self.node_id, 'dst': dst_id, 'payload': payload, 'file_size_mb': file_size_mb,
+                      'vlan_id': vlan_id, 'path': path, 'mode': mode, 'chunk_mb': chunk_mb,
+                      'chunks': math.ceil(file_size_mb / chunk_mb) if chunk_mb > 0 else 1}
+            stream = TransferStream(header, 0, self._stream_window(header))
+            stream.buffer.extend(range(header['chunks']))
+            stream.received = header['chunks']
+            with self.transfer_lock:
+                self._streams[transfer_id] = stream
+                self._pump(stream)
+            return transfer_id
+        data = {'transfer_id': transfer_id, 'src': self.node_id, 'dst': dst_id, 'payload': payload, 'file_size_mb': file_size_mb, 'vlan_id': vlan_id, 'hops': 1, 'path': path}
+        self._post(f'{next_node_url}/transfer', data, timeout=10, on_error=lambda: self.fail_transfer(transfer_id))
+        return transfer_id
+
+    # --- Chunked transfers ---
+    # Every link carries one chunk at a time at the link's capacity, taking turns
+    # between the streams that share it. A stream may only send while it holds a
+    # credit for the next hop's buffer (TRANSFER_WINDOW chunks).
+    # Cut-through hops send a chunk on as soon as it has arrived; store-and-forward
+    # hops wait for the whole file, so their buffer must hold all of it.
+    @staticmethod
+    def _stream_window(header):
+        return header['chunks'] if header['mode'] == 'store-and-forward' else config.TRANSFER_WINDOW
+
+    @staticmethod
+    def _stream_ready(stream):
+        if not stream.buffer or stream.credits == 0:
+            return False
+        return stream.header['mode'] != 'store-and-forward' or stream.received == stream.header['chunks']
+
+    def _pump(self, stream):
+        """
+        Starts transmitting the stream's next chunk if it can send and its link is
+        free, or queues it for the link. Caller holds transfer_lock.
+        """
+        if stream.busy or not self._stream_ready(stream):
+            return
+        link = stream.header['path'][stream.index + 1]
+        if link in self._links_busy:
+            waiting = self._link_waiting.setdefault(link, deque())
+            if stream not in waiting: waiting.append(stream)
             return
+        self._transmit(stream, link)
+
+    def _transmit(self, stream, link):
+        seq = stream.buffer.popleft()
+        stream.credits -= 1
+        stream.busy = True
+        self._links_busy.add(link)
+        self._call_later(stream.chunk_mb(seq) / self._link_capacity(self.node_id, link), self._chunk_transmitted, stream, seq)
 
+    def _release_link(self, link):
+        """Hands a link that has finished a chunk to the next waiting stream (round robin)."""
+        self._links_busy.discard(link)
+        waiting = self._link_waiting.get(link)
+        while waiting:
+            stream = waiting.popleft()
+            if self._streams.get(stream.header['transfer_id']) is stream and self._stream_ready(stream):
+                self._transmit(stream, link)
+                return
+
+    def _chunk_transmitted(self, stream, seq):
+        header, path = stream.header, stream.header['path']
+        transfer_id = header['transfer_id']
+        next_node_url = self._neighbor_url(path[stream.index + 1])
         with self.transfer_lock:
-            self.transfer_status[transfer_id] = {'status': 'transferring', 'progress': 0, 'hops': 0, 'path': path, 'vlan_id': vlan_id, 'src': self.node_id, 'dst': dst_id}
+            stream.busy = False
+            stream.forwarded += 1
+            self._release_link(path[stream.index + 1])
+            if transfer_id not in self._streams:
+                return # Failed meanwhile
+            if stream.index == 0 and transfer_id in self.transfer_status:
+                self.transfer_status[transfer_id]['progress'] = int(stream.forwarded * 100 / header['chunks'])
+                self.status_log.touch(('transfer', transfer_id))
+            if stream.forwarded == header['chunks']:
+                del self._streams[transfer_id]
+                if stream.index > 0: self._schedule_cleanup(transfer_id)
+            else:
+                self._pump(stream)
+        if not next_node_url:
+            self._fail_stream(stream); return
+        self._post(f'{next_node_url}/transfer-chunk', dict(header, seq=seq, hops=stream.index + 1), timeout=10,
+                   on_error=lambda: self._fail_stream(stream))
+        if stream.index > 0:
+            # The chunk has left our buffer: give the previous hop its credit back
+            self._post(f'{self._neighbor_url(path[stream.index - 1])}/chunk-ack', {'transfer_id': transfer_id, 'count': 1}, timeout=5)
 
-        def forward_task():
-            next_node_id = path[1]
-            next_node_url = next((url for nid, url in self.neighbors if nid == next_node_id), None)
-            if not next_node_url: self.fail_transfer(transfer_id); return
-            data = {'transfer_id': transfer_id, 'src': self.node_id, 'dst': dst_id, 'payload': payload, 'file_size_mb': file_size_mb, 'vlan_id': vlan_id, 'hops': 1, 'path': path}
-            try: requests.post(f'{next_node_url}/transfer', json=data, timeout=10)
-            except Exception: self.fail_transfer(transfer_id)
-        threading.Thread(target=forward_task, daemon=True).start()
+    def receive_chunk(self, transfer_id, seq, hops, **header):
+        """One chunk of a streamed transfer arriving at position `hops` of its path."""
+        header['transfer_id'] = transfer_id
+        path = header['path']
+        prev_url = self._neighbor_url(path[hops - 1])
+        if self.node_id == header['dst']:
+            with self.transfer_lock:
+                stream = self._streams.get(transfer_id)
+                if stream is None:
+                    if self.transfer_status.get(transfer_id, {}).get('status') in ('failed', 'done'):
+                        return # A straggler from a transfer that has already failed or arrived
+                    stream = self._streams[transfer_id] = TransferStream(header, hops, 0)
+                stream.received += 1
+                done = stream.received == header['chunks']
+                if done:
+                    del self._streams[transfer_id]
+                    # Remembered until the cleanup so that a late duplicate does not start the stream again
+                    self.transfer_status[transfer_id] = {'status': 'done', 'progress': 100, 'hops': hops, 'path': path,
+                                                         'src': header['src'], 'dst': header['dst']}
+                    self.status_log.touch(('transfer', transfer_id))
+                    self._schedule_cleanup(transfer_id)
+            # The destination consumes chunks as they arrive
+            if prev_url: self._post(f'{prev_url}/chunk-ack', {'transfer_id': transfer_id, 'count': 1}, timeout=5)
+            if done: self._post(f'{self._node_url(header["src"])}/complete-transfer', {'transfer_id': transfer_id}, 5)
+            return
+        with self.transfer_lock:
+            stream = self._streams.get(transfer_id)
+            if stream is None:
+                if self.transfer_status.get(transfer_id, {}).get('status') == 'failed':
+                    return # A straggler from a transfer that has already failed
+                stream = self._streams[transfer_id] = TransferStream(header, hops, self._stream_window(header))
+                self.transfer_status[transfer_id] = {'status': 'forwarded', 'progress': int((hops / (len(path) - 1)) * 100),
+                                                     'hops': hops, 'path': path, 'src': header['src'], 'dst': header['dst']}
+                self.status_log.touch(('transfer', transfer_id))
+            stream.buffer.append(seq)
+            stream.received += 1
+            self._pump(stream)
+
+    def receive_chunk_ack(self, transfer_id, count=1):
+        with self.transfer_lock:
+            stream = self._streams.get(transfer_id)
+            if stream is None: return
+            stream.credits += count
+            self._pump(stream)
+
+    def _fail_stream(self, stream):
+        """A chunk could not be delivered: stop every other hop, the source and the ones after us alike."""
+        path, transfer_id = stream.header['path'], stream.header['transfer_id']
+        self.fail_transfer(transfer_id)
+        for node_id in path[:stream.index] + path[stream.index + 1:]:
+            self._post(f'{self._node_url(node_id)}/fail-transfer', {'transfer_id': transfer_id}, 5)
 
     def receive_transfer(self, transfer_id, src, dst, payload, file_size_mb, vlan_id, hops, path):
         """
@@ -108,14 +596,10 @@ class NetworkNode:
         """
         # Logic for the Final Destination Node (remains the same)
         if self.node_id == dst:
-            def final_hop_task():
-                # Simulate download time
-                time.sleep(file_size_mb / TRANSFER_SPEED_MBPS)
-                # Notify the original source that the transfer is complete
-                source_node_url = f"http://{config.Ip_address[src]}:{config.Port_Number[src]}"
-                try: requests.post(f'{source_node_url}/complete-transfer', json={'transfer_id': transfer_id}, timeout=5)
-                except Exception: pass # Source node might be down
-            threading.Thread(target=final_hop_task, daemon=True).start()
+            # Simulate download time, then notify the original source that the transfer is complete.
+            # The source node might be down, in which case the notification is dropped.
+            self._download(transfer_id, path, file_size_mb, lambda: self._post(
+                f'{self._node_url(src)}/complete-transfer', {'transfer_id': transfer_id}, 5))
         
         # Logic for Intermediate Hops (This is the corrected part)
         else:
@@ -130,48 +614,92 @@ class NetworkNode:
                     'src': src,
                     'dst': dst
                 }
+                self.status_log.touch(('transfer', transfer_id))
             
             # 2. Immediately start a cleanup timer for this transient entry.
             # This prevents the stale state bug from ever returning.
-            # The 5-second delay is more than enough for the UI to poll the status.
-            threading.Thread(target=self._cleanup_transfer_status, args=(transfer_id,), daemon=True).start()
-            
-            # 3. Start the task to forward the packet to the next hop.
-            def forward_task():
-                # Validate the path to prevent errors
-                if hops >= len(path) -1: self.fail_transfer(transfer_id); return
-
-                next_node_id = path[hops + 1]
-                next_node_url = next((url for nid, url in self.neighbors if nid == next_node_id), None)
-                if not next_node_url: self.fail_transfer(transfer_id); return
-
-                # Prepare and send the data to the next hop
-                data = {'transfer_id': transfer_id, 'src': src, 'dst': dst, 'payload': payload, 'file_size_mb': file_size_mb, 'vlan_id': vlan_id, 'hops': hops + 1, 'path': path}
-                try:
-                    requests.post(f'{next_node_url}/transfer', json=data, timeout=10)
-                except Exception:
-                    # If forwarding fails, notify the original source node
-                    source_node_url = f"http://{config.Ip_address[src]}:{config.Port_Number[src]}"
-                    try: requests.post(f'{source_node_url}/fail-transfer', json={'transfer_id': transfer_id}, timeout=5)
-                    except Exception: pass
+            self._schedule_cleanup(transfer_id)
             
-            threading.Thread(target=forward_task, daemon=True).start()
+            # 3. Forward the packet to the next hop.
+            # Validate the path to prevent errors
+            if hops >= len(path) -1: self.fail_transfer(transfer_id); return
+
+            next_node_url = self._neighbor_url(path[hops + 1])
+            if not next_node_url: self.fail_transfer(transfer_id); return
+
+            # If forwarding fails, notify the original source node
+            def notify_source_of_failure():
+                self._post(f'{self._node_url(src)}/fail-transfer', {'transfer_id': transfer_id}, 5)
+
+            # Prepare and send the data to the next hop
+            data = {'transfer_id': transfer_id, 'src': src, 'dst': dst, 'payload': payload, 'file_size_mb': file_size_mb, 'vlan_id': vlan_id, 'hops': hops + 1, 'path': path}
+            self._post(f'{next_node_url}/transfer', data, timeout=10, on_error=notify_source_of_failure)
 
     def complete_transfer(self, transfer_id):
         with self.transfer_lock:
             if transfer_id in self.transfer_status:
-                self.transfer_status[transfer_id]['status'] = 'done'; self.transfer_status[transfer_id]['progress'] = 100
-                threading.Thread(target=self._cleanup_transfer_status, args=(transfer_id,), daemon=True).start()
+                status = self.transfer_status[transfer_id]
+                status['status'] = 'done'; status['progress'] = 100
+                self.status_log.touch(('transfer', transfer_id))
+                if 'started_at' in status:
+                    # End-to-end figures as seen by the source
+                    status['duration_s'] = round(self._now() - status['started_at'], 3)
+                    if status['duration_s'] > 0: status['throughput_mbps'] = round(status['file_size_mb'] / status['duration_s'], 3)
+                self._schedule_cleanup(transfer_id)
 
     def fail_transfer(self, transfer_id):
         with self.transfer_lock:
-            if transfer_id in self.transfer_status and self.transfer_status[transfer_id]['status'] != 'done':
+            stream = self._streams.pop(transfer_id, None)
+            if transfer_id not in self.transfer_status:
+                # A hop further on, e.g. the destination: remember the failure so that chunks
+                # still in flight are dropped instead of starting the stream again
+                header = stream.header if stream else {}
+                self.transfer_status[transfer_id] = {'status': 'failed', 'path': header.get('path'),
+                                                     'src': header.get('src'), 'dst': header.get('dst')}
+                self.status_log.touch(('transfer', transfer_id))
+                self._schedule_cleanup(transfer_id)
+            elif transfer_id in self.transfer_status and self.transfer_status[transfer_id]['status'] != 'done':
                 self.transfer_status[transfer_id]['status'] = 'failed'
-                threading.Thread(target=self._cleanup_transfer_status, args=(transfer_id,), daemon=True).start()
+                self.status_log.touch(('transfer', transfer_id))
+                self._schedule_cleanup(transfer_id)
 
+    def get_status(self, since=None):
+        """
+        The node's /status: port states per VLAN and instance and the transfer records,
+        with the version they are current as of. With `since`, a delta holding only the
+        instances (and their VLANs) and transfers that changed after that version; a
+        removed transfer is None. Falls back to the full status if the log no longer
+        covers `since`.
+        """
+        version, changed = self.status_log.changes_since(since)
+        if changed is None:
+            return {'node_id': self.node_id, 'version': version, 'delta': False,
+                    'vlans': {vlan_id: vlan.get_port_states() for vlan_id, vlan in self.vlans.items()},
+                    'instances': self.get_instance_port_states(),
+                    'vlan_instances': self.vlan_instances,
+                    'transfers': self.get_transfer_status()}
+        instances = {key for kind, key in changed if kind == 'instance'}
+        with self.transfer_lock:
+            transfers = {key: self.transfer_status.get(key) for kind, key in changed if kind == 'transfer'}
+        return {'node_id': self.node_id, 'version': version, 'delta': True,
+                'vlans': {vlan_id: vlan.get_port_states() for vlan_id, vlan in self.vlans.items()
+                          if self.vlan_instances[vlan_id] in instances},
+                'instances': {msti: self.instances[msti].get_port_states() for msti in instances},
+                'transfers': transfers}
     def get_transfer_status(self):
         with self.transfer_lock: return dict(self.transfer_status)
     def get_vlan_port_states(self, vlan_id):
         if vlan_id in self.vlans: return self.vlans[vlan_id].get_port_states()
         return None
+    def get_peer_stats(self):
+        return self.transport.get_stats() if self.transport else {}
+    def _is_overloaded(self):
+        return self.workers.is_full()
+    def get_worker_stats(self):
+        """Queue depth, counters and queueing/run latency (ms) of the transfer worker pool."""
+        return self.workers.get_stats()
+    def get_transport_name(self):
+        return self._transport().name
+    def get_instance_port_states(self):
+        return {msti: mstp.get_port_states() for msti, mstp in self.instances.items()}
         
\ No newline at end of file
@@ -0,0 +1,229 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mstp.bpdu_codec import CONTENT_TYPE, encode_frame
+
+BINARY_FRAME_ENDPOINT = '/bpdu-frame'
+JSON_FRAME_ENDPOINT = '/bpdus'
+# Responses meaning "this neighbor does not speak the binary format"
+UNSUPPORTED_STATUS = (404, 405, 415)
+
+
+class CircuitBreaker:
+    """
+    Per-neighbor circuit breaker. After `failure_threshold` consecutive failures
+    the breaker opens and sends are skipped for a back-off period that doubles on
+    every failed trial (up to `max_backoff`). Once the period is over a single
+    trial send is let through; success closes the breaker again.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=3, base_backoff=2.0, max_backoff=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.backoff = 0.0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock() - self._opened_at < self.backoff:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        """True if a send may be attempted now."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.backoff = 0.0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._opened_at is not None:
+                # The trial failed: stay open and back off for longer
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self._opened_at = self.clock()
+            elif self.consecutive_failures >= self.failure_threshold:
+                self.backoff = self.base_backoff
+                self._opened_at = self.clock()
+            self._trial_in_progress = False
+
+
+class PeerStats:
+    """Send counters and latency figures (in milliseconds) for one neighbor."""
+    def __init__(self):
+        self.sent = 0
+        self.failures = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.last_ms = None
+        self.min_ms = None
+        self.max_ms = None
+        self._total_ms = 0.0
+
+    def record(self, latency_ms):
+        self.sent += 1
+        self.last_ms = latency_ms
+        self._total_ms += latency_ms
+        self.min_ms = latency_ms if self.min_ms is None else min(self.min_ms, latency_ms)
+        self.max_ms = latency_ms if self.max_ms is None else max(self.max_ms, latency_ms)
+
+    def to_dict(self):
+        def rounded(value):
+            return None if value is None else round(value, 3)
+        return {
+            'sent': self.sent,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'coalesced': self.coalesced,
+            'last_ms': rounded(self.last_ms),
+            'avg_ms': rounded(self._total_ms / self.sent) if self.sent else None,
+            'min_ms': rounded(self.min_ms),
+            'max_ms': rounded(self.max_ms),
+        }
+
+
+class PeerLink:
+    """
+    A keep-alive HTTP connection to one neighbor, with its breaker and stats.
+
+    BPDU frames are sent in the compact binary format while the neighbor
+    accepts it. If the neighbor answers that it does not know the binary
+    endpoint (an older node), the link falls back to JSON for good.
+    """
+    def __init__(self, neighbor_id, url, timeout=1.5, wire_format='binary'):
+        self.neighbor_id = neighbor_id
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        # One persistent connection per neighbor is enough: sends to a peer never overlap.
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.breaker = CircuitBreaker()
+        self.stats = PeerStats()
+        self.wire_format = wire_format
+        self.in_flight = False
+        self.pending = None # Newest message waiting for the one in flight: (method, args)
+
+    def _request(self, endpoint, **kwargs):
+        """Returns (HTTP status or None on a connection error, latency in ms)."""
+        started = time.perf_counter()
+        try:
+            status = self.session.post(f'{self.url}{endpoint}', timeout=self.timeout, **kwargs).status_code
+        except requests.RequestException:
+            status = None
+        return status, (time.perf_counter() - started) * 1000
+
+    def _record(self, status, latency_ms):
+        ok = status is not None and status < 400
+        if ok:
+            self.stats.record(latency_ms)
+            self.breaker.record_success()
+        else:
+            self.stats.failures += 1
+            self.breaker.record_failure()
+        return ok
+
+    def post(self, endpoint, data):
+        """Sends one JSON message and records the outcome. Returns True on success."""
+        return self._record(*self._request(endpoint, json=data))
+
+    def post_frame(self, frame):
+        """Sends a BPDU frame, in binary if the neighbor supports it."""
+        if self.wire_format == 'binary':
+            try:
+                body = encode_frame(frame['from'], frame['bpdus'])
+            except ValueError:
+                self.wire_format = 'json' # IDs too long for the binary layout
+            else:
+                status, latency_ms = self._request(BINARY_FRAME_ENDPOINT, data=body, headers={'Content-Type': CONTENT_TYPE})
+                if status not in UNSUPPORTED_STATUS:
+                    return self._record(status, latency_ms)
+                self.wire_format = 'json'
+        return self.post(JSON_FRAME_ENDPOINT, frame)
+
+
+class PeerPool:
+    """
+    Sends messages to all neighbors concurrently over pooled connections.
+
+    Each send runs on a small thread pool so that a slow or dead neighbor never
+    delays hellos to the others. At most one message is in flight per neighbor:
+    a newer message replaces any that is still waiting (a BPDU frame supersedes
+    the previous one), and messages to a neighbor whose circuit breaker is open
+    are skipped.
+    """
+    def __init__(self, neighbors, timeout=1.5, wire_format='binary'):
+        self.links = {neighbor_id: PeerLink(neighbor_id, url, timeout, wire_format) for neighbor_id, url in neighbors}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.links)), thread_name_prefix='bpdu-send')
+        self._lock = threading.Lock()
+
+    def send(self, neighbor_id, endpoint, data):
+        """Queues a JSON message to one neighbor. Returns False if it was skipped."""
+        link = self.links.get(neighbor_id)
+        return link is not None and self._submit(link, link.post, (endpoint, data))
+
+    def send_frame(self, neighbor_id, frame):
+        """Queues a BPDU frame to one neighbor. Returns False if it was skipped."""
+        link = self.links.get(neighbor_id)
+        return link is not None and self._submit(link, link.post_frame, (frame,))
+
+    def _submit(self, link, method, args):
+        with self._lock:
+            if link.in_flight:
+                if link.pending is not None:
+                    link.stats.coalesced += 1
+                link.pending = (method, args)
+                return True
+            if not link.breaker.allow():
+                link.stats.skipped += 1
+                return False
+            link.in_flight = True
+        self._executor.submit(self._run, link, method, args)
+        return True
+
+    def _run(self, link, method, args):
+        while True:
+            try:
+                method(*args)
+            finally:
+                with self._lock:
+                    next_message, link.pending = link.pending, None
+                    if next_message is None or not link.breaker.allow():
+                        link.in_flight = False
+                        return
+            method, args = next_message
+
+    def get_stats(self):
+        """{neighbor_id: {...send stats..., 'breaker': state, 'wire_format': format}}"""
+        return {neighbor_id: dict(link.stats.to_dict(), breaker=link.breaker.state, wire_format=link.wire_format)
+                for neighbor_id, link in self.links.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for link in self.links.values():
+            link.session.close()
@@ -1,10 +1,13 @@
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import sys, os
 
 # Corrected path handling for robust imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mstp.bpdu_codec import CONTENT_TYPE, decode_frame
+from mstp.status import SSE_KEEPALIVE, etag, parse_version, sse_event
+import config
 
 app = Flask(__name__)
 node = None # Global node instance
@@ -13,23 +16,63 @@ node = None # Global node instance
 def receive_bpdu():
     data = request.json
     if node:
-        node.receive_bpdu(data['vlan_id'], data['from'], data['bpdu'])
+        if 'msti' in data:
+            node.receive_instance_bpdu(data['msti'], data['from'], data['bpdu'])
+        else:
+            node.receive_bpdu(data['vlan_id'], data['from'], data['bpdu'])
         return jsonify({'status': 'received'}), 200
     return jsonify({'error': 'Node not initialized'}), 400
 
+@app.route('/bpdus', methods=['POST'])
+def receive_bpdu_batch():
+    data = request.json
+    if node:
+        # One frame per neighbor per hello, with a record for every instance on the link
+        node.receive_bpdu_batch(data['from'], data['bpdus'])
+        return jsonify({'status': 'received', 'count': len(data['bpdus'])}), 200
+    return jsonify({'error': 'Node not initialized'}), 400
+
+@app.route('/bpdu-frame', methods=['POST'])
+def receive_bpdu_frame():
+    # Same as /bpdus, in the compact binary encoding from mstp/bpdu_codec.py
+    if request.mimetype != CONTENT_TYPE:
+        return jsonify({'error': f'Expected {CONTENT_TYPE}'}), 415
+    if node:
+        try:
+            sender_id, records = decode_frame(request.get_data())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        node.receive_bpdu_batch(sender_id, records)
+        return '', 204
+    return jsonify({'error': 'Node not initialized'}), 400
+
+@app.route('/lsa', methods=['POST'])
+def receive_lsas():
+    data = request.json
+    if node:
+        # Link-state adverts with other nodes' port states, flooded hop by hop
+        installed = node.receive_lsas(data['from'], data['lsas'])
+        return jsonify({'status': 'received', 'installed': installed}), 200
+    return jsonify({'error': 'Node not initialized'}), 400
+
 @app.route('/initiate-transfer', methods=['POST'])
 def initiate_transfer():
     data = request.json
     if node:
         # The send_transfer function now handles creating the unique ID
-        node.send_transfer(
-            dst_id=data['dst'],
-            payload="data",
-            file_size_mb=data['file_size_mb'],
-            vlan_id=data['vlan_id'],
-            global_port_states=data['global_port_states']
-        )
-        return jsonify({'status': 'transfer initiated'}), 200
+        try:
+            transfer_id = node.send_transfer(
+                dst_id=data['dst'],
+                payload="data",
+                file_size_mb=data['file_size_mb'],
+                vlan_id=data['vlan_id'],
+                mode=data.get('mode')
+            )
+        except ValueError as e: # Unknown transfer mode
+            return jsonify({'error': str(e)}), 400
+        if node.transfer_status.get(transfer_id, {}).get('status') == 'rejected':
+            return jsonify({'error': 'Node overloaded', 'transfer_id': transfer_id}), 503
+        return jsonify({'status': 'transfer initiated', 'transfer_id': transfer_id}), 200
     return jsonify({'error': 'Node not initialized'}), 400
 
 @app.route('/transfer', methods=['POST'])
@@ -50,6 +93,22 @@ def receive_transfer_hop():
         return jsonify({'status': 'hop received'}), 200
     return jsonify({'error': 'Node not initialized'}), 400
 
+@app.route('/transfer-chunk', methods=['POST'])
+def receive_transfer_chunk():
+    data = request.json
+    if node:
+        node.receive_chunk(**data)
+        return jsonify({'status': 'chunk received'}), 200
+    return jsonify({'error': 'Node not initialized'}), 400
+
+@app.route('/chunk-ack', methods=['POST'])
+def receive_chunk_ack():
+    data = request.json
+    if node:
+        node.receive_chunk_ack(data['transfer_id'], data.get('count', 1))
+        return jsonify({'status': 'credit received'}), 200
+    return jsonify({'error': 'Node not initialized'}), 400
+
 @app.route('/complete-transfer', methods=['POST'])
 def complete_transfer():
     data = request.json
@@ -70,15 +129,50 @@ def fail_transfer():
 
 @app.route('/status', methods=['GET'])
 def status():
+    """
+    Full status, or with ?since=<version> only what changed after it. ?wait=<seconds>
+    holds the request until something changes (long-poll). Answers 304 when nothing
+    changed after `since` or the If-None-Match ETag.
+    """
+    if not node:
+        return jsonify({'error': 'Node not initialized'}), 400
+    since = parse_version(request.args.get('since'))
+    known = since if since is not None else parse_version(request.headers.get('If-None-Match'))
+    wait = min(request.args.get('wait', 0, type=float), config.STATUS_MAX_WAIT)
+    if known == node.status_log.version and wait > 0:
+        node.status_log.wait(known, wait)
+    if known == node.status_log.version:
+        return '', 304, {'ETag': etag(known)}
+    body = node.get_status(since)
+    return jsonify(body), 200, {'ETag': etag(body['version'])}
+
+@app.route('/status/stream', methods=['GET'])
+def status_stream():
+    """Server-sent events: the full status (or a delta from Last-Event-ID / ?since=), then every change."""
+    if not node:
+        return jsonify({'error': 'Node not initialized'}), 400
+    since = parse_version(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    def events(since):
+        while True:
+            if since == node.status_log.version:
+                if not node.status_log.wait(since, config.STATUS_MAX_WAIT):
+                    yield SSE_KEEPALIVE
+                    continue
+            body = node.get_status(since)
+            since = body['version']
+            yield sse_event(body)
+    return Response(events(since), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
     if not node:
         return jsonify({'error': 'Node not initialized'}), 400
-    
-    # The get_transfer_status now returns the entire dict with UUIDs as keys
-    # The UI will need to handle this new structure, but the backend is now correct.
+    # Per-neighbor BPDU send counters, latency (ms) and circuit breaker state
     return jsonify({
         'node_id': node.node_id,
-        'vlans': {vlan_id: vlan.get_port_states() for vlan_id, vlan in node.vlans.items()},
-        'transfers': node.get_transfer_status() 
+        'transport': node.get_transport_name(),
+        'peers': node.get_peer_stats(),
+        'workers': node.get_worker_stats()
     })
 
 def start_server(network_node, port):
@@ -86,6 +180,5 @@ def start_server(network_node, port):
     node = network_node
     # Use a specific IP to bind to, as 0.0.0.0 can sometimes be inconsistent.
     # We will get this from the node's own config.
-    import config
     host_ip = config.Ip_address.get(node.node_id, '127.0.0.1')
     app.run(host=host_ip, port=port, threaded=True)
\ No newline at end of file
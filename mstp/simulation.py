@@ -0,0 +1,245 @@
+import sys
+import os
+import heapq
+import math
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.network import NetworkNode
+from mstp.bandwidth import FluidFlows
+import config
+
+
+class SimulatedNode(NetworkNode):
+    """
+    A NetworkNode whose network and timer hooks are events on the simulator's
+    virtual clock. Everything else (MSTP, path finding, transfer bookkeeping)
+    is the unmodified NetworkNode code used by the networked mode.
+    """
+    def __init__(self, sim, node_id, vlan_ids, neighbors, link_in_vlan, vlan_instances, link_capacity):
+        super().__init__(node_id, vlan_ids, neighbors, link_in_vlan=link_in_vlan, vlan_instances=vlan_instances,
+                         link_capacity=link_capacity)
+        self.sim = sim
+        self.bpdu_max_age = None # No periodic hellos in the simulator to keep BPDUs fresh
+
+    def _deliver_bpdu(self, neighbor_id, neighbor_url, data):
+        self.sim.send(self.node_id, neighbor_id, '/bpdus', data)
+
+    def _wake_bpdu_sender(self):
+        self.sim.trigger(self.node_id)
+
+    def _post(self, url, data, timeout, on_error=None):
+        dst_id, endpoint = Simulator.parse_url(url)
+        self.sim.send(self.node_id, dst_id, endpoint, data, on_error)
+
+    def _call_later(self, delay, fn, *args):
+        return self.sim.schedule(delay, fn, *args)
+
+    def _node_url(self, node_id):
+        return Simulator.node_url(node_id)
+
+    def _now(self):
+        return self.sim.now
+
+    def _download(self, transfer_id, path, file_size_mb, on_done):
+        # Concurrent single-message transfers share link capacity max-min fairly
+        self.sim.flows.start(transfer_id, path, file_size_mb, on_done)
+
+
+class ScheduledEvent:
+    __slots__ = ('sim', 'seq')
+
+    def __init__(self, sim, seq):
+        self.sim = sim
+        self.seq = seq
+
+    def cancel(self):
+        self.sim._cancelled.add(self.seq)
+
+
+class Simulator:
+    """
+    Headless discrete-event simulation of a whole bridged network in one process.
+
+    Messages that the networked mode sends over HTTP (BPDUs, transfer hops and
+    completion notices) are queued as events on a virtual clock and delivered
+    after `link_delay` seconds. After its first hello a bridge only sends the
+    BPDUs that NetworkNode triggers on a root, cost or role change; identical
+    periodic hellos are skipped because re-processing an unchanged BPDU cannot
+    change any state. With `triggered=True` those BPDUs go out immediately, as
+    in the networked mode; otherwise they wait for the bridge's next hello
+    tick, which models a purely periodic protocol. LSAs are flooded along with
+    triggered BPDUs unless `link_state=False`. Single-message transfers download
+    as fluid flows sharing `link_capacities` max-min fairly (mstp/bandwidth.py).
+    """
+    URL_SCHEME = 'sim://'
+
+    # Mirrors the routes in mstp/server.py
+    ENDPOINTS = {
+        '/bpdus': lambda node, d: node.receive_bpdu_batch(d['from'], d['bpdus']),
+        '/lsa': lambda node, d: node.receive_lsas(d['from'], d['lsas']),
+        '/transfer': lambda node, d: node.receive_transfer(**d),
+        '/transfer-chunk': lambda node, d: node.receive_chunk(**d),
+        '/chunk-ack': lambda node, d: node.receive_chunk_ack(d['transfer_id'], d.get('count', 1)),
+        '/complete-transfer': lambda node, d: node.complete_transfer(d['transfer_id']),
+        '/fail-transfer': lambda node, d: node.fail_transfer(d['transfer_id']),
+    }
+
+    def __init__(self, node_ids, links, vlan_links, mst_instances=None, hello_interval=2.0, link_delay=0.001,
+                 triggered=True, link_state=True, link_capacities=None, seed=0):
+        self.now = 0.0
+        # Flood LSAs so that nodes can route transfers; large convergence runs can turn this off.
+        self.link_state = link_state
+        self.hello_interval = hello_interval
+        self.triggered = triggered
+        self.link_delay = link_delay
+        self._queue = []
+        self._seq = 0
+        self._cancelled = set() # Sequence numbers of cancelled events still in the queue
+
+        # Statistics
+        self.events_processed = 0
+        self.bpdus_delivered = 0 # BPDU records (one per instance per frame)
+        self.lsas_delivered = 0
+        self.frames_delivered = 0
+        self.converged_at = 0.0
+        self.transfers = {}
+
+        # {msti: [vlan_ids]} like config.MST_INSTANCES; by default each VLAN gets its own instance.
+        vlan_ids = list(vlan_links.keys())
+        if mst_instances is None:
+            mst_instances = {i: [vlan_id] for i, vlan_id in enumerate(vlan_ids, start=1)}
+        # {"Node1:Node2": MB/s} like config.LINK_CAPACITY_MBPS
+        self.topology = config.TopologyIndex(node_ids, links, vlan_links, mst_instances, self.node_url, link_capacities)
+        self.nodes = {node_id: SimulatedNode(self, node_id, vlan_ids, self.topology.neighbors[node_id],
+                                             self.topology.is_link_in_vlan, self.topology.vlan_instances,
+                                             self.topology.get_link_capacity)
+                      for node_id in node_ids}
+        self.flows = FluidFlows(self.topology.get_link_capacity, lambda: self.now, self.schedule)
+
+        # Each bridge sends its hellos on its own phase, as independent processes would.
+        rng = random.Random(seed)
+        self._hello_phase = {node_id: rng.uniform(0, hello_interval) for node_id in node_ids}
+        self._send_pending = set()
+        self.down = set()
+        for node_id in node_ids:
+            self.schedule(self._hello_phase[node_id], self._hello, node_id)
+
+    @classmethod
+    def from_config(cls, **kwargs):
+        """Builds a simulator for the topology described in config.py."""
+        return cls(list(config.Ip_address.keys()), config.Link_connected, config.get_all_vlan_links(),
+                   mst_instances=config.MST_INSTANCES, link_capacities=config.LINK_CAPACITY_MBPS, **kwargs)
+
+    @classmethod
+    def node_url(cls, node_id):
+        return f"{cls.URL_SCHEME}{node_id}"
+
+    @classmethod
+    def parse_url(cls, url):
+        """Splits 'sim://B/transfer' into ('B', '/transfer')."""
+        node_id, _, endpoint = url[len(cls.URL_SCHEME):].partition('/')
+        return node_id, '/' + endpoint
+
+    # --- Event queue ---
+    def schedule(self, delay, fn, *args):
+        """Queues fn(*args) at now + delay. Returns a handle whose cancel() drops the event."""
+        heapq.heappush(self._queue, (self.now + delay, self._seq, fn, args))
+        self._seq += 1
+        return ScheduledEvent(self, self._seq - 1)
+
+    def send(self, src_id, dst_id, endpoint, data, on_error=None):
+        """Queues a message for delivery to `dst_id` after one link delay."""
+        self.schedule(self.link_delay, self._deliver, src_id, dst_id, endpoint, data, on_error)
+
+    def _deliver(self, src_id, dst_id, endpoint, data, on_error):
+        node = self.nodes.get(dst_id)
+        if node is None or dst_id in self.down:
+            if on_error: on_error()
+            return
+        if endpoint == '/bpdus':
+            self.frames_delivered += 1
+            self.bpdus_delivered += len(data['bpdus'])
+            if self.ENDPOINTS[endpoint](node, data):
+                self.converged_at = self.now
+            return
+        if endpoint == '/lsa':
+            self.lsas_delivered += len(data['lsas'])
+        if endpoint == '/complete-transfer' and data['transfer_id'] in self.transfers:
+            self.transfers[data['transfer_id']]['completed_at'] = self.now
+        self.ENDPOINTS[endpoint](node, data)
+
+    def trigger(self, node_id):
+        """Called when a bridge has triggered BPDUs to send (SimulatedNode._wake_bpdu_sender)."""
+        if node_id in self._send_pending:
+            return
+        self._send_pending.add(node_id)
+        if self.triggered:
+            self.schedule(config.BPDU_HOLD_TIME, self._send_triggered, node_id)
+        else:
+            phase = self._hello_phase[node_id]
+            ticks = max(0, math.ceil((self.now - phase) / self.hello_interval))
+            self.schedule(phase + ticks * self.hello_interval - self.now, self._send_triggered, node_id)
+
+    def _send_triggered(self, node_id):
+        self._send_pending.discard(node_id)
+        ports = self.nodes[node_id]._take_triggered_ports()
+        if node_id in self.down:
+            return
+        if ports:
+            self.nodes[node_id].send_bpdus(ports)
+        if self.link_state:
+            self.nodes[node_id]._flush_lsas()
+
+    def _hello(self, node_id):
+        """A full hello on every port."""
+        if node_id not in self.down:
+            self.nodes[node_id].send_bpdus()
+            if self.link_state:
+                self.nodes[node_id]._flush_lsas()
+
+    def run(self, until=None, max_events=None):
+        """Processes events in time order until the queue drains, `until` or `max_events` is reached."""
+        processed = 0
+        while self._queue:
+            if until is not None and self._queue[0][0] > until:
+                self.now = until
+                break
+            if max_events is not None and processed >= max_events:
+                break
+            at, seq, fn, args = heapq.heappop(self._queue)
+            if seq in self._cancelled:
+                self._cancelled.discard(seq)
+                continue
+            self.now = at
+            fn(*args)
+            processed += 1
+        self.events_processed += processed
+        return processed
+
+    def run_until_converged(self):
+        """Runs until no BPDU is left in flight. Returns the virtual time of the last state change."""
+        # Transfers and cleanups are timed events; the queue drains once they finish too.
+        self.run()
+        return self.converged_at
+
+    # --- Control & inspection ---
+    def global_port_states(self):
+        """The same {node: {vlan_id_str: port_states}} map the dashboards build from /status."""
+        return {node_id: {str(vlan_id): vlan.get_port_states() for vlan_id, vlan in node.vlans.items()}
+                for node_id, node in self.nodes.items() if node_id not in self.down}
+
+    def start_transfer(self, src_id, dst_id, vlan_id, file_size_mb, mode=None):
+        """Starts a transfer on the source node, exactly like the /initiate-transfer route."""
+        transfer_id = self.nodes[src_id].send_transfer(dst_id, "data", file_size_mb, vlan_id, mode)
+        self.transfers[transfer_id] = {'src': src_id, 'dst': dst_id, 'started_at': self.now, 'completed_at': None}
+        return transfer_id
+
+    def set_node_down(self, node_id, down=True):
+        """Silences a bridge: messages to it are dropped and it stops sending hellos."""
+        if down:
+            self.down.add(node_id)
+        else:
+            self.down.discard(node_id)
+            self._hello(node_id)
+
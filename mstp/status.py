@@ -0,0 +1,93 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class StatusLog:
+    """
+    Change log behind the versioned /status API. Every change to a node's visible
+    state (an instance's port roles, a transfer record) bumps the version and records
+    which key it touched; only the newest version of each key is kept, so a delta
+    since any version is the keys touched after it. The log holds at most `max_keys`
+    keys: a client asking about a version older than the oldest one dropped gets the
+    full status instead. Versions start at the wall clock in microseconds so they
+    keep increasing across restarts.
+    """
+    def __init__(self, max_keys=4096):
+        self.max_keys = max_keys
+        self.version = time.time_ns() // 1000
+        self.floor = self.version # Deltas are only known for versions >= floor
+        self._keys = OrderedDict() # {key: version it last changed}, oldest first
+        self._cond = threading.Condition()
+        self._futures = set() # (loop, future) of asyncio waiters
+
+    def touch(self, key):
+        with self._cond:
+            self.version += 1
+            self._keys[key] = self.version
+            self._keys.move_to_end(key)
+            if len(self._keys) > self.max_keys:
+                _, self.floor = self._keys.popitem(last=False)
+            self._cond.notify_all()
+            futures, self._futures = self._futures, set()
+        for loop, future in futures:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def changes_since(self, since):
+        """(version, keys changed after `since`), or (version, None) if only a full status will do."""
+        with self._cond:
+            if since is None or since < self.floor or since > self.version:
+                return self.version, None
+            changed = []
+            for key, version in reversed(self._keys.items()):
+                if version <= since:
+                    break
+                changed.append(key)
+            return self.version, changed
+
+    def wait(self, since, timeout):
+        """Blocks until the version is past `since` or `timeout` seconds have passed. Returns True on a change."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != since, timeout)
+
+    async def wait_async(self, since, timeout):
+        """wait() for the event loop."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self.version != since:
+                return True
+            future = loop.create_future()
+            self._futures.add((loop, future))
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._cond:
+                self._futures.discard((loop, future))
+            return self.version != since
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def parse_version(value):
+    """A version from ?since=, Last-Event-ID or an ETag ("123", W/"123"); None if absent or malformed."""
+    if not value:
+        return None
+    try:
+        return int(value.removeprefix('W/').strip('"'))
+    except ValueError:
+        return None
+
+def etag(version):
+    return f'"{version}"'
+
+def sse_event(status):
+    """One server-sent event carrying a full or delta status."""
+    return f"id: {status['version']}\nevent: status\ndata: {json.dumps(status)}\n\n"
+
+SSE_KEEPALIVE = ': keep-alive\n\n'
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import asyncio
+from unittest import mock
+
+# Add the parent directory to the Python path to import the async runtime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp.test_utils import TestClient, TestServer
+from mstp.async_network import AsyncNetworkNode
+from mstp.async_server import create_app
+import config
+
+TRIANGLE = ["A:B", "B:C", "C:A"]
+
+def link_in_vlan(vlan_id, node1, node2):
+    return f"{node1}:{node2}" in TRIANGLE or f"{node2}:{node1}" in TRIANGLE
+
+class TestAsyncServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        neighbors = [('A', 'http://127.0.0.1:1'), ('B', 'http://127.0.0.1:1')]
+        self.node = AsyncNetworkNode('C', [10, 20], neighbors, link_in_vlan=link_in_vlan, vlan_instances={10: 1, 20: 2})
+        await self.node.start()
+        self.client = TestClient(TestServer(create_app(self.node)))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.node.close()
+
+    async def test_bpdu_batch_updates_port_states(self):
+        """A batched BPDU frame is applied to every instance it carries."""
+        frame = {'from': 'A', 'bpdus': [{'msti': msti, 'bpdu': {'sender_id': 'A', 'root_id': 'A', 'cost': 0}} for msti in (0, 1, 2)]}
+        resp = await self.client.post('/bpdus', json=frame)
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(await resp.json(), {'status': 'received', 'count': 3})
+
+        resp = await self.client.get('/status')
+        status = await resp.json()
+        self.assertEqual(status['node_id'], 'C')
+        self.assertEqual(status['vlans']['10']['A'], 'root')
+        self.assertEqual(status['instances']['0']['A'], 'root')
+
+    async def test_transfer_without_path_is_reported(self):
+        """An unknown destination produces a 'no path' transfer record."""
+        resp = await self.client.post('/initiate-transfer', json={'dst': 'Z', 'vlan_id': 10, 'file_size_mb': 1})
+        self.assertEqual(resp.status, 200)
+        transfers = self.node.get_transfer_status()
+        self.assertEqual([t['status'] for t in transfers.values()], ['no path'])
+
+    async def test_unknown_transfer_mode_is_a_bad_request(self):
+        resp = await self.client.post('/initiate-transfer', json={'dst': 'A', 'vlan_id': 10, 'file_size_mb': 1, 'mode': 'teleport'})
+        self.assertEqual(resp.status, 400)
+        self.assertIn('teleport', (await resp.json())['error'])
+        self.assertEqual(self.node.get_transfer_status(), {})
+
+    async def test_posts_are_held_until_done(self):
+        """Fire-and-forget posts keep a strong reference until they finish, then drop it."""
+        failed = asyncio.Event()
+        self.node._post('http://127.0.0.1:1/transfer', {}, timeout=1, on_error=failed.set)
+        self.assertEqual(len(self.node._tasks), 1)
+        await asyncio.wait_for(failed.wait(), 5)
+        await asyncio.sleep(0)
+        self.assertEqual(self.node._tasks, set())
+
+    async def test_posts_beyond_the_limit_are_refused(self):
+        """With max_in_flight posts pending, further posts fail and new transfers get 503."""
+        self.node.max_in_flight = 1
+        self.node._post('http://127.0.0.1:1/transfer', {}, timeout=1)
+        refused = asyncio.Event()
+        self.node._post('http://127.0.0.1:1/transfer', {}, timeout=1, on_error=refused.set)
+        self.assertEqual(self.node.get_worker_stats(), {'in_flight': 1, 'max_in_flight': 1, 'submitted': 1, 'rejected': 1})
+        await asyncio.wait_for(refused.wait(), 1)
+        self.node.max_in_flight = 0
+        with mock.patch.object(config, 'TRANSFER_OVERLOAD', 'reject'):
+            resp = await self.client.post('/initiate-transfer', json={'dst': 'A', 'vlan_id': 10, 'file_size_mb': 1})
+        self.assertEqual(resp.status, 503)
+
+    async def test_status_versions_and_deltas(self):
+        resp = await self.client.get('/status')
+        full = await resp.json()
+        self.assertFalse(full['delta'])
+        self.assertEqual(resp.headers['ETag'], f'"{full["version"]}"')
+
+        resp = await self.client.get('/status', headers={'If-None-Match': resp.headers['ETag']})
+        self.assertEqual(resp.status, 304)
+        resp = await self.client.get('/status', params={'since': full['version']})
+        self.assertEqual(resp.status, 304)
+
+        await self.client.post('/bpdus', json={'from': 'A', 'bpdus': [{'msti': 1, 'bpdu': {'sender_id': 'A', 'root_id': 'A', 'cost': 0}}]})
+        resp = await self.client.get('/status', params={'since': full['version']})
+        delta = await resp.json()
+        self.assertTrue(delta['delta'])
+        self.assertGreater(delta['version'], full['version'])
+        self.assertEqual(list(delta['instances']), ['1'])
+        self.assertEqual(list(delta['vlans']), ['10'])
+        self.assertEqual(delta['transfers'], {})
+
+    async def test_long_poll_returns_on_change(self):
+        version = self.node.status_log.version
+        poll = asyncio.ensure_future(self.client.get('/status', params={'since': version, 'wait': 5}))
+        await asyncio.sleep(0.05)
+        self.assertFalse(poll.done())
+        self.node.send_transfer('Z', 'data', 1, 10)
+        resp = await asyncio.wait_for(poll, 2)
+        delta = await resp.json()
+        self.assertEqual([t['status'] for t in delta['transfers'].values()], ['no path'])
+
+    async def test_event_stream(self):
+        resp = await self.client.get('/status/stream')
+        self.assertEqual(resp.headers['Content-Type'], 'text/event-stream')
+        first = await resp.content.readuntil(b'\n\n')
+        self.assertIn(b'"delta": false', first)
+        self.node.send_transfer('Z', 'data', 1, 10)
+        second = await asyncio.wait_for(resp.content.readuntil(b'\n\n'), 2)
+        self.assertIn(b'"no path"', second)
+        self.assertIn(b'"delta": true', second)
+        resp.close()
+
+if __name__ == '__main__':
+    unittest.main()
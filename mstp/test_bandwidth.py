@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import heapq
+
+# Add the parent directory to the Python path to import the bandwidth module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.bandwidth import FluidFlows, max_min_rates
+from mstp.simulation import Simulator
+
+class EventQueue:
+    def __init__(self):
+        self.now = 0.0
+        self.events = []
+    def schedule(self, delay, fn, *args):
+        heapq.heappush(self.events, (self.now + delay, len(self.events), fn, args))
+    def run(self):
+        while self.events:
+            self.now, _, fn, args = heapq.heappop(self.events)
+            fn(*args)
+
+class TestMaxMinRates(unittest.TestCase):
+
+    def test_bottleneck_share_is_given_to_other_links(self):
+        rates = max_min_rates({'f1': ['L1'], 'f2': ['L1', 'L2'], 'f3': ['L2']}, {'L1': 10, 'L2': 4})
+        self.assertEqual(rates, {'f1': 8, 'f2': 2, 'f3': 2})
+
+    def test_equal_split_and_unconstrained_flows(self):
+        rates = max_min_rates({'a': ['L'], 'b': ['L'], 'c': []}, {'L': 5})
+        self.assertEqual(rates['a'], 2.5)
+        self.assertEqual(rates['b'], 2.5)
+        self.assertEqual(rates['c'], float('inf'))
+
+class TestFluidFlows(unittest.TestCase):
+
+    def test_rates_are_recomputed_when_a_flow_finishes(self):
+        """Two flows share a 5 MB/s link; once the small one is done the big one gets it all."""
+        queue = EventQueue()
+        flows = FluidFlows(lambda a, b: 5.0, lambda: queue.now, queue.schedule)
+        finished = {}
+        flows.start('small', ['A', 'B'], 5, lambda: finished.setdefault('small', queue.now))
+        flows.start('big', ['A', 'B'], 10, lambda: finished.setdefault('big', queue.now))
+        self.assertEqual(flows.get_rates(), {'small': 2.5, 'big': 2.5})
+        queue.run()
+        self.assertAlmostEqual(finished['small'], 2.0)
+        self.assertAlmostEqual(finished['big'], 3.0)
+        self.assertEqual(flows.flows, {})
+
+    def test_opposite_directions_do_not_contend(self):
+        queue = EventQueue()
+        flows = FluidFlows(lambda a, b: 5.0, lambda: queue.now, queue.schedule)
+        flows.start('ab', ['A', 'B'], 5, lambda: None)
+        flows.start('ba', ['B', 'A'], 5, lambda: None)
+        self.assertEqual(flows.get_rates(), {'ab': 5.0, 'ba': 5.0})
+
+class TestSimulatedContention(unittest.TestCase):
+    """Star around hub H; the H:D link is the only way to D."""
+
+    def setUp(self):
+        links = ["A:H", "B:H", "H:D"]
+        self.sim = Simulator(["H", "A", "B", "D"], links, {10: links}, link_delay=0.0,
+                             link_capacities={"H:D": 4, "A:H": 10, "B:H": 10})
+        self.sim.run_until_converged()
+
+    def durations(self, transfers):
+        ids = [self.sim.start_transfer(src, "D", 10, size, mode) for src, size, mode in transfers]
+        self.sim.run()
+        return [self.sim.transfers[t]["completed_at"] - self.sim.transfers[t]["started_at"] for t in ids]
+
+    def test_single_transfers_share_the_bottleneck(self):
+        alone = self.durations([("A", 4, "single")])
+        shared = self.durations([("A", 4, "single"), ("B", 4, "single")])
+        self.assertAlmostEqual(alone[0], 1.0)
+        self.assertAlmostEqual(shared[0], 2.0)
+        self.assertAlmostEqual(shared[1], 2.0)
+
+    def test_chunked_streams_take_turns_on_a_shared_link(self):
+        alone = self.durations([("A", 4, "cut-through")])
+        shared = self.durations([("A", 4, "cut-through"), ("B", 4, "cut-through")])
+        # 8 chunks at 0.125 s on H:D, plus the first chunk's 0.05 s on A:H
+        self.assertAlmostEqual(alone[0], 1.05)
+        self.assertGreater(min(shared), 1.9)
+        self.assertLess(max(shared), 2.2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the codec
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.bpdu_codec import HEADER, RECORD, decode_frame, encode_frame
+
+def frame(sender_id, *records):
+    return [{'msti': msti, 'bpdu': {'sender_id': sender_id, 'root_id': root_id, 'cost': cost}} for msti, root_id, cost in records]
+
+class TestBpduCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Decoding an encoded frame gives back the JSON records exactly."""
+        records = frame('NODE0042', (0, 'A', 3), (1, 'NODE0001', 0), (4094, 'B', 70000))
+        data = encode_frame('NODE0042', records)
+        self.assertEqual(len(data), HEADER.size + 3 * RECORD.size)
+        self.assertEqual(decode_frame(data), ('NODE0042', records))
+
+    def test_priority_order_is_preserved(self):
+        """Decoded IDs compare exactly like the originals, so STP elections are unchanged."""
+        _, records = decode_frame(encode_frame('C', frame('C', (0, 'AB', 1), (1, 'B', 1))))
+        self.assertLess(records[0]['bpdu']['root_id'], records[1]['bpdu']['root_id'])
+
+    def test_rejects_long_ids_and_bad_frames(self):
+        with self.assertRaises(ValueError):
+            encode_frame('NODE00042', [])
+        with self.assertRaises(ValueError):
+            decode_frame(b'XX')
+        with self.assertRaises(ValueError):
+            decode_frame(encode_frame('A', frame('A', (0, 'A', 0)))[:-1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the forwarding module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.forwarding import ForwardingTable
+from mstp.network import NetworkNode
+
+# Triangle with the B-C link blocked at C
+PORT_STATES = {
+    'A': {'10': {'B': 'designated', 'C': 'designated'}},
+    'B': {'10': {'A': 'root', 'C': 'designated'}},
+    'C': {'10': {'A': 'root', 'B': 'blocked'}},
+}
+
+class TestForwardingTable(unittest.TestCase):
+
+    def test_paths_follow_parent_pointers(self):
+        adjacency = {'A': ['B'], 'B': ['A', 'C', 'D'], 'C': ['B'], 'D': ['B', 'E'], 'E': ['D']}
+        table = ForwardingTable('A', adjacency)
+        self.assertEqual(table.get_path('E'), ['A', 'B', 'D', 'E'])
+        self.assertEqual(table.get_next_hop('E'), 'B')
+        self.assertIsNone(table.get_path('Z'))
+        self.assertIsNone(table.get_next_hop('A'))
+
+    def test_blocked_links_are_not_used(self):
+        view = {node: states['10'] for node, states in PORT_STATES.items()}
+        table = ForwardingTable.from_port_states('B', view)
+        self.assertEqual(table.get_path('C'), ['B', 'A', 'C'])
+
+    def test_long_chain(self):
+        n = 1000
+        adjacency = {i: [j for j in (i - 1, i + 1) if 0 <= j < n] for i in range(n)}
+        table = ForwardingTable(0, adjacency)
+        self.assertEqual(table.get_next_hop(n - 1), 1)
+        self.assertEqual(table.get_path(n - 1), list(range(n)))
+
+def lsa(origin, vlans, seq=1, epoch=1):
+    return {'origin': origin, 'epoch': epoch, 'seq': seq, 'vlans': vlans}
+
+class TestLinkStateView(unittest.TestCase):
+
+    def setUp(self):
+        self.node = NetworkNode('B', [10], [('A', 'http://A'), ('C', 'http://C')],
+                                link_in_vlan=lambda v, a, b: True, vlan_instances={10: 1})
+        self.posts = []
+        self.node._post = lambda url, data, timeout, on_error=None: self.posts.append((url, data, on_error))
+        # Our own LSA comes from our MSTP state; make B's ports match the triangle above
+        self.node.vlans[10].get_port_states = lambda: dict(PORT_STATES['B']['10'])
+
+    def tearDown(self):
+        self.node.stop()
+
+    def receive_all(self):
+        self.node.receive_lsas('A', [lsa('A', PORT_STATES['A']), lsa('C', PORT_STATES['C'])])
+
+    def test_paths_from_own_view(self):
+        self.assertIsNone(self.node.find_mstp_path('C', 10))
+        self.receive_all()
+        self.assertEqual(self.node.find_mstp_path('C', 10), ['B', 'A', 'C'])
+        self.assertIsNone(self.node.find_mstp_path('B', 10))
+        self.assertIsNone(self.node.find_mstp_path('Z', 10))
+
+    def test_table_is_reused_until_an_lsa_changes_it(self):
+        self.receive_all()
+        table = self.node.get_forwarding_table(10)
+        self.assertIs(self.node.get_forwarding_table(10), table)
+        # Older or repeated LSAs are ignored
+        self.assertEqual(self.node.receive_lsas('C', [lsa('C', {'10': {'A': 'root', 'B': 'designated'}})]), 0)
+        self.assertIs(self.node.get_forwarding_table(10), table)
+        # So are newer LSAs that only change other VLANs
+        self.assertEqual(self.node.receive_lsas('C', [lsa('C', dict(PORT_STATES['C'], **{'20': {'A': 'root'}}), seq=2)]), 1)
+        self.assertIs(self.node.get_forwarding_table(10), table)
+
+        self.assertEqual(self.node.receive_lsas('C', [lsa('C', {'10': {'A': 'root', 'B': 'designated'}}, seq=3)]), 1)
+        self.assertIsNot(self.node.get_forwarding_table(10), table)
+        self.assertEqual(self.node.find_mstp_path('C', 10), ['B', 'C'])
+
+    def test_flooding(self):
+        """New LSAs go to every neighbor except the one they came from."""
+        self.receive_all()
+        self.node._flush_lsas()
+        sent = {url: {l['origin'] for l in data['lsas']} for url, data, _ in self.posts}
+        # A already has what it sent us; it only needs our own LSA
+        self.assertEqual(sent, {'http://A/lsa': {'B'}, 'http://C/lsa': {'A', 'B', 'C'}})
+
+        self.posts.clear()
+        self.node._flush_lsas()
+        self.assertEqual(self.posts, [])
+
+    def test_neighbor_restart_gets_whole_database(self):
+        self.receive_all()
+        self.node._flush_lsas()
+        self.posts.clear()
+        self.node.receive_lsas('C', [lsa('C', PORT_STATES['C'], epoch=2)])
+        self.node._flush_lsas()
+        sent = {url: {l['origin'] for l in data['lsas']} for url, data, _ in self.posts}
+        self.assertEqual(sent, {'http://A/lsa': {'C'}, 'http://C/lsa': {'A', 'B', 'C'}})
+
+    def test_aged_out_neighbor_is_withdrawn(self):
+        """A neighbor that went quiet is left out of our LSA, so its last LSA cannot route through us."""
+        self.receive_all()
+        self.node._expire_neighbor('A')
+        self.assertIsNone(self.node.find_mstp_path('C', 10))
+        self.node._flush_lsas()
+        own = [l for _, d, _ in self.posts for l in d['lsas'] if l['origin'] == 'B'][-1]
+        self.assertEqual(own['vlans'], {'10': {'C': 'designated'}})
+        # Hearing from it again brings the link back
+        self.node.receive_bpdu(10, 'A', {'sender_id': 'A', 'root_id': 'A', 'cost': 0})
+        self.assertEqual(self.node.find_mstp_path('C', 10), ['B', 'A', 'C'])
+
+    def test_failed_sends_are_retried(self):
+        self.node._flush_lsas()
+        url, data, on_error = self.posts[0]
+        on_error()
+        self.posts.clear()
+        self.node._flush_lsas()
+        self.assertEqual([(u, [l['origin'] for l in d['lsas']]) for u, d, _ in self.posts], [(url, ['B'])])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the parent directory to the Python path to import the MSTP engine
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.mstp import MSTP
+
+def bpdu(sender_id, root_id, cost):
+    return {'sender_id': sender_id, 'root_id': root_id, 'cost': cost}
+
+def full_recompute(mstp):
+    """Reference STP computation from scratch over every cached BPDU."""
+    best, best_port = mstp._select_root_port()
+    reference = MSTP(mstp.bridge_id, mstp.ports)
+    reference.received_bpdus = dict(mstp.received_bpdus)
+    reference.root_id, reference.cost_to_root, reference.root_port = best['root_id'], best['cost'], best_port
+    my_bpdu = reference._create_bpdu()
+    states = {port: reference._port_role(port, my_bpdu) for port in mstp.ports}
+    return (reference.root_id, reference.cost_to_root, reference.root_port), states
+
+class TestMSTP(unittest.TestCase):
+
+    def setUp(self):
+        self.mstp = MSTP(bridge_id='C', ports=['A', 'B'])
+
+    def test_better_root_selects_root_port(self):
+        self.assertTrue(self.mstp.receive_bpdu('A', bpdu('A', 'A', 0)))
+        self.assertEqual(self.mstp.root_id, 'A')
+        self.assertEqual(self.mstp.cost_to_root, 1)
+        self.assertEqual(self.mstp.get_port_states(), {'A': 'root', 'B': 'designated'})
+
+    def test_duplicate_bpdu_is_suppressed(self):
+        """An identical hello reports no change and leaves the state untouched."""
+        self.mstp.receive_bpdu('A', bpdu('A', 'A', 0))
+        self.mstp.receive_bpdu('B', bpdu('B', 'A', 1))
+        self.assertFalse(self.mstp.receive_bpdu('B', bpdu('B', 'A', 1)))
+        self.assertEqual(self.mstp.get_port_states(), {'A': 'root', 'B': 'blocked'})
+
+    def test_worse_bpdu_on_root_port_triggers_reelection(self):
+        """When the root port's path gets worse, another port can take over."""
+        self.mstp.receive_bpdu('A', bpdu('A', 'A', 0))
+        self.mstp.receive_bpdu('B', bpdu('B', 'A', 1))
+        self.assertTrue(self.mstp.receive_bpdu('A', bpdu('A', 'A', 5)))
+        self.assertEqual(self.mstp.root_port, 'B')
+        self.assertEqual(self.mstp.cost_to_root, 2)
+        self.assertEqual(self.mstp.get_port_states(), {'A': 'designated', 'B': 'root'})
+
+    def test_expired_root_port_falls_back(self):
+        """Aging out the root port's BPDU moves the root port, then back to being root ourselves."""
+        self.mstp.receive_bpdu('A', bpdu('A', 'A', 0))
+        self.mstp.receive_bpdu('B', bpdu('B', 'A', 1))
+        self.assertTrue(self.mstp.expire_port('A'))
+        self.assertEqual((self.mstp.root_id, self.mstp.cost_to_root, self.mstp.root_port), ('A', 2, 'B'))
+        self.assertEqual(self.mstp.get_port_states(), {'A': 'designated', 'B': 'root'})
+        self.assertFalse(self.mstp.expire_port('A'))
+        self.assertTrue(self.mstp.expire_port('B'))
+        self.assertEqual((self.mstp.root_id, self.mstp.cost_to_root, self.mstp.root_port), ('C', 0, None))
+        self.assertEqual(self.mstp.get_port_states(), {'A': 'designated', 'B': 'designated'})
+
+    def test_incremental_matches_full_recompute(self):
+        """Randomised BPDU sequences give the same result as a from-scratch computation."""
+        rng = random.Random(7)
+        ids = ['B', 'D', 'F', 'H', 'K', 'M']
+        for _ in range(200):
+            mstp = MSTP(bridge_id=rng.choice(ids + ['E']), ports=['P1', 'P2', 'P3', 'P4'])
+            # One neighbor per port, as on point-to-point links
+            senders = dict(zip(mstp.ports, rng.sample(ids, len(mstp.ports))))
+            for _ in range(30):
+                port = rng.choice(mstp.ports)
+                mstp.receive_bpdu(port, bpdu(senders[port], rng.choice(ids), rng.randint(0, 4)))
+                root, states = full_recompute(mstp)
+                self.assertEqual((mstp.root_id, mstp.cost_to_root, mstp.root_port), root)
+                self.assertEqual(mstp.get_port_states(), states)
+
+if __name__ == '__main__':
+    unittest.main()
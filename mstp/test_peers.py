@@ -0,0 +1,110 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the Python path to import the peer module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from mstp.peers import CircuitBreaker, PeerLink, PeerPool
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, base_backoff=2.0, max_backoff=5.0, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        """Sends are allowed until the failure threshold is reached."""
+        for _ in range(2):
+            self.breaker.record_failure()
+            self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_allows_one_trial_and_backs_off(self):
+        """After the back-off a single trial is allowed; a failed trial doubles the back-off."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 2.0
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.backoff, 4.0)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.backoff, 5.0)  # capped at max_backoff
+
+    def test_success_closes_breaker(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now = 2.0
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.consecutive_failures, 0)
+
+class TestPeerPool(unittest.TestCase):
+
+    def test_dead_neighbor_does_not_delay_others(self):
+        """A neighbor that times out does not hold up sends to the other neighbors."""
+        delivered = threading.Event()
+
+        def fake_post(self_session, url, json, timeout):
+            if url.startswith('http://dead'):
+                time.sleep(0.5)
+                raise requests.ConnectTimeout()
+            delivered.set()
+            return MagicMock(ok=True, status_code=200)
+
+        pool = PeerPool([('B', 'http://dead'), ('C', 'http://alive')])
+        with patch('requests.Session.post', fake_post):
+            started = time.perf_counter()
+            pool.send('B', '/bpdus', {})
+            pool.send('C', '/bpdus', {})
+            self.assertTrue(delivered.wait(0.4))
+            self.assertLess(time.perf_counter() - started, 0.4)
+            # B is still busy with the previous message: newer frames wait, replacing each other
+            self.assertTrue(pool.send('B', '/bpdus', {'n': 1}))
+            self.assertTrue(pool.send('B', '/bpdus', {'n': 2}))
+            self.assertEqual(pool.links['B'].pending, (pool.links['B'].post, ('/bpdus', {'n': 2})))
+        pool.close()
+
+        stats = pool.get_stats()
+        self.assertEqual(stats['C']['sent'], 1)
+        self.assertEqual(stats['B']['coalesced'], 1)
+        self.assertEqual(stats['C']['breaker'], CircuitBreaker.CLOSED)
+
+class TestWireFormatNegotiation(unittest.TestCase):
+
+    FRAME = {'from': 'A', 'bpdus': [{'msti': 0, 'bpdu': {'sender_id': 'A', 'root_id': 'A', 'cost': 0}}]}
+
+    def test_binary_frame_is_sent_when_supported(self):
+        link = PeerLink('B', 'http://b')
+        with patch.object(link.session, 'post', return_value=MagicMock(status_code=204)) as post:
+            self.assertTrue(link.post_frame(self.FRAME))
+        self.assertEqual(post.call_args[0][0], 'http://b/bpdu-frame')
+        self.assertEqual(link.wire_format, 'binary')
+
+    def test_falls_back_to_json_for_older_neighbors(self):
+        """A neighbor without the binary endpoint gets JSON from then on."""
+        link = PeerLink('B', 'http://b')
+        responses = [MagicMock(status_code=404), MagicMock(status_code=200)]
+        with patch.object(link.session, 'post', side_effect=responses) as post:
+            self.assertTrue(link.post_frame(self.FRAME))
+        self.assertEqual(post.call_args[0][0], 'http://b/bpdus')
+        self.assertEqual(post.call_args[1]['json'], self.FRAME)
+        self.assertEqual(link.wire_format, 'json')
+        self.assertEqual(link.stats.failures, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the simulator and config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.simulation import Simulator
+import config
+
+TRIANGLE = ["A:B", "B:C", "C:A"]
+
+class TestSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.sim = Simulator(["A", "B", "C"], TRIANGLE, {10: TRIANGLE, 20: ["A:B", "B:C"]})
+
+    def test_triangle_converges_with_one_blocked_port(self):
+        """The lowest bridge ID becomes root and the redundant link is blocked once."""
+        self.sim.run_until_converged()
+        states = self.sim.global_port_states()
+        self.assertEqual(states["A"]["10"], {"B": "designated", "C": "designated"})
+        self.assertEqual(states["B"]["10"], {"A": "root", "C": "designated"})
+        self.assertEqual(states["C"]["10"], {"B": "blocked", "A": "root"})
+
+    def test_vlan_membership_limits_ports(self):
+        """A VLAN only runs spanning tree on the links assigned to it."""
+        self.sim.run_until_converged()
+        self.assertEqual(self.sim.nodes["C"].get_vlan_port_states(20), {"B": "root"})
+        self.assertEqual(self.sim.nodes["A"].get_vlan_port_states(20), {"B": "designated"})
+
+    def test_transfer_follows_active_tree(self):
+        """Transfers reuse NetworkNode path finding and complete on the virtual clock."""
+        self.sim.run_until_converged()
+        transfer_id = self.sim.start_transfer("B", "C", 10, 10)
+        # B-C is blocked on VLAN 10, so the transfer must go through the root.
+        self.assertEqual(self.sim.nodes["B"].get_transfer_status()[transfer_id]["path"], ["B", "A", "C"])
+        self.sim.run()
+        record = self.sim.transfers[transfer_id]
+        self.assertIsNotNone(record["completed_at"])
+        self.assertGreater(record["completed_at"] - record["started_at"], 2.0)
+
+    def test_transfer_to_down_node_fails(self):
+        """A hop to an unreachable node marks the transfer as failed on the source."""
+        self.sim.run_until_converged()
+        transfer_id = self.sim.start_transfer("B", "C", 20, 1)
+        self.sim.set_node_down("C")
+        self.sim.run(until=self.sim.now + 1)
+        self.assertEqual(self.sim.nodes["B"].get_transfer_status()[transfer_id]["status"], "failed")
+
+class TestTriggeredBPDUs(unittest.TestCase):
+
+    def chain(self, length, triggered):
+        node_ids = [f"N{i:02d}" for i in range(length)]
+        links = [f"{a}:{b}" for a, b in zip(node_ids, node_ids[1:])]
+        sim = Simulator(node_ids[::-1], links, {10: links}, triggered=triggered)
+        sim.run_until_converged()
+        return sim
+
+    def test_triggered_bpdus_converge_in_milliseconds_per_hop(self):
+        """Changes propagate immediately instead of waiting for the next hello on every hop."""
+        periodic = self.chain(20, triggered=False)
+        triggered = self.chain(20, triggered=True)
+        self.assertEqual(periodic.global_port_states(), triggered.global_port_states())
+        # Everything settles within the first hello round (2 s) plus ~11 ms per hop
+        self.assertLess(triggered.converged_at, 2.0 + 20 * 0.015)
+        self.assertGreater(periodic.converged_at, 10.0)
+
+    def test_restarted_neighbor_is_answered_immediately(self):
+        """A bridge that forgot its state relearns the root without waiting for a keep-alive."""
+        sim = Simulator(["A", "B", "C"], TRIANGLE, {10: TRIANGLE})
+        sim.run_until_converged()
+        converged = sim.global_port_states()
+        for mstp in sim.nodes["C"].instances.values():
+            mstp.__init__(bridge_id="C", ports=mstp.ports)
+        sim.set_node_down("C", down=False)  # comes back and sends its first hello
+        sim.run_until_converged()
+        self.assertEqual(sim.global_port_states(), converged)
+
+class TestMSTInstances(unittest.TestCase):
+
+    def test_vlans_share_their_instance_tree(self):
+        """VLANs mapped onto one MSTI get the same port states from one spanning tree."""
+        vlan_links = {vlan_id: TRIANGLE for vlan_id in range(100, 300)}
+        sim = Simulator(["A", "B", "C"], TRIANGLE, vlan_links, mst_instances={1: list(range(100, 300))})
+        sim.run_until_converged()
+        node = sim.nodes["C"]
+        self.assertEqual(set(node.instances), {0, 1})
+        self.assertEqual(node.get_vlan_port_states(100), node.get_vlan_port_states(299))
+        self.assertIs(node.vlans[100].mstp, node.vlans[299].mstp)
+
+    def test_bpdu_volume_scales_with_instances_not_vlans(self):
+        """The number of BPDUs depends on the instance count, not on the VLAN count."""
+        few = Simulator(["A", "B", "C"], TRIANGLE, {10: TRIANGLE}, mst_instances={1: [10]})
+        many = Simulator(["A", "B", "C"], TRIANGLE, {v: TRIANGLE for v in range(200)}, mst_instances={1: list(range(200))})
+        few.run_until_converged()
+        many.run_until_converged()
+        self.assertEqual(few.bpdus_delivered, many.bpdus_delivered)
+
+    def test_one_frame_per_neighbor_carries_every_instance(self):
+        """Each neighbor gets a single BPDU frame with one record per instance on the link."""
+        vlan_links = {10: TRIANGLE, 20: TRIANGLE, 30: ["A:B"]}
+        sim = Simulator(["A", "B", "C"], TRIANGLE, vlan_links, mst_instances={1: [10], 2: [20], 3: [30]})
+        frames = sim.nodes["A"].build_bpdu_frames()
+        self.assertEqual(set(frames), {"B", "C"})
+        self.assertEqual([r["msti"] for r in frames["B"]["bpdus"]], [0, 1, 2, 3])
+        self.assertEqual([r["msti"] for r in frames["C"]["bpdus"]], [0, 1, 2])
+
+class TestChunkedTransfers(unittest.TestCase):
+    """4 MB over a 4-hop chain at 5 MB/s in 0.5 MB chunks: 0.8 s per link for the whole file."""
+
+    def setUp(self):
+        node_ids = [f"N{i}" for i in range(5)]
+        links = [f"{a}:{b}" for a, b in zip(node_ids, node_ids[1:])]
+        self.sim = Simulator(node_ids, links, {10: links}, link_delay=0.0)
+        self.sim.run_until_converged()
+
+    def transfer_time(self, mode):
+        transfer_id = self.sim.start_transfer("N0", "N4", 10, 4, mode)
+        self.sim.run()
+        record = self.sim.transfers[transfer_id]
+        return record["completed_at"] - record["started_at"]
+
+    def test_store_and_forward_pays_the_file_time_on_every_hop(self):
+        self.assertAlmostEqual(self.transfer_time("store-and-forward"), 4 * 0.8, places=6)
+
+    def test_cut_through_pipelines_chunks(self):
+        # The file once, plus one chunk time (0.1 s) per extra hop
+        self.assertAlmostEqual(self.transfer_time("cut-through"), 0.8 + 3 * 0.1, places=6)
+
+    def test_single_message_ignores_path_length(self):
+        self.assertAlmostEqual(self.transfer_time("single"), 0.8, places=6)
+
+    def test_hop_buffers_are_bounded(self):
+        """Credits keep every hop's buffer within TRANSFER_WINDOW, even behind a slow hop."""
+        node = self.sim.nodes["N2"]
+        peak = []
+        receive_chunk = node.receive_chunk
+        def recording_receive_chunk(transfer_id, seq, hops, **header):
+            receive_chunk(transfer_id, seq, hops, **header)
+            stream = node._streams.get(transfer_id)
+            peak.append(len(stream.buffer) if stream else 0)
+        node.receive_chunk = recording_receive_chunk
+        # N2 transmits four times slower than everyone else
+        slow_call_later = node._call_later
+        node._call_later = lambda delay, fn, *args: slow_call_later(delay * 4, fn, *args)
+        self.transfer_time("cut-through")
+        self.assertLessEqual(max(peak), config.TRANSFER_WINDOW)
+        self.assertGreaterEqual(max(peak), config.TRANSFER_WINDOW - 1)
+        self.assertEqual(node._streams, {})
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.sim.start_transfer("N0", "N4", 10, 4, "teleport")
+
+    def test_failure_stops_the_hops_after_the_failed_one(self):
+        """A hop that cannot deliver fails the stream on the source and on the hops past it."""
+        transfer_id = self.sim.start_transfer("N0", "N4", 10, 4, "cut-through")
+        self.sim.run(until=self.sim.now + 0.45) # The first chunks have reached N4
+        self.assertIn(transfer_id, self.sim.nodes["N4"]._streams)
+        middle = self.sim.nodes["N2"]
+        middle._fail_stream(middle._streams[transfer_id])
+        self.sim.run(until=self.sim.now + 5)
+        for node_id in ("N0", "N2", "N3", "N4"):
+            node = self.sim.nodes[node_id]
+            self.assertEqual(node._streams, {}, node_id)
+            self.assertEqual(node.get_transfer_status()[transfer_id]["status"], "failed", node_id)
+        self.assertIsNone(self.sim.transfers[transfer_id]["completed_at"])
+
+    def test_straggler_after_completion_is_dropped(self):
+        transfer_id = self.sim.start_transfer("N0", "N4", 10, 4, "cut-through")
+        self.sim.run(until=self.sim.now + 5)
+        dst = self.sim.nodes["N4"]
+        self.assertEqual(dst.get_transfer_status()[transfer_id]["status"], "done")
+        header = {'src': 'N0', 'dst': 'N4', 'payload': 'data', 'file_size_mb': 4, 'vlan_id': 10,
+                  'path': ["N0", "N1", "N2", "N3", "N4"], 'mode': 'cut-through', 'chunk_mb': 0.5, 'chunks': 8}
+        dst.receive_chunk(transfer_id, 7, 4, **header)
+        self.assertEqual(dst._streams, {})
+
+if __name__ == '__main__':
+    unittest.main()
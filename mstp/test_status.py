@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the parent directory to the Python path to import the status module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.status import StatusLog, parse_version
+
+class TestStatusLog(unittest.TestCase):
+
+    def setUp(self):
+        self.log = StatusLog(max_keys=3)
+        self.start = self.log.version
+
+    def test_changes_since_a_version(self):
+        self.log.touch(('transfer', 't1'))
+        self.log.touch(('instance', 0))
+        self.log.touch(('transfer', 't1'))
+        self.assertEqual(self.log.version, self.start + 3)
+        self.assertEqual(set(self.log.changes_since(self.start)[1]), {('transfer', 't1'), ('instance', 0)})
+        self.assertEqual(self.log.changes_since(self.start + 2)[1], [('transfer', 't1')])
+        self.assertEqual(self.log.changes_since(self.log.version)[1], [])
+
+    def test_unknown_versions_need_a_full_status(self):
+        self.assertIsNone(self.log.changes_since(None)[1])
+        self.assertIsNone(self.log.changes_since(self.start - 1)[1])
+        self.assertIsNone(self.log.changes_since(self.start + 1)[1])
+        for i in range(5):
+            self.log.touch(('transfer', i))
+        # Only the last 3 keys are kept
+        self.assertIsNone(self.log.changes_since(self.start + 1)[1])
+        self.assertEqual(len(self.log.changes_since(self.start + 2)[1]), 3)
+
+    def test_wait(self):
+        self.assertFalse(self.log.wait(self.start, 0.01))
+        threading.Timer(0.05, self.log.touch, [('instance', 0)]).start()
+        self.assertTrue(self.log.wait(self.start, 2))
+
+    def test_parse_version(self):
+        self.assertEqual(parse_version('12'), 12)
+        self.assertEqual(parse_version('W/"12"'), 12)
+        self.assertIsNone(parse_version('abc'))
+        self.assertIsNone(parse_version(None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import threading
+
+# Add the parent directory to the Python path to import the timers module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.timers import TimerWheel
+from mstp.network import NetworkNode
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+class TestTimerWheel(unittest.TestCase):
+    """Drives _advance() by hand on a fake clock; the wheel is stopped so its thread exits at once."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wheel = TimerWheel(tick=0.1, slots=8, clock=self.clock)
+        self.wheel.stop()
+        self.fired = []
+
+    def advance(self, seconds):
+        self.clock.now += seconds
+        for timer in self.wheel._advance():
+            timer.fn(*timer.args)
+
+    def test_fires_after_delay(self):
+        self.wheel.schedule(0.35, self.fired.append, 'a')
+        self.advance(0.3)
+        self.assertEqual(self.fired, [])
+        self.advance(0.1)
+        self.assertEqual(self.fired, ['a'])
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_cancel(self):
+        timer = self.wheel.schedule(0.2, self.fired.append, 'a')
+        self.wheel.schedule(0.2, self.fired.append, 'b')
+        timer.cancel()
+        timer.cancel()
+        self.assertEqual(len(self.wheel), 1)
+        self.advance(1)
+        self.assertEqual(self.fired, ['b'])
+
+    def test_delays_longer_than_one_turn(self):
+        """8 slots of 0.1 s: a 2.05 s timer waits two full turns of the wheel."""
+        self.wheel.schedule(2.05, self.fired.append, 'late')
+        self.wheel.schedule(0.5, self.fired.append, 'early')
+        self.advance(1.0)
+        self.assertEqual(self.fired, ['early'])
+        self.advance(1.0)
+        self.assertEqual(self.fired, ['early'])
+        self.advance(0.1)
+        self.assertEqual(self.fired, ['early', 'late'])
+
+class TestRealTime(unittest.TestCase):
+
+    def test_one_thread_for_all_timers(self):
+        wheel = TimerWheel()
+        before = threading.active_count()
+        for i in range(100):
+            wheel.schedule(60 + i, print, i)
+        self.assertEqual(threading.active_count(), before + 1)
+        wheel.stop()
+
+    def test_callbacks_run_on_the_wheel_thread(self):
+        wheel = TimerWheel(tick=0.01, slots=16)
+        done = threading.Event()
+        wheel.schedule(0.05, done.set)
+        self.assertTrue(done.wait(2))
+        wheel.stop()
+
+class TestNodeTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.node = NetworkNode('C', [10], [('A', 'http://A'), ('B', 'http://B')],
+                                link_in_vlan=lambda v, a, b: True, vlan_instances={10: 0})
+        self.node._wake_bpdu_sender = lambda: None
+        self.node.bpdu_max_age = 0.05
+
+    def tearDown(self):
+        self.node.stop()
+
+    def test_silent_neighbor_is_aged_out(self):
+        expired = threading.Event()
+        expire = self.node._expire_neighbor
+        self.node._expire_neighbor = lambda port: (expire(port), expired.set())
+        self.node.receive_bpdu(10, 'A', {'sender_id': 'A', 'root_id': 'A', 'cost': 0})
+        self.assertEqual(self.node.vlans[10].mstp.root_id, 'A')
+        self.assertTrue(expired.wait(2))
+        self.assertEqual(self.node.vlans[10].mstp.root_id, 'C')
+        self.assertEqual(self.node._take_triggered_ports(), {'A', 'B'})
+
+    def test_status_cleanup_is_rescheduled(self):
+        self.node.transfer_status['t'] = {'status': 'failed'}
+        self.node._schedule_cleanup('t')
+        first = self.node._cleanup_timers['t']
+        self.node._schedule_cleanup('t')
+        self.assertIsNone(first.slot)
+        self.assertEqual(len(self.node._timers), 1)
+
+    def test_concurrent_timeouts_share_one_wheel(self):
+        wheel = self.node._timers
+        threads = [threading.Thread(target=self.node._call_later, args=(60, print)) for _ in range(8)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        self.assertIs(self.node._timers, wheel)
+        self.assertEqual(len(wheel), 8)
+
+if __name__ == '__main__':
+    unittest.main()
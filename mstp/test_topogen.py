@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path to import the generator and simulator
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp import topogen
+from mstp.simulation import Simulator
+
+class TestTopologyGenerator(unittest.TestCase):
+
+    def assertSimple(self, nodes, links):
+        """Every link joins two distinct known nodes and appears once in either direction."""
+        pairs = [frozenset(link.split(':')) for link in links]
+        self.assertEqual(len(set(pairs)), len(pairs))
+        for pair in pairs:
+            self.assertEqual(len(pair), 2)
+            self.assertTrue(pair <= set(nodes))
+        self.assertTrue(all(len(node_id.encode()) <= 8 for node_id in nodes))
+
+    def test_sizes(self):
+        cases = {
+            ('ring', 6): (6, 6),
+            ('mesh', 5): (5, 10),
+            ('tree', 7): (7, 6),
+            ('grid', 3): (9, 12),
+            ('fat-tree', 4): (20, 32), # 4 core, 8 aggregation, 8 edge
+            ('clos', 8): (10, 16), # 2 spines, 8 leaves
+            ('random', 30): (30, 45), # average degree 3
+        }
+        for (name, size), (node_count, link_count) in cases.items():
+            nodes, links = topogen.build(name, size)
+            self.assertEqual((len(nodes), len(links)), (node_count, link_count), name)
+            self.assertSimple(nodes, links)
+
+    def test_random_graph_is_connected(self):
+        nodes, links = topogen.random_graph(50, degree=2.5, seed=3)
+        adjacency = {node_id: set() for node_id in nodes}
+        for link in links:
+            a, b = link.split(':')
+            adjacency[a].add(b); adjacency[b].add(a)
+        seen, stack = {nodes[0]}, [nodes[0]]
+        while stack:
+            for neighbor in adjacency[stack.pop()] - seen:
+                seen.add(neighbor); stack.append(neighbor)
+        self.assertEqual(seen, set(nodes))
+        self.assertNotEqual(links, topogen.random_graph(50, degree=2.5, seed=4)[1])
+
+    def test_vlan_density_and_instances(self):
+        _, links = topogen.grid(6)
+        vlans = topogen.assign_vlans(links, 4, density=0.5, seed=1)
+        self.assertEqual(list(vlans), [10, 11, 12, 13])
+        for vlan_links in vlans.values():
+            self.assertTrue(set(vlan_links) <= set(links))
+            self.assertLess(len(vlan_links), len(links))
+        self.assertEqual(topogen.assign_instances(vlans, 3), {1: [10, 13], 2: [11], 3: [12]})
+        self.assertEqual(topogen.assign_instances(vlans, 0), {})
+        with self.assertRaises(ValueError):
+            topogen.assign_instances(vlans, -1)
+
+    def test_generated_topology_converges_to_a_tree(self):
+        """Each VLAN ends up with a spanning tree of the fat-tree: one forwarding link fewer than nodes."""
+        nodes, links = topogen.fat_tree(4)
+        sim = Simulator(nodes, links, topogen.assign_vlans(links, 2), link_state=False)
+        sim.run_until_converged()
+        for vlan in ('10', '11'):
+            forwarding = {frozenset((node_id, neighbor)) for node_id, vlans in sim.global_port_states().items()
+                          for neighbor, state in vlans[vlan].items() if state != 'blocked'}
+            blocked = {frozenset((node_id, neighbor)) for node_id, vlans in sim.global_port_states().items()
+                       for neighbor, state in vlans[vlan].items() if state == 'blocked'}
+            self.assertEqual(len(forwarding - blocked), len(nodes) - 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+import sys
+import os
+import json
+import socket
+import time
+
+# Add the parent directory to the Python path to import the transport module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.network import NetworkNode
+from mstp.transport import LoopbackHub, LoopbackTransport, UdpTransport, create_transport
+
+TRIANGLE = {'A': ['B', 'C'], 'B': ['A', 'C'], 'C': ['A', 'B']}
+
+def make_node(node_id, transport):
+    neighbors = [(n, f'http://{n}') for n in TRIANGLE[node_id]]
+    return NetworkNode(node_id, [10], neighbors, link_in_vlan=lambda v, a, b: True,
+                       vlan_instances={10: 1}, transport=transport)
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition(): return True
+        time.sleep(0.01)
+    return condition()
+
+class TestLoopbackTransport(unittest.TestCase):
+
+    def test_triangle_converges(self):
+        """Nodes exchanging BPDUs in memory elect A as root and block one link."""
+        hub = LoopbackHub()
+        nodes = [make_node(node_id, LoopbackTransport(hub)) for node_id in TRIANGLE]
+        for node in nodes:
+            node.start_transport()
+        for _ in range(3):
+            for node in nodes:
+                node.send_bpdus()
+
+        for node in nodes:
+            self.assertEqual(node.instances[1].root_id, 'A')
+        blocked = [(node.node_id, port) for node in nodes
+                   for port, state in node.get_vlan_port_states(10).items() if state == 'blocked']
+        self.assertEqual(len(blocked), 1)
+        self.assertEqual(nodes[0].get_transport_name(), 'loopback')
+        self.assertEqual(nodes[0].get_peer_stats()['B']['sent'], 3)
+
+    def test_close_before_start(self):
+        LoopbackTransport(LoopbackHub()).close()
+
+    def test_unknown_neighbor_counts_failure(self):
+        hub = LoopbackHub()
+        node = make_node('A', LoopbackTransport(hub))
+        node.start_transport()
+        node.send_bpdus()
+        self.assertEqual(node.get_peer_stats()['B']['failures'], 1)
+
+class TestUdpTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.transports = {node_id: UdpTransport(('127.0.0.1', 0), {}) for node_id in ('A', 'B')}
+        self.transports['A'].add_peer('B', self.transports['B'].address)
+        self.transports['B'].add_peer('A', self.transports['A'].address)
+        self.nodes = {node_id: make_node(node_id, transport) for node_id, transport in self.transports.items()}
+        for node in self.nodes.values():
+            node.start_transport()
+
+    def tearDown(self):
+        for node in self.nodes.values():
+            node.stop()
+
+    def test_bpdus_travel_as_datagrams(self):
+        """B learns A's root over UDP; sends to neighbors without an address are ignored."""
+        self.nodes['A'].send_bpdus()
+        self.assertTrue(wait_for(lambda: self.nodes['B'].instances[1].root_id == 'A'))
+        self.assertEqual(self.transports['B'].received, 1)
+        self.assertEqual(self.nodes['A'].get_peer_stats()['B']['sent'], 1)
+        self.assertEqual(self.nodes['A'].get_transport_name(), 'udp')
+
+    def test_json_datagrams_and_malformed_input(self):
+        """JSON frames are accepted (long IDs); garbage is counted and dropped."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.sendto(b'MB\x09garbage', self.transports['B'].address)
+            frame = {'from': 'A', 'bpdus': [{'msti': 1, 'bpdu': {'sender_id': 'A', 'root_id': '0-root-bridge', 'cost': 4}}]}
+            sock.sendto(json.dumps(frame).encode(), self.transports['B'].address)
+        finally:
+            sock.close()
+        self.assertTrue(wait_for(lambda: self.nodes['B'].instances[1].root_id == '0-root-bridge'))
+        self.assertEqual(self.transports['B'].malformed, 1)
+
+    def test_receiver_survives_any_datagram(self):
+        """Frames of the wrong shape, or that the node cannot apply, never stop the receiver thread."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for bad in ([1, 2], {'from': 'A', 'bpdus': [{'msti': 1}]}, {'from': 'A', 'bpdus': [{'msti': 1, 'bpdu': {}}]}):
+                sock.sendto(json.dumps(bad).encode(), self.transports['B'].address)
+            frame = {'from': 'A', 'bpdus': [{'msti': 1, 'bpdu': {'sender_id': 'A', 'root_id': '0-root-bridge', 'cost': 4}}]}
+            sock.sendto(json.dumps(frame).encode(), self.transports['B'].address)
+        finally:
+            sock.close()
+        self.assertTrue(wait_for(lambda: self.nodes['B'].instances[1].root_id == '0-root-bridge'))
+        self.assertEqual(self.transports['B'].malformed, 3)
+        self.assertEqual(self.transports['B'].received, 1)
+
+    def test_bpdu_fields_are_checked_before_any_record_is_applied(self):
+        good = {'msti': 1, 'bpdu': {'sender_id': 'A', 'root_id': 'A', 'cost': 0}}
+        self.assertEqual(UdpTransport._parse(json.dumps({'from': 'A', 'bpdus': [good]}).encode()), ('A', [good]))
+        for bad in ({'sender_id': 'A', 'root_id': 'A'}, {'sender_id': 'A', 'cost': 0}, {'root_id': 'A', 'cost': 0},
+                    {'sender_id': 'A', 'root_id': 'A', 'cost': '0'}, {'sender_id': 'A', 'root_id': ['A'], 'cost': 0}):
+            frame = {'from': 'A', 'bpdus': [good, {'msti': 2, 'bpdu': bad}]}
+            self.assertIsNone(UdpTransport._parse(json.dumps(frame).encode()), bad)
+        self.assertIsNone(UdpTransport._parse(json.dumps({'from': 'A', 'bpdus': [dict(good, msti=[1])]}).encode()))
+
+class TestCreateTransport(unittest.TestCase):
+
+    def test_unknown_transport(self):
+        with self.assertRaises(ValueError):
+            create_transport('carrier-pigeon', 'A', [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import threading
+from unittest import mock
+
+# Add the parent directory to the Python path to import the workers module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mstp.workers import WorkerPool
+from mstp.network import NetworkNode
+import config
+
+class TestWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.pool = WorkerPool(size=1, max_queue=2)
+
+    def tearDown(self):
+        self.release.set()
+        self.pool.stop()
+
+    def test_full_queue_refuses_tasks(self):
+        started = threading.Event()
+        self.assertTrue(self.pool.submit(lambda: (started.set(), self.release.wait(5))))
+        self.assertTrue(started.wait(2))
+        self.assertTrue(self.pool.submit(self.release.wait, 5))
+        self.assertTrue(self.pool.submit(self.release.wait, 5))
+        self.assertTrue(self.pool.is_full())
+        self.assertFalse(self.pool.submit(print))
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['active'], stats['queue_depth'], stats['rejected']), (1, 2, 1))
+
+    def test_stats_after_tasks_run(self):
+        self.pool = WorkerPool(size=1, max_queue=8)
+        done = threading.Event()
+        for _ in range(2):
+            self.pool.submit(lambda: None)
+        self.pool.submit(done.set)
+        self.assertTrue(done.wait(2))
+        self.pool.stop()
+        self.pool._threads[0].join(2)
+        stats = self.pool.get_stats()
+        self.assertEqual((stats['submitted'], stats['completed'], stats['queue_depth']), (3, 3, 0))
+        self.assertIsNotNone(stats['avg_wait_ms'])
+        self.assertFalse(self.pool.submit(print))
+
+    def test_stop_with_a_full_queue_does_not_block(self):
+        started, done = threading.Event(), threading.Event()
+        self.pool.submit(lambda: (started.set(), self.release.wait(5)))
+        self.assertTrue(started.wait(2))
+        self.pool.submit(lambda: None)
+        self.pool.submit(done.set)
+        self.assertTrue(self.pool.is_full())
+        stopper = threading.Thread(target=self.pool.stop)
+        stopper.start()
+        stopper.join(1)
+        self.assertFalse(stopper.is_alive())
+        # The queued tasks still run before the worker exits
+        self.release.set()
+        self.assertTrue(done.wait(2))
+        self.pool._threads[0].join(2)
+        self.assertFalse(self.pool._threads[0].is_alive())
+
+class TestOverload(unittest.TestCase):
+    """A node whose only worker is stuck and whose queue is full."""
+
+    def setUp(self):
+        self.node = NetworkNode('A', [10], [('B', 'http://B')], link_in_vlan=lambda v, a, b: True, vlan_instances={10: 0})
+        self.node.find_mstp_path = lambda dst, vlan: ['A', 'B']
+        self.release = threading.Event()
+        self.node.workers = WorkerPool(size=1, max_queue=1)
+        started = threading.Event()
+        self.node.workers.submit(lambda: (started.set(), self.release.wait(5)))
+        started.wait(2)
+        self.node.workers.submit(self.release.wait, 5)
+
+    def tearDown(self):
+        self.release.set()
+        self.node.stop()
+
+    def wait_for_status(self, transfer_id, status):
+        for _ in range(200):
+            if self.node.transfer_status[transfer_id]['status'] == status:
+                return True
+            threading.Event().wait(0.01)
+        return False
+
+    def test_refused_hop_fails_the_transfer(self):
+        transfer_id = self.node.send_transfer('B', 'data', 1, 10, mode='single')
+        self.assertTrue(self.wait_for_status(transfer_id, 'failed'))
+
+    def test_reject_policy_refuses_new_transfers(self):
+        with mock.patch.object(config, 'TRANSFER_OVERLOAD', 'reject'):
+            transfer_id = self.node.send_transfer('B', 'data', 1, 10, mode='single')
+        self.assertEqual(self.node.transfer_status[transfer_id]['status'], 'rejected')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import math
+import threading
+import time
+import traceback
+
+
+class Timer:
+    """Handle for a callback scheduled on a TimerWheel."""
+    __slots__ = ('wheel', 'slot', 'rounds', 'fn', 'args')
+
+    def __init__(self, wheel, fn, args):
+        self.wheel = wheel
+        self.slot = None # The slot set holding this timer, None once fired or cancelled
+        self.rounds = 0 # Full turns of the wheel left before it fires
+        self.fn = fn
+        self.args = args
+
+    def cancel(self):
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel (Varghese & Lauck): `slots` buckets of `tick` seconds served
+    by a single thread. A timer due in n ticks goes into bucket (now + n) % slots
+    with n // slots rounds to wait, so scheduling and cancelling are O(1) and each
+    tick only looks at one bucket. Timers fire on the wheel thread, up to one tick
+    late, and must not block.
+    """
+    def __init__(self, tick=0.01, slots=512, clock=time.monotonic):
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self.clock = clock
+        self._started_at = clock()
+        self._next_tick = 0 # The tick the thread processes next
+        self._count = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def __len__(self):
+        return self._count
+
+    def _current_tick(self):
+        return int((self.clock() - self._started_at) / self.tick)
+
+    def schedule(self, delay, fn, *args):
+        """Calls fn(*args) after at least `delay` seconds. Returns a Timer that can be cancelled."""
+        timer = Timer(self, fn, args)
+        deadline = math.ceil((self.clock() + delay - self._started_at) / self.tick)
+        with self._lock:
+            if not self._count:
+                # Nothing scheduled: skip the empty ticks since the wheel went idle
+                self._next_tick = max(self._next_tick, self._current_tick())
+            target = max(deadline, self._next_tick)
+            timer.rounds = (target - self._next_tick) // len(self.slots)
+            timer.slot = self.slots[target % len(self.slots)]
+            timer.slot.add(timer)
+            self._count += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='timer-wheel')
+                self._thread.start()
+        self._wakeup.set()
+        return timer
+
+    def cancel(self, timer):
+        with self._lock:
+            if timer.slot is not None:
+                timer.slot.discard(timer)
+                timer.slot = None
+                self._count -= 1
+
+    def _advance(self):
+        """Processes every tick up to now and returns the timers that are due."""
+        due = []
+        with self._lock:
+            current = self._current_tick()
+            while self._next_tick <= current:
+                slot = self.slots[self._next_tick % len(self.slots)]
+                for timer in list(slot):
+                    if timer.rounds:
+                        timer.rounds -= 1
+                    else:
+                        slot.discard(timer)
+                        timer.slot = None
+                        due.append(timer)
+                self._next_tick += 1
+            self._count -= len(due)
+        return due
+
+    def _run(self):
+        while not self._stopped:
+            with self._lock:
+                idle = not self._count
+                if idle:
+                    self._wakeup.clear()
+            if idle:
+                self._wakeup.wait()
+                continue
+            for timer in self._advance():
+                try:
+                    timer.fn(*timer.args)
+                except Exception:
+                    traceback.print_exc()
+            time.sleep(max(0.0, self._started_at + self._next_tick * self.tick - self.clock()))
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
@@ -0,0 +1,131 @@
+import json
+import random
+
+# Synthetic topologies in config.py form: node IDs and "Node1:Node2" links.
+# Node IDs stay within 8 bytes so that the binary BPDU format can carry them.
+
+
+def _link(a, b):
+    return f"{a}:{b}"
+
+def ring(n):
+    nodes = [f"R{i}" for i in range(n)]
+    links = [_link(nodes[i], nodes[(i + 1) % n]) for i in range(n)] if n > 2 else [_link(*nodes)] if n == 2 else []
+    return nodes, links
+
+def full_mesh(n):
+    nodes = [f"M{i}" for i in range(n)]
+    return nodes, [_link(nodes[i], nodes[j]) for i in range(n) for j in range(i + 1, n)]
+
+def tree(n, fanout=2):
+    """A complete `fanout`-ary tree of n bridges (no loops: nothing to block)."""
+    nodes = [f"T{i}" for i in range(n)]
+    return nodes, [_link(nodes[(i - 1) // fanout], nodes[i]) for i in range(1, n)]
+
+def grid(rows, cols=None):
+    cols = cols or rows
+    nodes = [f"G{r}_{c}" for r in range(rows) for c in range(cols)]
+    links = []
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols: links.append(_link(f"G{r}_{c}", f"G{r}_{c + 1}"))
+            if r + 1 < rows: links.append(_link(f"G{r}_{c}", f"G{r + 1}_{c}"))
+    return nodes, links
+
+def fat_tree(k):
+    """
+    The switches of a k-ary fat-tree (k even): (k/2)^2 core switches and k pods of
+    k/2 aggregation and k/2 edge switches, every edge switch wired to every
+    aggregation switch in its pod and aggregation switch j to core group j.
+    """
+    half = k // 2
+    core = [f"C{i}" for i in range(half * half)]
+    nodes, links = list(core), []
+    for pod in range(k):
+        aggs = [f"A{pod}_{j}" for j in range(half)]
+        edges = [f"E{pod}_{j}" for j in range(half)]
+        nodes += aggs + edges
+        links += [_link(agg, edge) for agg in aggs for edge in edges]
+        for j, agg in enumerate(aggs):
+            links += [_link(agg, core[j * half + i]) for i in range(half)]
+    return nodes, links
+
+def clos(leaves, spines=None):
+    """A two-tier leaf-spine Clos: every leaf wired to every spine (by default one spine per 4 leaves, at least 2)."""
+    spines = spines or max(2, leaves // 4)
+    spine_ids = [f"S{i}" for i in range(spines)]
+    leaf_ids = [f"L{i}" for i in range(leaves)]
+    return spine_ids + leaf_ids, [_link(leaf, spine) for leaf in leaf_ids for spine in spine_ids]
+
+def random_graph(n, degree=3, seed=0):
+    """
+    A connected random graph of n bridges with an average degree of about `degree`:
+    a random spanning tree plus random extra links.
+    """
+    rng = random.Random(seed)
+    nodes = [f"N{i}" for i in range(n)]
+    pairs = set()
+    order = rng.sample(range(n), n)
+    for i in range(1, n):
+        pairs.add(frozenset((order[i], order[rng.randrange(i)])))
+    target = min(n * (n - 1) // 2, max(n - 1, round(n * degree / 2)))
+    while len(pairs) < target:
+        a, b = rng.sample(range(n), 2)
+        pairs.add(frozenset((a, b)))
+    return nodes, [_link(nodes[a], nodes[b]) for a, b in sorted(tuple(sorted(pair)) for pair in pairs)]
+
+# name -> builder taking one size argument (nodes, grid side, fat-tree k or Clos leaves)
+TOPOLOGIES = {
+    'ring': ring,
+    'mesh': full_mesh,
+    'tree': tree,
+    'grid': grid,
+    'fat-tree': fat_tree,
+    'clos': clos,
+    'random': random_graph,
+}
+
+def build(name, size):
+    return TOPOLOGIES[name](size)
+
+def assign_vlans(links, vlan_count, density=1.0, first_vlan=10, seed=0):
+    """
+    {vlan_id: links} for `vlan_count` VLANs numbered from `first_vlan`, each on a random
+    `density` fraction of the links (every link with density=1).
+    """
+    rng = random.Random(seed)
+    vlans = {}
+    for vlan_id in range(first_vlan, first_vlan + vlan_count):
+        vlans[vlan_id] = list(links) if density >= 1 else [link for link in links if rng.random() < density]
+    return vlans
+
+def assign_instances(vlan_ids, instance_count):
+    """
+    {msti: [vlan_ids]} spreading the VLANs round robin over instances 1..instance_count.
+    With no instances every VLAN stays on the CIST.
+    """
+    if instance_count < 0:
+        raise ValueError(f"instance_count must be 0 or more, not {instance_count}")
+    instances = {}
+    if instance_count == 0:
+        return instances
+    for i, vlan_id in enumerate(sorted(vlan_ids)):
+        instances.setdefault(i % instance_count + 1, []).append(vlan_id)
+    return instances
+
+def write_topology(path, nodes, links, vlans, instances, host="127.0.0.1", base_port=5000):
+    """
+    Writes a topology file that replaces the one in config.py (see config.load_topology),
+    with node i listening on base_port + i.
+    """
+    topology = {
+        'Ip_address': {node_id: host for node_id in nodes},
+        'Port_Number': {node_id: base_port + i for i, node_id in enumerate(nodes)},
+        'Link_connected': list(links),
+        'VLANS': list(vlans),
+        'vlan_links': {str(vlan_id): list(vlan_links) for vlan_id, vlan_links in vlans.items()},
+        'MST_INSTANCES': {str(msti): vlan_ids for msti, vlan_ids in instances.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(topology, f, indent=1)
+    return topology
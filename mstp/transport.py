@@ -0,0 +1,207 @@
+import sys
+import os
+import json
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from mstp.bpdu_codec import MAGIC, decode_frame, encode_frame
+from mstp.peers import PeerPool, PeerStats
+import config
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BpduTransport(ABC):
+    """
+    How a NetworkNode exchanges BPDU frames with its neighbors.
+
+    `send_frame` is called with the JSON form of a frame ({'from', 'bpdus'});
+    received frames are handed to `node.receive_bpdu_batch` through the node's
+    `_dispatch` hook, so asyncio nodes can run them on their event loop.
+    """
+    name = None
+
+    def start(self, node):
+        self.node = node
+
+    @abstractmethod
+    def send_frame(self, neighbor_id, frame):
+        """Sends a frame to one neighbor. Returns False if it could not be sent."""
+
+    def get_stats(self):
+        """Per-neighbor send stats, in the same shape for every transport."""
+        return {}
+
+    def close(self):
+        pass
+
+
+class HttpTransport(BpduTransport):
+    """Today's behaviour: frames are POSTed to the neighbor's Flask or aiohttp server."""
+    name = 'http'
+
+    def __init__(self, pool):
+        self.pool = pool # PeerPool, or AsyncPeerPool on the asyncio runtime
+
+    def send_frame(self, neighbor_id, frame):
+        return self.pool.send_frame(neighbor_id, frame)
+
+    def get_stats(self):
+        return self.pool.get_stats()
+
+    def close(self):
+        self.pool.close()
+
+
+class UdpTransport(BpduTransport):
+    """
+    One datagram per frame on a per-node UDP port. There is no connection set-up,
+    no HTTP parsing and no thread per request: a single socket and one receiver
+    thread per node. Frames use the binary encoding, or JSON when a bridge ID is
+    too long for it. Lost datagrams are covered by the next hello.
+    """
+    name = 'udp'
+    MAX_DATAGRAM = 65507
+
+    def __init__(self, bind_address, peer_addresses):
+        self.bind_address = bind_address
+        self.peer_addresses = {} # {neighbor_id: (ip, port)}
+        self.stats = {}
+        for neighbor_id, address in peer_addresses.items():
+            self.add_peer(neighbor_id, address)
+        self.received = 0
+        self.malformed = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(bind_address)
+        self._closed = False
+
+    def add_peer(self, neighbor_id, address):
+        self.peer_addresses[neighbor_id] = address
+        self.stats.setdefault(neighbor_id, PeerStats())
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def start(self, node):
+        super().start(node)
+        threading.Thread(target=self._receive_loop, daemon=True).start()
+
+    def _receive_loop(self):
+        while not self._closed:
+            try:
+                data, _ = self.sock.recvfrom(self.MAX_DATAGRAM)
+            except OSError:
+                break
+            frame = self._parse(data)
+            if frame is None:
+                self.malformed += 1
+                continue
+            try:
+                self.node._dispatch(self.node.receive_bpdu_batch, *frame)
+                self.received += 1
+            except Exception: # Whatever a datagram holds, the node must keep receiving
+                self.malformed += 1
+
+    @staticmethod
+    def _parse(data):
+        """
+        (sender_id, records) of a datagram, or None if it is not a well-formed frame. Every
+        record is checked here, before any is applied: on the asyncio runtime the frame is
+        only handled later on the loop, where a bad record could no longer be counted.
+        """
+        try:
+            if data[:len(MAGIC)] == MAGIC:
+                return decode_frame(data)
+            frame = json.loads(data)
+        except ValueError:
+            return None
+        if not isinstance(frame, dict) or not isinstance(frame.get('from'), str) or not isinstance(frame.get('bpdus'), list):
+            return None
+        for record in frame['bpdus']:
+            if not isinstance(record, dict) or not _is_int(record.get('msti')) or not isinstance(record.get('bpdu'), dict):
+                return None
+            bpdu = record['bpdu']
+            if not isinstance(bpdu.get('sender_id'), str) or not isinstance(bpdu.get('root_id'), str) or not _is_int(bpdu.get('cost')):
+                return None
+        return frame['from'], frame['bpdus']
+
+    def send_frame(self, neighbor_id, frame):
+        address = self.peer_addresses.get(neighbor_id)
+        if address is None:
+            return False
+        try:
+            data = encode_frame(frame['from'], frame['bpdus'])
+        except ValueError:
+            data = json.dumps(frame).encode()
+        stats = self.stats[neighbor_id]
+        started = time.perf_counter()
+        try:
+            self.sock.sendto(data, address)
+        except OSError:
+            stats.failures += 1
+            return False
+        stats.record((time.perf_counter() - started) * 1000)
+        return True
+
+    def get_stats(self):
+        return {neighbor_id: stats.to_dict() for neighbor_id, stats in self.stats.items()}
+
+    def close(self):
+        self._closed = True
+        self.sock.close()
+
+
+class LoopbackHub:
+    """Connects LoopbackTransports in one process: frames are delivered by direct call."""
+    def __init__(self):
+        self.nodes = {}
+
+
+class LoopbackTransport(BpduTransport):
+    """In-memory transport for tests: no sockets, frames arrive synchronously."""
+    name = 'loopback'
+
+    def __init__(self, hub):
+        self.hub = hub
+        self.stats = {}
+
+    def start(self, node):
+        super().start(node)
+        self.hub.nodes[node.node_id] = node
+
+    def send_frame(self, neighbor_id, frame):
+        neighbor = self.hub.nodes.get(neighbor_id)
+        stats = self.stats.setdefault(neighbor_id, PeerStats())
+        if neighbor is None:
+            stats.failures += 1
+            return False
+        started = time.perf_counter()
+        neighbor._dispatch(neighbor.receive_bpdu_batch, frame['from'], frame['bpdus'])
+        stats.record((time.perf_counter() - started) * 1000)
+        return True
+
+    def get_stats(self):
+        return {neighbor_id: stats.to_dict() for neighbor_id, stats in self.stats.items()}
+
+    def close(self):
+        node = getattr(self, 'node', None) # Not started yet
+        if node is not None and self.hub.nodes.get(node.node_id) is node:
+            del self.hub.nodes[node.node_id]
+
+
+TRANSPORTS = ('http', 'udp')
+
+def create_transport(name, node_id, neighbors):
+    """Builds the BPDU transport `name` for a node from config.py."""
+    if name == 'http':
+        return HttpTransport(PeerPool(neighbors, timeout=1.5, wire_format=config.BPDU_WIRE_FORMAT))
+    if name == 'udp':
+        peers = {neighbor_id: (config.Ip_address[neighbor_id], config.get_udp_port(neighbor_id)) for neighbor_id, _ in neighbors}
+        return UdpTransport((config.Ip_address[node_id], config.get_udp_port(node_id)), peers)
+    raise ValueError(f"Unknown BPDU transport {name!r}; expected one of {', '.join(TRANSPORTS)}")
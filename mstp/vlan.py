@@ -1,19 +1,25 @@
 from .mstp import MSTP
 
 class VLAN:
-    """VLAN with its own MSTP instance."""
+    """
+    A VLAN mapped onto an MST instance. The spanning tree is computed once per
+    instance; a VLAN only looks up the instance's port states for its own ports.
+    """
     # The __init__ method MUST be updated to accept the 'bridge_id' argument
     # that is being passed to it from network.py.
-    def __init__(self, vlan_id, bridge_id, ports):
+    def __init__(self, vlan_id, bridge_id, ports, mstp=None):
         self.vlan_id = vlan_id
         
-        # Pass the bridge_id and ports to the MSTP constructor
-        self.mstp = MSTP(bridge_id=bridge_id, ports=ports)
+        # Share the instance's MSTP, or run a private one (one instance per VLAN)
+        self.mstp = mstp or MSTP(bridge_id=bridge_id, ports=ports)
         
         self.ports = ports
+        self._same_ports = set(ports) == set(self.mstp.ports)
 
     def receive_bpdu(self, port, bpdu):
-        self.mstp.receive_bpdu(port, bpdu)
+        return self.mstp.receive_bpdu(port, bpdu)
 
     def get_port_states(self):
-        return self.mstp.get_port_states() 
\ No newline at end of file
+        if self._same_ports:
+            return self.mstp.get_port_states()
+        return {port: state for port, state in self.mstp.port_states.items() if port in self.ports}
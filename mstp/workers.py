@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+import traceback
+
+
+class WorkerPool:
+    """
+    Fixed number of worker threads serving a bounded FIFO queue. `submit()` never
+    blocks: when the queue is full the task is refused and the caller decides what
+    to do (e.g. fail the transfer). Threads are started on the first submit.
+    """
+    def __init__(self, size=8, max_queue=256, name='worker', clock=time.monotonic):
+        self.size = size
+        self.max_queue = max_queue
+        self.name = name
+        self.clock = clock
+        self._queue = queue.Queue() # Bounded by submit(), so that stop() can always queue its wake-ups
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopped = False
+        # Counters; latencies in milliseconds
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.active = 0
+        self.max_depth = 0
+        self._total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._total_run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def submit(self, fn, *args):
+        """Queues fn(*args). Returns False, without running it, if the queue is full or the pool stopped."""
+        with self._lock:
+            if self._stopped:
+                return False
+            if len(self._threads) < self.size:
+                thread = threading.Thread(target=self._run, daemon=True, name=f'{self.name}-{len(self._threads)}')
+                self._threads.append(thread)
+                thread.start()
+            if self._queue.qsize() >= self.max_queue:
+                self.rejected += 1
+                return False
+            self._queue.put_nowait((self.clock(), fn, args))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def is_full(self):
+        return self._queue.qsize() >= self.max_queue
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            queued_at, fn, args = item
+            started = self.clock()
+            with self._lock:
+                self.active += 1
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()
+            finished = self.clock()
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                wait_ms, run_ms = (started - queued_at) * 1000, (finished - started) * 1000
+                self._total_wait_ms += wait_ms
+                self._total_run_ms += run_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                self.max_run_ms = max(self.max_run_ms, run_ms)
+
+    def stop(self):
+        """Lets the workers finish the queued tasks and exit."""
+        with self._lock:
+            self._stopped = True
+            for _ in self._threads:
+                self._queue.put_nowait(None) # Never blocks: the queue itself is unbounded
+
+    def get_stats(self):
+        with self._lock:
+            done = self.completed
+            return {
+                'workers': self.size,
+                'active': self.active,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': done,
+                'avg_wait_ms': round(self._total_wait_ms / done, 3) if done else None,
+                'max_wait_ms': round(self.max_wait_ms, 3),
+                'avg_run_ms': round(self._total_run_ms / done, 3) if done else None,
+                'max_run_ms': round(self.max_run_ms, 3),
+            }
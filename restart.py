@@ -1,60 +1,46 @@
 import os
 import sys
-import subprocess
 import time
+import config
+from cluster import Cluster, wait_healthy
 
-def kill_python_processes():
-    """Kill all running Python processes except this script."""
-    current_pid = os.getpid()
-    
-    print("Killing any running Python processes...")
-    if sys.platform == 'win32':
-        # Windows approach
-        subprocess.run(["taskkill", "/F", "/IM", "python.exe"],capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-    else:
-        # Unix approach using pkill (safer than killall)
-        try:
-            subprocess.run(["pkill", "-f", "python"], capture_output=True, text=True)
-        except Exception:
-            print("Warning: Could not kill Python processes automatically")
+def stop_all(cluster):
+    """Stop the nodes and dashboard started by an earlier run (tracked by PID, nothing else is touched)."""
+    stopped = cluster.stop()
+    if stopped:
+        print(f"Stopped {', '.join(stopped)}")
 
 def restart_all():
     """Restart all nodes and the dashboard"""
     print("Starting complete restart sequence...")
-    
-    # Kill any existing Python processes
-    kill_python_processes()
-    time.sleep(2)
-    
-    # Start Node A
-    print("Starting Node A...")
-    if sys.platform == 'win32':
-        node_a = subprocess.Popen(['python', 'main.py', 'A'], creationflags=subprocess.CREATE_NEW_CONSOLE)
-    else:
-        node_a = subprocess.Popen(['python', 'main.py', 'A'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
-    time.sleep(3)
-    
+    cluster = Cluster()
+    stop_all(cluster)
+
+    # Start every node that has an address on this machine
+    node_ids = cluster.start_nodes()
+    print(f"Started nodes {', '.join(node_ids)}, waiting for them to answer...")
+    urls = cluster.node_urls()
+    down = wait_healthy(urls, timeout=15)
+    if down:
+        print(f"Warning: {', '.join(sorted(down))} not answering, see {cluster.log_dir}")
+
     # Start Dashboard
     print("Starting Dashboard...")
-    if sys.platform == 'win32':
-        dashboard = subprocess.Popen(['python', 'dashboard/desktop_app.py'], creationflags=subprocess.CREATE_NEW_CONSOLE)
-    else:
-        dashboard = subprocess.Popen(['python', 'dashboard/desktop_app.py'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
-    print("Restart completed! Node A and Dashboard are running.")
-    print("To run nodes B and C, copy the project to other laptops and run:")
-    print("1. Update config.py with Current_Node_id = 'B' or 'C'")
-    print("2. Run python main.py")
-    
-    return node_a, dashboard
+    cluster.start('dashboard', [sys.executable, os.path.join('dashboard', 'desktop_app.py')])
+
+    print(f"Restart completed! Nodes {', '.join(node_ids)} and Dashboard are running.")
+    remote = [node_id for node_id in config.Ip_address if node_id not in node_ids]
+    if remote:
+        print(f"To run nodes {', '.join(remote)}, copy the project to the machines in config.py and run:")
+        print("python main.py <NODE_ID>")
+    return cluster
 
 if __name__ == "__main__":
+    cluster = restart_all()
     try:
-        restart_all()
-        print("\nPress Ctrl+C to exit and kill all processes...")
+        print("\nPress Ctrl+C to exit and stop the nodes and dashboard...")
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
         print("\nExiting and cleaning up...")
-        kill_python_processes()
\ No newline at end of file
+        stop_all(cluster)
@@ -0,0 +1,47 @@
+import time
+import argparse
+from mstp.simulation import Simulator
+import config
+
+def run_simulation(hello_interval, link_delay, triggered=True, transfer=None, transfer_mode=None):
+    """Runs the config.py topology in one process on a virtual clock."""
+    started = time.perf_counter()
+    sim = Simulator.from_config(hello_interval=hello_interval, link_delay=link_delay, triggered=triggered)
+    converged_at = sim.run_until_converged()
+
+    print("=" * 50)
+    print(f"Converged after {converged_at:.3f}s of virtual time")
+    print(f"Wall clock: {time.perf_counter() - started:.3f}s, BPDU frames: {sim.frames_delivered}, BPDU records: {sim.bpdus_delivered}, events: {sim.events_processed}")
+    print("=" * 50)
+    for vlan_id in config.VLANS:
+        print(f"VLAN {vlan_id}:")
+        for node_id, node in sim.nodes.items():
+            print(f"  {node_id}: {node.get_vlan_port_states(vlan_id)}")
+
+    if transfer:
+        src, dst, vlan_id, file_size_mb = transfer
+        transfer_id = sim.start_transfer(src, dst, vlan_id, file_size_mb, transfer_mode)
+        sim.run()
+        record = sim.transfers[transfer_id]
+        print("-" * 50)
+        if record['completed_at'] is None:
+            print(f"Transfer {src}->{dst} on VLAN {vlan_id} did not complete")
+        else:
+            duration = record['completed_at'] - record['started_at']
+            print(f"Transfer {src}->{dst} on VLAN {vlan_id} completed in {duration:.3f}s ({file_size_mb / duration:.2f} MB/s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the config.py topology in the in-process simulator.")
+    parser.add_argument("--hello", type=float, default=2.0, help="Hello interval in virtual seconds.")
+    parser.add_argument("--link-delay", type=float, default=0.001, help="One-way link delay in virtual seconds.")
+    parser.add_argument("--periodic", action="store_true", help="Send BPDU changes at the next hello tick instead of immediately.")
+    parser.add_argument("--transfer", nargs=4, metavar=("SRC", "DST", "VLAN", "SIZE_MB"), help="Run one transfer after convergence.")
+    parser.add_argument("--transfer-mode", choices=["single", "cut-through", "store-and-forward"], default=None,
+                        help="How the transfer is forwarded (default: TRANSFER_MODE in config.py).")
+    args = parser.parse_args()
+
+    transfer = None
+    if args.transfer:
+        src, dst, vlan_id, file_size_mb = args.transfer
+        transfer = (src.upper(), dst.upper(), int(vlan_id), float(file_size_mb))
+    run_simulation(args.hello, args.link_delay, not args.periodic, transfer, args.transfer_mode)
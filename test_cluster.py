@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import subprocess
+
+# Add the project directory to the Python path to import the launcher
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cluster import Cluster, is_running
+
+SLEEPER = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+class TestCluster(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cluster = Cluster(self.tmp.name)
+
+    def tearDown(self):
+        self.cluster.stop(timeout=1)
+        self.tmp.cleanup()
+
+    def test_processes_are_tracked_across_launcher_runs(self):
+        pid = self.cluster.start('sleeper', SLEEPER)
+        self.assertEqual(Cluster(self.tmp.name).running(), {'sleeper': pid})
+        with self.assertRaises(RuntimeError):
+            self.cluster.start('sleeper', SLEEPER)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, 'logs', 'sleeper.log')))
+
+    def test_stop_only_signals_tracked_processes(self):
+        other = subprocess.Popen(SLEEPER)
+        try:
+            pid = self.cluster.start('sleeper', SLEEPER)
+            self.assertEqual(Cluster(self.tmp.name).stop(timeout=5), ['sleeper'])
+            self.assertFalse(is_running(pid, SLEEPER))
+            self.assertIsNone(other.poll())
+            self.assertEqual(Cluster(self.tmp.name).processes, {})
+        finally:
+            other.kill()
+            other.wait()
+
+    def test_unknown_nodes_start_nothing(self):
+        with self.assertRaisesRegex(RuntimeError, 'NOPE'):
+            self.cluster.start_nodes(['A', 'NOPE'])
+        self.assertEqual(self.cluster.processes, {})
+
+    @unittest.skipUnless(os.path.exists('/proc/self/cmdline'), "needs /proc")
+    def test_reused_pid_is_not_ours(self):
+        """A PID now running another command is not treated as (or signalled as) a tracked process."""
+        pid = self.cluster.start('sleeper', SLEEPER)
+        self.assertTrue(is_running(pid, SLEEPER))
+        self.assertFalse(is_running(pid, [sys.executable, 'main.py', 'A']))
+        self.cluster.processes['sleeper']['cmd'] = [sys.executable, 'main.py', 'A']
+        self.cluster.stop(timeout=0.5)
+        time.sleep(0.1)
+        self.assertTrue(is_running(pid, SLEEPER))
+        os.kill(pid, 9)
+
+if __name__ == '__main__':
+    unittest.main()
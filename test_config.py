@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import tempfile
+import subprocess
+
+# Add the project directory to the Python path to import config
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from config import TopologyIndex
+
+class TestTopologyIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TopologyIndex(
+            ['A', 'B', 'C', 'D'],
+            ['A:B', 'B:C', 'C:A', 'C:D'],
+            {10: ['A:B', 'B:C'], 30: ['C:D']},
+            {1: [10]},
+            lambda node_id: f'http://{node_id}')
+
+    def test_neighbor_tables(self):
+        self.assertEqual(self.index.neighbors['C'], [('B', 'http://B'), ('A', 'http://A'), ('D', 'http://D')])
+        self.assertEqual(self.index.neighbors['D'], [('C', 'http://C')])
+
+    def test_vlan_membership_is_symmetric(self):
+        self.assertTrue(self.index.is_link_in_vlan(10, 'A', 'B'))
+        self.assertTrue(self.index.is_link_in_vlan(10, 'B', 'A'))
+        self.assertFalse(self.index.is_link_in_vlan(10, 'C', 'A'))
+        self.assertTrue(self.index.is_link_in_vlan(30, 'D', 'C'))
+        self.assertFalse(self.index.is_link_in_vlan(99, 'A', 'B'))
+
+    def test_vlan_neighbors_and_instances(self):
+        self.assertEqual(self.index.get_vlan_neighbors('B', 10), [('A', 'http://A'), ('C', 'http://C')])
+        self.assertEqual(self.index.get_vlan_neighbors('A', 30), [])
+        self.assertEqual(self.index.get_instance_for_vlan(10), 1)
+        self.assertEqual(self.index.get_instance_for_vlan(30), 0)
+
+class TestConfigHelpers(unittest.TestCase):
+
+    def tearDown(self):
+        config.reload_topology()
+
+    def test_any_number_of_vlans(self):
+        """VLANs beyond 10 and 20 are picked up from their Vlan<ID> list."""
+        with patch.object(config, 'VLANS', [10, 20, 30]), patch.object(config, 'Vlan30', ['A:B'], create=True):
+            config.reload_topology()
+            self.assertEqual(config.get_vlan_links(30), ['A:B'])
+            self.assertEqual(set(config.get_all_vlan_links()), {10, 20, 30})
+            self.assertTrue(config.is_link_in_vlan(30, 'B', 'A'))
+            self.assertFalse(config.is_link_in_vlan(30, 'B', 'C'))
+
+    def test_helpers_match_config(self):
+        self.assertEqual([n for n, _ in config.get_neighbors_for_node('A')], ['B', 'C'])
+        self.assertEqual(config.get_vlan_links(10), config.Vlan10)
+        self.assertEqual(config.get_vlan_links(99), [])
+        self.assertEqual(config.get_node_urls()['B'], f"http://{config.Ip_address['B']}:{config.Port_Number['B']}")
+
+    def test_generated_topology_replaces_config(self):
+        """A node started with MSTP_TOPOLOGY runs the generated topology instead of the one in config.py."""
+        from mstp import topogen
+        nodes, links = topogen.ring(5)
+        vlans = topogen.assign_vlans(links, 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'topology.json')
+            topogen.write_topology(path, nodes, links, vlans, topogen.assign_instances(vlans, 2), base_port=7000)
+            script = ("import json, config; print(json.dumps([config.Port_Number, config.VLANS, config.get_vlan_links(12), "
+                      "config.get_instance_for_vlan(12), [n for n, _ in config.get_neighbors_for_node('R0')]]))")
+            out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)), env={**os.environ, 'MSTP_TOPOLOGY': path}).stdout
+        ports, vlan_ids, vlan12, instance, neighbors = json.loads(out)
+        self.assertEqual(ports, {f'R{i}': 7000 + i for i in range(5)})
+        self.assertEqual(vlan_ids, [10, 11, 12])
+        self.assertEqual(vlan12, links)
+        self.assertEqual(instance, 1)
+        self.assertEqual(neighbors, ['R1', 'R4'])
+
+if __name__ == '__main__':
+    unittest.main()